@@ -1,13 +1,10 @@
-from app import create_app
-from app.extensions import db
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = create_app()
+from app import create_app
 
-with app.app_context():
-    db.create_all()
+app = create_app()
 
 if __name__ == "__main__":
     app.run(debug=True)
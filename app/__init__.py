@@ -1,9 +1,14 @@
+import click
 from flask import Flask
+from jinja2 import FileSystemBytecodeCache
 from .extensions import db
 import os
+import time
 from datetime import timedelta
 
 def create_app():
+    started = time.perf_counter()
+    report = {}
     app = Flask(__name__)
     
     # Load config from root config.py
@@ -15,22 +20,148 @@ def create_app():
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=24)
     
-    # Initialize database
+    # Client IP/scheme from X-Forwarded-* set by the load balancer(s) in front
+    proxy_hops = app.config.get('TRUSTED_PROXY_HOPS', 0)
+    if proxy_hops:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_hops, x_proto=proxy_hops)
+    
+    # Persist compiled templates so fresh workers skip Jinja compilation
+    cache_dir = app.config.get('TEMPLATE_CACHE_DIR')
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    
+    # Initialize database (pool metrics hook must be in place before engines are built)
+    from .services import db_pool
+    db_pool.init_app(app)
     db.init_app(app)
     
+    # WAL/pragmas and write serialization when running on a SQLite file
+    from .services.sqlite_tuning import sqlite_tuner
+    sqlite_tuner.init_app(app)
+    
+    # Catalog fragment cache
+    from .services.render_cache import catalog_cache
+    catalog_cache.init_app(app)
+    
+    # Password hashing algorithm/cost and verification pool
+    from .services.password_hasher import hasher
+    hasher.init_app(app)
+    
+    # Login throttling and unknown-email cache
+    from .services.rate_limit import login_limiter, unknown_emails
+    login_limiter.init_app(app)
+    unknown_emails.init_app(app)
+    
+    # Background bulk role changes
+    from .services.role_jobs import role_jobs
+    role_jobs.init_app(app)
+    
+    # Per-recipient notification coalescing and batched publishing
+    from .services.notification import notifications
+    notifications.init_app(app)
+    
+    # Order status state machine and background bulk transitions
+    from .services.order_lifecycle import order_jobs
+    order_jobs.init_app(app)
+    
+    # gzip/brotli for text responses (registered first so it runs after every other after_request)
+    from .services.compression import compressor
+    compressor.init_app(app)
+    
+    # Fingerprinted, precompressed static files
+    from .services.assets import assets, build_assets_command
+    assets.init_app(app)
+    
+    # Cover thumbnails for /img
+    from .services.images import image_cache
+    image_cache.init_app(app)
+    
+    # Sharded stock counters for hot titles
+    from .services.stock_shards import sharded_stock, shard_stock_command
+    sharded_stock.init_app(app)
+    
+    # Cart stock holds and their expiry sweeper
+    from .services.reservations import reservations, sweep_holds_command
+    reservations.init_app(app)
+    
+    # Sales rollups are maintained by Order mapper events registered on import
+    from .services import sales_rollups
+    
     # Register blueprints
+    phase = time.perf_counter()
     from .routes.auth import auth_bp
     from .routes.bookstore import bookstore_bp
     from .routes.admin import admin_bp
     from .routes.seller import seller_bp
+    from .routes.images import images_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(bookstore_bp)
     app.register_blueprint(admin_bp)
     app.register_blueprint(seller_bp)
+    app.register_blueprint(images_bp)
+    report['blueprints_ms'] = (time.perf_counter() - phase) * 1000
+    
+    # Schema creation: `flask --app app:create_app create-db`, or on boot where enabled
+    app.cli.command('create-db')(_create_db_command)
+    # Fingerprint/precompress static files at deploy time: `flask --app app:create_app build-assets`
+    app.cli.command('build-assets')(build_assets_command)
+    # Rebuild rollups from historical orders: `flask --app app:create_app backfill-rollups`
+    app.cli.command('backfill-rollups')(
+        click.option('--chunk-size', default=5000, show_default=True, help="Orders per chunk.")(
+            sales_rollups.backfill_command))
+    # Flag a hot title: `flask --app app:create_app shard-stock 42 --shards 8` (0 unshards)
+    app.cli.command('shard-stock')(
+        click.argument('book_id', type=int)(
+            click.option('--shards', default=app.config.get('STOCK_SHARDS', 8), show_default=True,
+                         help="Counters to split the stock over; 0 folds them back.")(shard_stock_command)))
+    # Return expired cart holds from cron as well: `flask --app app:create_app sweep-holds`
+    app.cli.command('sweep-holds')(sweep_holds_command)
+    if app.config.get('AUTO_CREATE_TABLES'):
+        phase = time.perf_counter()
+        from .services.schema import upgrade_schema
+        with app.app_context():
+            upgrade_schema()
+        report['create_all_ms'] = (time.perf_counter() - phase) * 1000
     
-    # Create tables if they don't exist
-    with app.app_context():
-        db.create_all()
+    if app.config.get('TEMPLATE_WARMUP'):
+        _warm_up(app, report)
     
-    return app
\ No newline at end of file
+    report['total_ms'] = (time.perf_counter() - started) * 1000
+    app.extensions['startup_report'] = report
+    if app.config.get('STARTUP_REPORT'):
+        print("[STARTUP] " + ", ".join(f"{key}={value:.1f}" if isinstance(value, float) else f"{key}={value}"
+                                      for key, value in report.items()))
+    
+    return app
+
+def _warm_up(app, report):
+    """Compile every template and prime the catalog cache before the first request."""
+    phase = time.perf_counter()
+    templates = app.jinja_env.list_templates(extensions=['html'])
+    for name in templates:
+        app.jinja_env.get_template(name)
+    report['templates'] = len(templates)
+    report['templates_ms'] = (time.perf_counter() - phase) * 1000
+    
+    # Lazy mode leaves AWS clients (and boto3 itself) to the first real request
+    if app.config.get('LAZY_INIT'):
+        return
+    
+    phase = time.perf_counter()
+    try:
+        from .routes.bookstore import render_books_grid, BOOKS_PER_PAGE
+        with app.test_request_context('/books'):
+            render_books_grid('', 1, BOOKS_PER_PAGE, None, {'author': '', 'genre': '', 'price': ''})
+    except Exception as e:
+        print(f"[STARTUP] Catalog warm-up skipped: {e}")
+    report['catalog_ms'] = (time.perf_counter() - phase) * 1000
+
+def _create_db_command():
+    """Create database tables, and columns/indexes added to existing tables, that do not exist yet."""
+    from .services.schema import upgrade_schema
+    for column in upgrade_schema():
+        print(f"  added column {column}")
+    print("✓ Database tables created.")
@@ -4,11 +4,12 @@ from datetime import datetime
 class Book(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(150), nullable=False)
-    author = db.Column(db. String(200), nullable=False)
+    author = db.Column(db. String(200), nullable=False, index=True)
+    genre = db.Column(db.String(80), index=True)
     description = db.Column(db.Text)
-    price = db.Column(db.Float, nullable=False)
+    price = db.Column(db.Float, nullable=False, index=True)
     stock = db.Column(db.Integer, default=0)
-    seller_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)  # Books can be owned by sellers
+    seller_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True, index=True)  # Books can be owned by sellers
     image_url = db.Column(db.String(500))
     
     # Relationships
@@ -0,0 +1,17 @@
+from app.extensions import db
+from datetime import datetime
+
+class StockHold(db.Model):
+    """Units of a book reserved for one buyer's cart until expires_at.
+
+    Held units are already removed from the book's available stock; checkout
+    turns the hold into an order, the sweeper returns expired ones.
+    """
+    __table_args__ = (db.UniqueConstraint('user_id', 'book_id', name='uq_stock_hold_user_book'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    book_id = db.Column(db.Integer, db.ForeignKey('book.id'), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
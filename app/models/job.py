@@ -0,0 +1,28 @@
+from app.extensions import db
+from datetime import datetime
+
+class BulkJob(db.Model):
+    """Progress of a background bulk mutation (shared by all workers via SQL)."""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False, index=True)
+    state = db.Column(db.String(20), default='pending')  # pending, running, done, failed
+    requested_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    total = db.Column(db.Integer, default=0)
+    processed = db.Column(db.Integer, default=0)
+    failed = db.Column(db.Integer, default=0)
+    error = db.Column(db.String(500))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'state': self.state,
+            'total': self.total,
+            'processed': self.processed,
+            'failed': self.failed,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
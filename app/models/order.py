@@ -3,12 +3,13 @@ from datetime import datetime
 
 class Order(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    book_id = db.Column(db.Integer, db.ForeignKey('book.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    book_id = db.Column(db.Integer, db.ForeignKey('book.id'), nullable=False, index=True)
     quantity = db.Column(db.Integer, default=1)
     total_price = db.Column(db.Float, nullable=False)
     status = db.Column(db.String(30), default='Placed')
-    order_date = db.Column(db.DateTime, default=datetime.utcnow)
+    # Indexed: the dashboard, admin order list and seller sales sort by it
+    order_date = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
     # Relationships
     user = db.relationship('User', backref=db.backref('orders', lazy=True))
@@ -0,0 +1,13 @@
+from app.extensions import db
+from datetime import datetime
+
+class OrderStatusChange(db.Model):
+    """One step of an order's lifecycle (who moved it from which status to which, and when)."""
+    __table_args__ = (db.Index('ix_order_status_change_order', 'order_id', 'changed_at'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
+    from_status = db.Column(db.String(30), nullable=False)
+    to_status = db.Column(db.String(30), nullable=False)
+    changed_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)  # None for system changes
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
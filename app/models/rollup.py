@@ -0,0 +1,25 @@
+from app.extensions import db
+
+class SalesRollup(db.Model):
+    """Pre-aggregated sales for one time bucket and one dimension value.
+
+    dimension is 'all' (key ''), 'status', 'seller', 'book' or, for months
+    only, 'seller_book' (key '<seller_id>:<book_id>', so one seller's books
+    are a key range). Revenue, units and orders exclude cancelled orders
+    except in the 'status' dimension, which counts every order under its
+    current status.
+    """
+    __table_args__ = (
+        db.UniqueConstraint('granularity', 'bucket_start', 'dimension', 'dimension_key', name='uq_sales_rollup_bucket'),
+        db.Index('ix_sales_rollup_series', 'granularity', 'dimension', 'bucket_start'),
+        db.Index('ix_sales_rollup_key', 'granularity', 'dimension', 'dimension_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    granularity = db.Column(db.String(10), nullable=False)  # hour, day, month
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    dimension = db.Column(db.String(10), nullable=False)
+    dimension_key = db.Column(db.String(64), nullable=False, default='')
+    revenue = db.Column(db.Float, nullable=False, default=0)
+    units = db.Column(db.Integer, nullable=False, default=0)
+    orders = db.Column(db.Integer, nullable=False, default=0)
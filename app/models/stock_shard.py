@@ -0,0 +1,10 @@
+from app.extensions import db
+
+class StockShard(db.Model):
+    """One sub-counter of a hot title's stock; the title's stock is the sum of its shards.
+
+    Books without shard rows keep their stock in Book.stock only.
+    """
+    book_id = db.Column(db.Integer, db.ForeignKey('book.id'), primary_key=True)
+    shard = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    stock = db.Column(db.Integer, nullable=False, default=0)
@@ -1,5 +1,5 @@
 from app.extensions import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.services.password_hasher import hasher
 from datetime import datetime
 
 class User(db.Model):
@@ -13,8 +13,8 @@ class User(db.Model):
 
     def set_password(self, password):
         password = password.strip()
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hasher.hash(password)
 
     def check_password(self, password):
         password = password.strip()
-        return check_password_hash(self.password_hash, password)
\ No newline at end of file
+        return hasher.verify(self.password_hash, password)
\ No newline at end of file
@@ -1,69 +1,123 @@
 import json
 import base64
+import asyncio
 from app.extensions import db
 from app.models.book import Book
-from app_aws import DynamoBookRepository
+from app_aws import DynamoBookRepository, normalize_key, price_bucket_range
+from app.services.render_cache import catalog_cache
+from app.services.db_pool import read_session
+from app.services.reservations import held_by_book, held_units, prepare_stock_counts
+from app.services.stock_shards import sharded_stock
+from sqlalchemy import func, case, select, update
+
+def _available(on_hand):
+    """SQL for the sellable stock of a book with `on_hand` copies: minus its cart holds, never below 0."""
+    available = on_hand - held_units()
+    return case((available < 0, 0), else_=available)
+
+class MockPagination:
+    """Mimics the Flask-SQLAlchemy pagination object for token-based DynamoDB pages."""
+    def __init__(self, items, page, per_page, next_token):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.next_token = next_token
+        self.has_next = next_token is not None
+        # We don't have total count anymore for infinite datasets
+        self.total = 99999 
+        self.pages = 9999 
+    def iter_pages(self, **kwargs):
+        return [] # Simplify for token-based
+
+def _decode_token(token):
+    if token:
+        try:
+            return json.loads(base64.b64decode(token).decode('utf-8'))
+        except:
+            pass
+    return None
+
+def _encode_token(last_key):
+    if last_key:
+        return base64.b64encode(json.dumps(last_key).encode('utf-8')).decode('utf-8')
+    return None
+
+def _item_to_book(item):
+    book = Book(
+        title=item.get('title'),
+        author=item.get('author'),
+        genre=item.get('genre') or None,
+        description=item.get('description'),
+        price=float(item.get('price', 0)),
+        stock=int(item.get('stock', 0)),
+        image_url=item.get('image_url')
+    )
+    book.id = item.get('id')
+    return book
 
 class BookRepository:
     def get_all_paginated(self, page, per_page, token=None):
         """Get books from DynamoDB using token-based pagination."""
         try:
             dynamo = DynamoBookRepository()
-            
-            # Decode token if present
-            last_key = None
-            if token:
-                try:
-                    last_key = json.loads(base64.b64decode(token).decode('utf-8'))
-                except:
-                    pass
-
-            response = dynamo.get_paginated(limit=per_page, last_key=last_key)
+            response = dynamo.get_paginated(limit=per_page, last_key=_decode_token(token))
             items = response['Items']
             
             # If no items found in DynamoDB on first page, check if we should fallback to SQL
             if not items and not token:
                 print("No books found in DynamoDB first page, falling back to SQL...")
-                return Book.query.order_by(Book.id.desc()).paginate(page=page, per_page=per_page, error_out=False)
+                return read_session().query(Book).order_by(Book.id.desc()).paginate(page=page, per_page=per_page, error_out=False)
 
-            next_key = response['LastEvaluatedKey']
-            
-            # Encode next token
-            next_token = None
-            if next_key:
-                next_token = base64.b64encode(json.dumps(next_key).encode('utf-8')).decode('utf-8')
-
-            books = []
-            for item in items:
-                book = Book(
-                    title=item.get('title'),
-                    author=item.get('author'),
-                    description=item.get('description'),
-                    price=float(item.get('price', 0)),
-                    stock=int(item.get('stock', 0)),
-                    image_url=item.get('image_url')
-                )
-                book.id = item.get('id')
-                books.append(book)
-            
-            # Mocking the pagination object structure expected by templates
-            class MockPagination:
-                def __init__(self, items, page, per_page, next_token):
-                    self.items = items
-                    self.page = page
-                    self.per_page = per_page
-                    self.next_token = next_token
-                    self.has_next = next_token is not None
-                    # We don't have total count anymore for infinite datasets
-                    self.total = 99999 
-                    self.pages = 9999 
-                def iter_pages(self, **kwargs):
-                    return [] # Simplify for token-based
-
-            return MockPagination(books, page, per_page, next_token)
+            books = [_item_to_book(item) for item in items]
+            return MockPagination(books, page, per_page, _encode_token(response['LastEvaluatedKey']))
+        except Exception as e:
+            print(f"DynamoDB Read Error: {e}")
+            return read_session().query(Book).order_by(Book.id.desc()).paginate(page=page, per_page=per_page, error_out=False)
+
+    def browse_paginated(self, filters, page, per_page, token=None):
+        """Browse books by author, genre or price bucket via the DynamoDB browse indexes.
+
+        The most selective filter drives the index Query; any remaining filters are
+        applied to that page in memory.
+        """
+        filters = {field: value for field, value in filters.items() if value}
+        try:
+            dynamo = DynamoBookRepository()
+            field = next(f for f in ('author', 'genre', 'price') if f in filters)
+            response = dynamo.browse(field, filters[field], limit=per_page, last_key=_decode_token(token))
+            items = [item for item in response['Items'] if self._matches(item, filters)]
+
+            if not response['Items'] and not token:
+                return self._browse_sql(filters, page, per_page)
+
+            books = [_item_to_book(item) for item in items]
+            return MockPagination(books, page, per_page, _encode_token(response['LastEvaluatedKey']))
         except Exception as e:
             print(f"DynamoDB Read Error: {e}")
-            return Book.query.order_by(Book.id.desc()).paginate(page=page, per_page=per_page, error_out=False)
+            return self._browse_sql(filters, page, per_page)
+
+    @staticmethod
+    def _matches(item, filters):
+        if 'author' in filters and item.get('author_key') != normalize_key(filters['author']):
+            return False
+        if 'genre' in filters and item.get('genre_key') != normalize_key(filters['genre']):
+            return False
+        if 'price' in filters and item.get('price_bucket') != filters['price']:
+            return False
+        return True
+
+    def _browse_sql(self, filters, page, per_page):
+        query = read_session().query(Book)
+        if 'author' in filters:
+            query = query.filter(func.lower(Book.author) == normalize_key(filters['author']))
+        if 'genre' in filters:
+            query = query.filter(func.lower(Book.genre) == normalize_key(filters['genre']))
+        if 'price' in filters:
+            min_price, max_price = price_bucket_range(filters['price'])
+            query = query.filter(Book.price >= min_price)
+            if max_price is not None:
+                query = query.filter(Book.price < max_price)
+        return query.order_by(Book.id.desc()).paginate(page=page, per_page=per_page, error_out=False)
     
     def search_paginated(self, query, page, per_page):
         """Search books (Fallback to get_all for simplicity on Dynamo)."""
@@ -75,20 +129,37 @@ class BookRepository:
             dynamo = DynamoBookRepository()
             item = dynamo.get_by_id(str(book_id))
             if item:
-                book = Book(
-                    title=item.get('title'),
-                    author=item.get('author'),
-                    description=item.get('description'),
-                    price=float(item.get('price', 0)),
-                    stock=int(item.get('stock', 0)),
-                    image_url=item.get('image_url')
-                )
-                book.id = item.get('id')
-                return book
+                return _item_to_book(item)
         except Exception as e:
             print(f"DynamoDB Read Error: {e}")
             
         return Book.query.get(book_id)
+
+    async def get_many_async(self, book_ids):
+        """Get several books at once: DynamoDB lookups run concurrently on worker
+        threads, then any misses fall back to SQL on the request thread (the
+        SQLAlchemy session must not be shared across threads).
+
+        Returns a dict of book_id -> Book (None if not found).
+        """
+        def fetch(dynamo, book_id):
+            try:
+                return dynamo.get_by_id(str(book_id))
+            except Exception as e:
+                print(f"DynamoDB Read Error: {e}")
+                return None
+
+        try:
+            dynamo = DynamoBookRepository()
+            items = await asyncio.gather(*(asyncio.to_thread(fetch, dynamo, book_id) for book_id in book_ids))
+        except Exception as e:
+            print(f"DynamoDB Read Error: {e}")
+            items = [None] * len(book_ids)
+
+        return {
+            book_id: _item_to_book(item) if item else Book.query.get(book_id)
+            for book_id, item in zip(book_ids, items)
+        }
     
     def add(self, book):
         """Add a new book to database and DynamoDB."""
@@ -102,6 +173,8 @@ class BookRepository:
                 'id': str(book.id),
                 'title': book.title,
                 'author': book.author,
+                'genre': book.genre or '',
+                'description': book.description or '',
                 'price': book.price,
                 'stock': book.stock,
                 'seller_id': str(book.seller_id) if book.seller_id else "system",
@@ -112,8 +185,144 @@ class BookRepository:
             
         return book
     
+    def bulk_update_stock(self, changes, batch_size=500):
+        """Apply many stock changes with batched SQL UPDATEs and a DynamoDB fan-out.
+
+        `changes` is a list of (book_id, action, amount), action 'set' or 'add'
+        (negative amounts remove stock). A 'set' amount is the number of copies
+        on hand: units held in carts are subtracted from it (see
+        reservations.prepare_stock_counts). Several rows for one book are
+        applied in order. Returns book_id -> {'status', 'stock', 'dynamodb'}, where
+        status is 'updated', 'not_found' or 'invalid' (stock would go below 0,
+        checked again by the UPDATE so a concurrent checkout cannot be oversold).
+        """
+        book_ids = list(dict.fromkeys(book_id for book_id, _, _ in changes))
+        current, sharded = {}, {}
+        for start in range(0, len(book_ids), batch_size):
+            batch = book_ids[start:start + batch_size]
+            current.update(db.session.execute(select(Book.id, Book.stock).where(Book.id.in_(batch))).all())
+            # Hot titles: the shard sum is the live stock, Book.stock may lag behind it
+            sharded.update(sharded_stock.totals(batch))
+            current.update(sharded)
+
+        plan = {}
+        for book_id, action, amount in changes:
+            if book_id not in current:
+                continue
+            op, value = plan.get(book_id, ('add', 0))
+            plan[book_id] = ('set', amount) if action == 'set' else (op, value + amount)
+
+        results = {book_id: {'status': 'not_found', 'stock': None, 'dynamodb': None}
+                   for book_id in book_ids if book_id not in current}
+        for book_id, (op, value) in list(plan.items()):
+            stock = value if op == 'set' else (current[book_id] or 0) + value
+            if stock < 0:
+                del plan[book_id]
+                results[book_id] = {'status': 'invalid', 'stock': current[book_id], 'dynamodb': None}
+            else:
+                results[book_id] = {'status': 'updated', 'stock': stock, 'dynamodb': None}
+
+        # 'set' amounts are copies on hand; units held in carts are not available on top of them
+        counts = {book_id: value for book_id, (op, value) in plan.items() if op == 'set'}
+        if counts:
+            prepare_stock_counts(counts)
+
+        # Hot titles are changed through their stock shards
+        for book_id in [book_id for book_id in plan if book_id in sharded]:
+            stock = self._apply_sharded(book_id, *plan[book_id])
+            if stock is None:
+                # Sold by concurrent checkouts since the totals were read
+                del plan[book_id]
+                results[book_id] = {'status': 'invalid', 'stock': sharded_stock.totals([book_id])[book_id],
+                                    'dynamodb': None}
+            else:
+                results[book_id]['stock'] = stock
+
+        # Removals only apply while the stored stock still covers them: checkouts
+        # may have sold units since `current` was read
+        removals = {book_id: value for book_id, (op, value) in plan.items()
+                    if book_id not in sharded and op == 'add' and value < 0}
+        for start in range(0, len(removals), batch_size):
+            batch = dict(list(removals.items())[start:start + batch_size])
+            for book_id in self._remove_stock(batch):
+                del plan[book_id]
+                stock = db.session.execute(select(Book.stock).where(Book.id == book_id)).scalar()
+                results[book_id] = {'status': 'invalid', 'stock': stock, 'dynamodb': None}
+
+        # One UPDATE ... SET stock = CASE id WHEN .. THEN .. END per batch; 'add'
+        # is relative to the stored value so concurrent orders are not overwritten,
+        # and 'set' subtracts the holds in the same statement
+        planned = [(book_id, change) for book_id, change in plan.items()
+                   if book_id not in sharded and book_id not in removals]
+        for start in range(0, len(planned), batch_size):
+            batch = dict(planned[start:start + batch_size])
+            db.session.execute(
+                update(Book).where(Book.id.in_(batch)).values(stock=case(
+                    {book_id: _available(value) if op == 'set' else Book.stock + value
+                     for book_id, (op, value) in batch.items()},
+                    value=Book.id
+                )).execution_options(synchronize_session=False)
+            )
+        counted = [book_id for book_id, (op, _) in planned if op == 'set']
+        for start in range(0, len(counted), batch_size):
+            # What a count leaves available depends on the holds read by the UPDATE
+            stored = db.session.execute(
+                select(Book.id, Book.stock).where(Book.id.in_(counted[start:start + batch_size]))).all()
+            for book_id, stock in stored:
+                results[book_id]['stock'] = stock
+        db.session.commit()
+        # Core-level UPDATEs skip the ORM events, so invalidate the grid once here
+        catalog_cache.invalidate()
+
+        try:
+            # DynamoDB stores the sellable stock, so 'set' sends the value stored in SQL
+            dynamo_plan = {book_id: ('set', results[book_id]['stock']) if op == 'set' else (op, value)
+                           for book_id, (op, value) in plan.items()}
+            for book_id, outcome in DynamoBookRepository().update_stock_many(dynamo_plan).items():
+                results[book_id]['dynamodb'] = outcome
+        except Exception as e:
+            print(f"DynamoDB Sync Error: {e}")
+            for book_id in plan:
+                results[book_id]['dynamodb'] = 'error'
+        return results
+
+    @staticmethod
+    def _remove_stock(removals):
+        """Subtract book_id -> negative delta where stock stays >= 0; returns the ids left unchanged.
+
+        The batch is one guarded UPDATE; if a checkout got to some of the
+        books first it is undone and retried row by row to find them.
+        """
+        def guarded(book_ids, delta):
+            return db.session.execute(
+                update(Book).where(Book.id.in_(book_ids), Book.stock + delta >= 0)
+                .values(stock=Book.stock + delta).execution_options(synchronize_session=False)).rowcount
+
+        savepoint = db.session.begin_nested()
+        if guarded(list(removals), case(removals, value=Book.id)) == len(removals):
+            savepoint.commit()
+            return []
+        savepoint.rollback()
+        return [book_id for book_id, delta in removals.items() if not guarded([book_id], delta)]
+
+    @staticmethod
+    def _apply_sharded(book_id, op, value):
+        """Apply one planned change to a sharded title; returns its new total, or None if stock ran out."""
+        if op == 'set':
+            total = max(value - held_by_book([book_id]).get(book_id, 0), 0)
+            sharded_stock.set_total(book_id, total)
+            return total
+        if value >= 0:
+            sharded_stock.give(book_id, value)
+        elif not sharded_stock.take(book_id, -value):
+            return None
+        sharded_stock.mirror(book_id)
+        return sharded_stock.totals([book_id])[book_id]
+
     def update(self, book):
         """Update an existing book."""
         db.session.commit()
+        # Stock may have changed on an item that only lives in DynamoDB
+        catalog_cache.invalidate()
         return book
     
\ No newline at end of file
@@ -1,7 +1,20 @@
+import asyncio
 from app.extensions import db
 from app.models.order import Order
 from app_aws import DynamoOrderRepository
 
+def _dynamo_item(order):
+    return {
+        'id': str(order.id),
+        'user_id': str(order.user_id),
+        'book_id': str(order.book_id),
+        'seller_id': str(order.book.seller_id) if order.book and order.book.seller_id else "system",
+        'quantity': order.quantity,
+        'total_price': order.total_price,
+        'status': order.status,
+        'order_date': order.order_date.isoformat()
+    }
+
 class OrderRepository:
     def create(self, order):
         """Create a new order in SQL and DynamoDB."""
@@ -11,20 +24,30 @@ class OrderRepository:
         # Sync to DynamoDB
         try:
             dynamo = DynamoOrderRepository()
-            dynamo.add({
-                'id': str(order.id),
-                'user_id': str(order.user_id),
-                'book_id': str(order.book_id),
-                'seller_id': str(order.book.seller_id) if order.book and order.book.seller_id else "system",
-                'quantity': order.quantity,
-                'total_price': order.total_price,
-                'status': order.status,
-                'order_date': order.order_date.isoformat()
-            })
+            dynamo.add(_dynamo_item(order))
         except Exception as e:
             print(f"DynamoDB Sync Error: {e}")
             
         return order
+
+    def create_many(self, orders):
+        """Insert several orders (and any pending stock changes) in one SQL transaction.
+
+        DynamoDB is not touched; await `sync_to_dynamo_async` afterwards.
+        """
+        db.session.add_all(orders)
+        db.session.commit()
+        return orders
+
+    async def sync_to_dynamo_async(self, orders):
+        """Put orders into DynamoDB concurrently from worker threads."""
+        try:
+            # Build items on the request thread: order.book may lazy-load from SQL
+            items = [_dynamo_item(order) for order in orders]
+            dynamo = DynamoOrderRepository()
+            await asyncio.gather(*(asyncio.to_thread(dynamo.add, item) for item in items))
+        except Exception as e:
+            print(f"DynamoDB Sync Error: {e}")
     
     def get_by_id(self, order_id):
         """Get an order by ID."""
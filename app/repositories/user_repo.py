@@ -40,4 +40,15 @@ class UserRepository:
         except Exception as e:
             print(f"DynamoDB Read Error: {e}")
             
-        return User.query.filter_by(email=email).first()
\ No newline at end of file
+        return User.query.filter_by(email=email).first()
+
+    def update_password_hash(self, user):
+        """Persist a new password hash for a user loaded from either store."""
+        User.query.filter_by(email=user.email).update({'password_hash': user.password_hash})
+        db.session.commit()
+        
+        try:
+            dynamo = DynamoUserRepository()
+            dynamo.update_password_hash(user.id, user.password_hash)
+        except Exception as e:
+            print(f"DynamoDB Sync Error: {e}")
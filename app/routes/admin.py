@@ -1,11 +1,22 @@
-from flask import Blueprint, render_template, redirect, url_for, session, flash, request
+from flask import (Blueprint, render_template, redirect, url_for, session, flash, request, jsonify, Response,
+                   stream_with_context, stream_template, current_app, get_flashed_messages)
 from app.extensions import db
 from app.models.user import User
 from app.models.book import Book
 from app.models.order import Order
+from app.models.job import BulkJob
 from app.routes.auth import login_required
+from app.services.db_pool import read_session, pool_stats
+from app.services.export import EXPORTS, export_stream, parse_date_range
+from app.services.inventory import apply_stock_changes, read_inventory_csv
+from app.services.notification import notifications
+from app.services.order_lifecycle import InvalidTransition, JobAlreadyRunning, history, order_jobs
+from app.services.role_jobs import ROLE_CHANGES, role_jobs
+from app.services import sales_rollups
 from functools import wraps
+from datetime import datetime
 from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 
@@ -25,42 +36,64 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+LIST_FETCH_SIZE = 500       # rows fetched per round trip for the full-table lists
+STREAM_CHUNK_SIZE = 16 * 1024  # rendered bytes buffered before each write
+
+def _render_list(template, **context):
+    """Render a full-table admin list, streamed as it renders when STREAM_ADMIN_LISTS is on.
+
+    Queries passed in lazily (yield_per) are fetched while the page streams,
+    so the header and first rows leave before the last rows are read.
+    """
+    if not current_app.config.get('STREAM_ADMIN_LISTS', True):
+        return render_template(template, **context)
+    # The session cookie is written before the body streams, so take the flashes out now
+    get_flashed_messages()
+    return Response(_buffered(stream_template(template, **context)), mimetype='text/html')
+
+def _buffered(pieces):
+    """Join Jinja's many small output pieces into STREAM_CHUNK_SIZE writes."""
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= STREAM_CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
 @admin_bp.route("/dashboard")
 @admin_required
 def dashboard():
     """Admin dashboard with statistics and tracking."""
+    # Reporting queries go to the read replica when one is configured
+    reports = read_session()
     
     # Get statistics
-    total_users = User.query.filter_by(role='buyer').count()
-    total_sellers = User.query.filter_by(role='seller').count()
-    total_books = Book.query.count()
-    total_orders = Order.query.count()
+    total_users = reports.query(User).filter_by(role='buyer').count()
+    total_sellers = reports.query(User).filter_by(role='seller').count()
+    total_books = reports.query(Book).count()
     
-    # Calculate total revenue
-    total_revenue = db.session.query(func.sum(Order.total_price)).scalar() or 0
+    # Order totals come from the sales rollups, never from scanning orders
+    order_status_counts = sales_rollups.status_counts()
+    total_orders = sum(row.count for row in order_status_counts)
+    total_revenue = sales_rollups.totals()[0]
     
     # Get recent orders (last 10)
-    recent_orders = Order.query.order_by(Order.order_date.desc()).limit(10).all()
+    recent_orders = reports.query(Order).options(
+        joinedload(Order.user), joinedload(Order.book)
+    ).order_by(Order.order_date.desc()).limit(10).all()
     
     # Get low stock books (stock < 10)
-    low_stock_books = Book.query.filter(Book.stock < 10).order_by(Book.stock.asc()).all()
+    low_stock_books = reports.query(Book).filter(Book.stock < 10).order_by(Book.stock.asc()).all()
     
     # Get books by status
-    out_of_stock = Book.query.filter_by(stock=0).count()
-    in_stock = Book.query.filter(Book.stock > 0).count()
+    out_of_stock = reports.query(Book).filter_by(stock=0).count()
+    in_stock = reports.query(Book).filter(Book.stock > 0).count()
     
     # Get top selling books (books with most orders)
-    top_books = db.session.query(
-        Book.title,
-        Book.author,
-        func.count(Order.id).label('order_count')
-    ).join(Order).group_by(Book.id).order_by(func.count(Order.id).desc()).limit(5).all()
-    
-    # Get order breakdown by status
-    order_status_counts = db.session.query(
-        Order.status,
-        func.count(Order.id).label('count')
-    ).group_by(Order.status).all()
+    top_books = sales_rollups.top_books(limit=5)
     
     stats = {
         'total_users': total_users,
@@ -87,16 +120,21 @@ def dashboard():
 def users():
     """View all users or filter by role."""
     role_filter = request.args.get('role')
+    display_users = User.query.order_by(User.id)
     if role_filter in ['seller', 'buyer', 'admin']:
-        display_users = User.query.filter_by(role=role_filter).all()
+        display_users = display_users.filter_by(role=role_filter)
     else:
-        display_users = User.query.all()
         role_filter = 'all'
-        
-    return render_template("admin_users.html", 
-                         users=display_users, 
-                         current_role=role_filter,
-                         username=session.get('username'))
+    
+    # One grouped count instead of loading every user's orders
+    order_counts = dict(db.session.query(Order.user_id, func.count(Order.id)).group_by(Order.user_id).all())
+    recent_jobs = BulkJob.query.filter(BulkJob.kind.in_(ROLE_CHANGES)).order_by(BulkJob.id.desc()).limit(5).all()
+    return _render_list("admin_users.html", 
+                        users=display_users.yield_per(LIST_FETCH_SIZE), 
+                        order_counts=order_counts,
+                        current_role=role_filter,
+                        recent_jobs=recent_jobs,
+                        username=session.get('username'))
 
 @admin_bp.route("/books")
 @admin_required
@@ -124,8 +162,124 @@ def books():
 @admin_required
 def orders():
     """View all orders."""
-    all_orders = Order.query.order_by(Order.order_date.desc()).all()
-    return render_template("admin_orders.html", orders=all_orders, username=session.get('username'))
+    # Buyer, book and seller come back in the same SELECT instead of one query per row
+    all_orders = read_session().query(Order).options(
+        joinedload(Order.user),
+        joinedload(Order.book).joinedload(Book.seller)
+    ).order_by(Order.order_date.desc()).yield_per(LIST_FETCH_SIZE)
+    recent_jobs = BulkJob.query.filter(BulkJob.kind.like('orders_to_%')).order_by(BulkJob.id.desc()).limit(5).all()
+    return _render_list("admin_orders.html", orders=all_orders, recent_jobs=recent_jobs,
+                        username=session.get('username'))
+
+@admin_bp.route("/orders/bulk_status", methods=["POST"])
+@admin_required
+def bulk_order_status():
+    """Move every order matching the form (or JSON body) to a new status in a background job.
+
+    Fields: to_status, and optionally from_status, placed_before (YYYY-MM-DD)
+    and order_ids. JSON requests get the job back as JSON.
+    """
+    data = request.get_json(silent=True) or request.form
+    try:
+        placed_before = data.get('placed_before')
+        placed_before = datetime.strptime(placed_before, '%Y-%m-%d') if placed_before else None
+        order_ids = data.get('order_ids')
+        if isinstance(order_ids, str):
+            order_ids = [int(order_id) for order_id in order_ids.replace(',', ' ').split()]
+        job = order_jobs.start(data.get('to_status', ''), session.get('user_id'),
+                               from_status=data.get('from_status') or None,
+                               order_ids=order_ids, placed_before=placed_before)
+    except (InvalidTransition, ValueError, TypeError) as e:
+        if request.is_json:
+            return jsonify(error=str(e)), 409 if isinstance(e, JobAlreadyRunning) else 400
+        flash(str(e) if isinstance(e, InvalidTransition) else "Invalid bulk status request.", "error")
+        return redirect(url_for("admin.orders"))
+    except Exception as e:
+        db.session.rollback()
+        if request.is_json:
+            return jsonify(error="Could not start the bulk status change."), 500
+        flash("An error occurred while starting the bulk status change.", "error")
+        return redirect(url_for("admin.orders"))
+    if request.is_json:
+        return jsonify(job.to_dict()), 202
+    flash(f"Bulk job #{job.id} is updating {job.total} orders in the background.", "success")
+    return redirect(url_for("admin.orders"))
+
+@admin_bp.route("/orders/<int:order_id>/history")
+@admin_required
+def order_history(order_id):
+    """Status changes of an order as JSON."""
+    return jsonify([{'from_status': change.from_status, 'to_status': change.to_status,
+                     'changed_by': change.changed_by, 'changed_at': change.changed_at.isoformat()}
+                    for change in history(order_id)])
+
+# granularity -> number of buckets charted, ending with the current one
+ANALYTICS_WINDOWS = {'hour': 48, 'day': 30, 'month': 12}
+
+@admin_bp.route("/analytics")
+@admin_required
+def analytics():
+    """Sales charts read from the hourly/daily/monthly rollups."""
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in ANALYTICS_WINDOWS:
+        granularity = 'day'
+    end = sales_rollups.next_bucket(sales_rollups.bucket_start(datetime.utcnow(), granularity), granularity)
+    start = end
+    for _ in range(ANALYTICS_WINDOWS[granularity]):
+        start = sales_rollups.previous_bucket(start, granularity)
+    
+    points = sales_rollups.series(granularity, start, end)
+    sellers = sales_rollups.breakdown('seller', granularity, start, end)
+    seller_ids = [int(key) for key, *_ in sellers if key.isdigit()]
+    seller_names = dict(read_session().query(User.id, User.username).filter(User.id.in_(seller_ids)).all())
+    return render_template("admin_analytics.html",
+                           granularity=granularity,
+                           points=points,
+                           peak=max(point[1] for point in points) or 1,
+                           totals=sales_rollups.totals(granularity=granularity, start=start, end=end),
+                           statuses=sales_rollups.status_counts(granularity, start, end),
+                           sellers=[(seller_names.get(int(key), key) if key.isdigit() else key, *rest)
+                                    for key, *rest in sellers],
+                           books=sales_rollups.top_books(10, granularity, start, end),
+                           username=session.get('username'))
+
+@admin_bp.route("/db-pool")
+@admin_required
+def db_pool():
+    """Connection pool usage per database (checked out, overflow, wait times)."""
+    return jsonify(pool_stats())
+
+@admin_bp.route("/notifications")
+@admin_required
+def notification_stats():
+    """Notifications queued vs published (and SNS calls made) by this worker."""
+    return jsonify(notifications.stats())
+
+@admin_bp.route("/export/<kind>")
+@admin_required
+def export(kind):
+    """Stream orders, users or books as CSV or NDJSON.
+
+    Query args: format=csv|ndjson, source=sql|dynamodb, gzip=1,
+    from/to=YYYY-MM-DD (inclusive, on order_date or created_at).
+    """
+    fmt = request.args.get('format', 'csv')
+    source = request.args.get('source', 'sql')
+    compress = request.args.get('gzip') == '1'
+    if kind not in EXPORTS or fmt not in ('csv', 'ndjson') or source not in ('sql', 'dynamodb'):
+        return jsonify(error="Unknown export, format or source."), 400
+    try:
+        start, end = parse_date_range(request.args.get('from'), request.args.get('to'))
+    except ValueError:
+        return jsonify(error="Dates must be YYYY-MM-DD."), 400
+
+    filename = f"bookbazaar-{kind}.{fmt}" + (".gz" if compress else "")
+    mimetype = 'application/gzip' if compress else ('text/csv' if fmt == 'csv' else 'application/x-ndjson')
+    # stream_with_context keeps the app context (and DB session) open while rows are sent
+    body = stream_with_context(export_stream(kind, fmt, source, start, end, compress))
+    return Response(body, mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"',
+                             'Cache-Control': 'no-store'})
 
 @admin_bp.route("/books/add", methods=["POST"])
 @admin_required
@@ -172,21 +326,60 @@ def update_stock(book_id):
 
         amount = int(request.form.get("stock", 0))
         action = request.form.get("action", "set")  # Default to 'set' for safety
+        if action == "set" and amount < 0:
+            flash("Stock cannot be set below zero.", "error")
+            return redirect(url_for("admin.books"))
         
-        if action == "add":
-            book.stock += amount
-            message = f'Added {amount} units to "{book.title}". Total: {book.stock}'
-        else:
-            book.stock = amount
-            message = f'Stock updated for "{book.title}" to {amount} units.'
+        # Core UPDATEs: 'add' is relative to the stored value and 'set' leaves cart holds out
+        from app.repositories.book_repo import BookRepository
+        result = BookRepository().bulk_update_stock([(book.id, "add" if action == "add" else "set", amount)])[book.id]
+        if result['status'] != 'updated':
+            flash("Stock cannot go below zero.", "error")
+            return redirect(url_for("admin.books"))
+        message = (f'Added {amount} units to "{book.title}". Total: {result["stock"]}' if action == "add"
+                   else f'Stock updated for "{book.title}" to {amount} units on hand '
+                        f'({result["stock"]} available after cart holds).')
             
-        db.session.commit()
         flash(message, "success")
         return redirect(url_for("admin.books"))
     except Exception as e:
         flash("An error occurred while updating stock.", "error")
         return redirect(url_for("admin.books"))
 
+@admin_bp.route("/inventory/bulk", methods=["POST"])
+@admin_required
+def bulk_inventory():
+    """Apply many stock changes from JSON: {"updates": [{"book_id", "action", "amount"}, ...]}."""
+    from app.repositories.book_repo import BookRepository
+    payload = request.get_json(silent=True) or {}
+    updates = payload.get('updates')
+    if not isinstance(updates, list) or not updates:
+        return jsonify(error="Expected a JSON body with a non-empty 'updates' list."), 400
+
+    rows = apply_stock_changes(BookRepository(), [u if isinstance(u, dict) else {} for u in updates])
+    return jsonify(updated=sum(row['status'] == 'updated' for row in rows), results=rows)
+
+@admin_bp.route("/inventory/upload", methods=["POST"])
+@admin_required
+def upload_inventory():
+    """Apply a CSV of stock changes (book_id,action,amount) and show per-row results."""
+    from app.repositories.book_repo import BookRepository
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        flash("Choose a CSV file to upload.", "error")
+        return redirect(url_for("admin.books"))
+    try:
+        records = read_inventory_csv(upload)
+    except (ValueError, UnicodeDecodeError) as e:
+        flash(f"Could not read the CSV: {e}", "error")
+        return redirect(url_for("admin.books"))
+
+    rows = apply_stock_changes(BookRepository(), records)
+    updated = sum(row['status'] == 'updated' for row in rows)
+    flash(f"Inventory upload: {updated} of {len(rows)} rows applied.", "success" if updated == len(rows) else "warning")
+    return render_template("admin_inventory_results.html", rows=rows, filename=upload.filename,
+                           username=session.get('username'))
+
 @admin_bp.route("/users/promote/<int:user_id>", methods=["POST"])
 @admin_required
 def promote_user(user_id):
@@ -281,36 +474,29 @@ def validate_user(user_id):
 @admin_bp.route("/users/bulk_promote_sellers", methods=["POST"])
 @admin_required
 def bulk_promote_sellers():
-    """Promote all buyers to validated sellers."""
-    try:
-        # Update all buyers to sellers and validate them
-        affected = User.query.filter_by(role='buyer').update({
-            "role": 'seller',
-            "is_validated": True
-        })
-        db.session.commit()
-        flash(f"Success! {affected} users promoted to Validated Sellers.", "success")
-        return redirect(url_for("admin.users"))
-    except Exception as e:
-        db.session.rollback()
-        flash("An error occurred while bulk promoting users.", "error")
-        return redirect(url_for("admin.users"))
+    """Promote all buyers to validated sellers (background job, synced to DynamoDB)."""
+    return _start_role_job('promote_sellers')
 
 @admin_bp.route("/users/bulk_reset_buyers", methods=["POST"])
 @admin_required
 def bulk_reset_buyers():
-    """Reset all non-admins to buyers."""
+    """Reset all non-admins to buyers (background job, synced to DynamoDB)."""
+    return _start_role_job('reset_buyers')
+
+def _start_role_job(kind):
     try:
-        current_admin_id = session.get('user_id')
-        # Update all users except the current admin to buyers
-        affected = User.query.filter(User.id != current_admin_id).update({
-            "role": 'buyer',
-            "is_validated": False
-        })
-        db.session.commit()
-        flash(f"Success! {affected} users reset to Buyers.", "success")
-        return redirect(url_for("admin.users"))
+        job = role_jobs.start(kind, session.get('user_id'))
+        flash(f"Bulk job #{job.id} is updating {job.total} users in the background.", "success")
     except Exception as e:
         db.session.rollback()
-        flash("An error occurred while bulk resetting users.", "error")
-        return redirect(url_for("admin.users"))
+        flash("An error occurred while starting the bulk update.", "error")
+    return redirect(url_for("admin.users"))
+
+@admin_bp.route("/jobs/<int:job_id>")
+@admin_required
+def job_status(job_id):
+    """Progress of a bulk job as JSON."""
+    job = db.session.get(BulkJob, job_id)
+    if not job:
+        return jsonify(error="Job not found."), 404
+    return jsonify(job.to_dict())
@@ -1,5 +1,7 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, current_app
 from app.services.auth_service import AuthService
+from app.services.password_hasher import HasherBusy
+from app.services.rate_limit import login_limiter
 from functools import wraps
 
 auth_bp = Blueprint("auth", __name__)
@@ -12,7 +14,8 @@ def login_required(f):
         if 'user_id' not in session:
             flash('Please log in to access this page.', 'error')
             return redirect(url_for('auth.login'))
-        return f(*args, **kwargs)
+        # ensure_sync lets the decorator wrap async views too
+        return current_app.ensure_sync(f)(*args, **kwargs)
     return decorated_function
 
 @auth_bp.route("/", methods=["GET"])
@@ -37,10 +40,20 @@ def register():
 @auth_bp.route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
-        user = service.login(
-            request.form.get("email"),
-            request.form.get("password")
-        )
+        email = (request.form.get("email") or '').strip().lower()
+        # Throttled attempts never reach UserRepository or the password hasher
+        if not login_limiter.allow_attempt(request.remote_addr, email):
+            flash('Too many login attempts. Please wait a minute and try again.', 'error')
+            return render_template("login.html"), 429
+        
+        try:
+            user = service.login(
+                request.form.get("email"),
+                request.form.get("password")
+            )
+        except HasherBusy:
+            flash('Too many login attempts right now. Please try again in a moment.', 'error')
+            return render_template("login.html"), 503
 
         if user:
             session['user_id'] = user.id
@@ -56,6 +69,7 @@ def login():
             
             return redirect(url_for('bookstore.books'))
 
+        login_limiter.record_failure(email)
         flash('Invalid email or password', 'error')
         return render_template("login.html")
 
@@ -69,12 +83,21 @@ def logout():
 
 @auth_bp.route("/dashboard")
 @login_required
-def dashboard():
+async def dashboard():
     from app.repositories.order_repo import OrderRepository
-    from app.models.user import User
+    from app.repositories.book_repo import BookRepository
+    from sqlalchemy.orm.attributes import set_committed_value
     
     order_repo = OrderRepository()
     user_id = session.get('user_id')
     orders = order_repo.get_user_orders(user_id)
     
+    # Orders read from DynamoDB carry no book; fetch those books concurrently
+    missing = list({order.book_id for order in orders if order.book is None})
+    if missing:
+        books = await BookRepository().get_many_async(missing)
+        for order in orders:
+            if order.book is None:
+                set_committed_value(order, 'book', books.get(order.book_id))
+    
     return render_template("dashboard.html", orders=orders, username=session.get('username'))
@@ -1,39 +1,86 @@
-from flask import Blueprint, render_template, redirect, url_for, session, flash, request
+import asyncio
+import hashlib
+from flask import Blueprint, render_template, redirect, url_for, session, flash, request, make_response
+from markupsafe import Markup
+from app.extensions import db
 from app.repositories.book_repo import BookRepository
 from app.repositories.order_repo import OrderRepository
 from app.models.order import Order
-from app.services.notification import NotificationService
+from app.services.notification import notifications
+from app.services.render_cache import catalog_cache
+from app.services.sqlite_tuning import sqlite_tuner
+from app.services.order_lifecycle import InvalidTransition, transition
+from app.services.reservations import reservations
+from app.services.stock_shards import sharded_stock
 from app.routes.auth import login_required
+from app_aws import price_bucket_labels
 
 bookstore_bp = Blueprint("bookstore", __name__)
 book_repo = BookRepository()
 order_repo = OrderRepository()
-notifier = NotificationService()
+notifier = notifications
+
+BOOKS_PER_PAGE = 8  # Show 8 books per page
+
+def render_books_grid(query, page, per_page, token, filters):
+    """Return the (html, etag) of the shared book grid fragment, from cache when fresh."""
+    def render_grid():
+        if query:
+            pagination = book_repo.search_paginated(query, page, per_page)
+        elif any(filters.values()):
+            pagination = book_repo.browse_paginated(filters, page, per_page, token=token)
+        else:
+            pagination = book_repo.get_all_paginated(page, per_page, token=token)
+        return render_template("books_grid.html",
+                               books=pagination.items,
+                               pagination=pagination,
+                               query=query,
+                               filters=filters)
+
+    # The grid is shared by all users; only the nav bar is per-user
+    cache_key = (token, query, per_page, page, tuple(sorted(filters.items())))
+    return catalog_cache.get_or_render(cache_key, render_grid)
 
 @bookstore_bp.route("/books", methods=["GET"])
 @login_required
 def books():
-    """Display books with optional search filtering and pagination."""
+    """Display books with optional search, browse filters and pagination."""
     query = request.args.get('q', '')
     page = request.args.get('page', 1, type=int)
     token = request.args.get('token')
-    per_page = 8  # Show 8 books per page
+    per_page = BOOKS_PER_PAGE
+    filters = {
+        'author': request.args.get('author', '').strip(),
+        'genre': request.args.get('genre', '').strip(),
+        'price': request.args.get('price', '').strip()
+    }
+    if filters['price'] not in price_bucket_labels():
+        filters['price'] = ''
     
-    if query:
-        pagination = book_repo.search_paginated(query, page, per_page)
-    else:
-        pagination = book_repo.get_all_paginated(page, per_page, token=token)
+    grid_html, grid_etag = render_books_grid(query, page, per_page, token, filters)
     
     # Get cart count for display
     cart = session.get('cart', {})
     cart_count = sum(cart.values())
     
-    return render_template("books.html", 
-                         books=pagination.items, 
-                         pagination=pagination,
-                         username=session.get('username'),
-                         query=query,
-                         cart_count=cart_count)
+    etag = hashlib.sha1(
+        f"{grid_etag}:{session.get('user_id')}:{session.get('user_role')}:{cart_count}".encode('utf-8')
+    ).hexdigest()
+    # Pending flash messages are part of the page, so never answer 304 with them queued
+    # Compressed responses carry the ETag as weak, so compare weakly
+    if request.if_none_match.contains_weak(etag) and not session.get('_flashes'):
+        response = make_response('', 304)
+    else:
+        response = make_response(render_template("books.html", 
+                                 grid_html=Markup(grid_html),
+                                 username=session.get('username'),
+                                 query=query,
+                                 filters=filters,
+                                 price_buckets=price_bucket_labels(),
+                                 cart_count=cart_count))
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 @bookstore_bp.route("/cart/add/<int:book_id>", methods=["POST"])
 @login_required
@@ -44,12 +91,13 @@ def add_to_cart(book_id):
         flash('Book not found.', 'error')
         return redirect(url_for('bookstore.books'))
     
-    if book.stock < 1:
+    cart = session.get('cart', {})
+    book_id_str = str(book_id)
+    # Reserve the copy now, so a sold-out title is reported here rather than at checkout
+    if not reservations.hold(session.get('user_id'), book, cart.get(book_id_str, 0) + 1):
         flash('Sorry, this book is out of stock.', 'error')
         return redirect(url_for('bookstore.books'))
     
-    cart = session.get('cart', {})
-    book_id_str = str(book_id)
     cart[book_id_str] = cart.get(book_id_str, 0) + 1
     session['cart'] = cart
     session.modified = True
@@ -57,16 +105,14 @@ def add_to_cart(book_id):
     flash(f'"{book.title}" added to cart.', 'success')
     return redirect(url_for('bookstore.books'))
 
-@bookstore_bp.route("/cart")
-@login_required
-def view_cart():
-    """Display the contents of the shopping cart."""
-    cart = session.get('cart', {})
+async def _load_cart_items(cart):
+    """Resolve cart entries to books concurrently and price them."""
+    books = await book_repo.get_many_async([int(book_id_str) for book_id_str in cart])
     cart_items = []
     total_price = 0
     
     for book_id_str, quantity in cart.items():
-        book = book_repo.get_by_id(int(book_id_str))
+        book = books.get(int(book_id_str))
         if book:
             item_total = book.price * quantity
             total_price += item_total
@@ -75,6 +121,14 @@ def view_cart():
                 'quantity': quantity,
                 'item_total': item_total
             })
+    return cart_items, total_price
+
+@bookstore_bp.route("/cart")
+@login_required
+async def view_cart():
+    """Display the contents of the shopping cart."""
+    cart = session.get('cart', {})
+    cart_items, total_price = await _load_cart_items(cart)
     
     return render_template("cart.html", cart_items=cart_items, total_price=total_price)
 
@@ -82,6 +136,7 @@ def view_cart():
 @login_required
 def remove_from_cart(book_id):
     """Remove a book from the cart."""
+    reservations.release(session.get('user_id'), book_id)
     cart = session.get('cart', {})
     book_id_str = str(book_id)
     if book_id_str in cart:
@@ -100,10 +155,14 @@ def update_cart(book_id):
         if quantity < 1:
             return remove_from_cart(book_id)
             
+        user_id = session.get('user_id')
         book = book_repo.get_by_id(book_id)
-        if quantity > book.stock:
-            flash(f'Only {book.stock} units available.', 'warning')
-            quantity = book.stock
+        if not reservations.hold(user_id, book, quantity):
+            available = reservations.held(user_id).get(book_id, 0) + sharded_stock.available(book)
+            flash(f'Only {available} units available.', 'warning')
+            quantity = available
+            if quantity < 1 or not reservations.hold(user_id, book, quantity):
+                return remove_from_cart(book_id)
             
         cart = session.get('cart', {})
         cart[str(book_id)] = quantity
@@ -115,64 +174,65 @@ def update_cart(book_id):
 
 @bookstore_bp.route("/checkout", methods=["GET", "POST"])
 @login_required
-def checkout():
+async def checkout():
     """Handle checkout review (GET) and order finalization (POST)."""
     cart = session.get('cart', {})
     if not cart:
         flash('Your cart is empty.', 'error')
         return redirect(url_for('bookstore.books'))
     
-    cart_items = []
-    total_price = 0
-    for book_id_str, quantity in cart.items():
-        book = book_repo.get_by_id(int(book_id_str))
-        if book:
-            item_total = book.price * quantity
-            total_price += item_total
-            cart_items.append({
-                'book': book,
-                'quantity': quantity,
-                'item_total': item_total
-            })
+    cart_items, total_price = await _load_cart_items(cart)
+    user_id = session.get('user_id')
 
     if request.method == "GET":
-        return render_template("checkout.html", cart_items=cart_items, total_price=total_price)
+        # Opening the review reserves every item again for the full hold period
+        short = [item['book'].title for item in cart_items
+                 if not reservations.hold(user_id, item['book'], item['quantity'])]
+        if short:
+            flash(f'Not enough stock left for: {", ".join(short)}. Please update your cart.', 'warning')
+        return render_template("checkout.html", cart_items=cart_items, total_price=total_price,
+                               hold_expires_at=reservations.expires_at(user_id) if reservations.enabled else None)
 
     # POST logic - finalize order
-    user_id = session.get('user_id')
     user_email = session.get('email')
+    orders = []
     orders_placed = []
     
     try:
-        for item in cart_items:
-            book = item['book']
-            quantity = item['quantity']
-            
-            if book.stock < quantity:
-                flash(f'Issue with book "{book.title}": insufficient stock.', 'error')
-                return redirect(url_for('bookstore.view_cart'))
+        # Stock check and decrement are one write transaction; on SQLite it is
+        # queued and re-reads stock under the write lock
+        with sqlite_tuner.serialized_write():
+            for item in cart_items:
+                book = item['book']
+                quantity = item['quantity']
+                
+                # Converts the cart's hold, or takes the units with a conditional write
+                if not reservations.claim(user_id, book.id, quantity):
+                    db.session.rollback()
+                    flash(f'Issue with book "{book.title}": insufficient stock.', 'error')
+                    return redirect(url_for('bookstore.view_cart'))
+                
+                orders.append(Order(
+                    user_id=user_id,
+                    book_id=book.id,
+                    quantity=quantity,
+                    total_price=item['item_total'],
+                    status='Placed'
+                ))
+                orders_placed.append(book.title)
             
-            # Create order
-            order = Order(
-                user_id=user_id,
-                book_id=book.id,
-                quantity=quantity,
-                total_price=item['item_total'],
-                status='Placed'
-            )
-            order_repo.create(order)
-            
-            # Update stock
-            book.stock -= quantity
-            book_repo.update(book)
-            orders_placed.append(book.title)
+            # Orders and stock commit together; DynamoDB sync and SNS then run concurrently
+            order_repo.create_many(orders)
+        catalog_cache.invalidate()
+        await asyncio.gather(
+            order_repo.sync_to_dynamo_async(orders),
+            notifier.send_async(user_email, f"Order placed for: {', '.join(orders_placed)}")
+        )
         
         # Clear cart
         session['cart'] = {}
         session.modified = True
         
-        # Send notification
-        notifier.send(user_email, f"Order placed for: {', '.join(orders_placed)}")
         flash('Your order has been placed successfully!', 'success')
         return redirect(url_for('auth.dashboard'))
             
@@ -190,14 +250,14 @@ def place_order(book_id):
             flash('Book not found.', 'error')
             return redirect(url_for('bookstore.books'))
         
-        if book.stock < 1:
-            flash('Sorry, this book is out of stock.', 'error')
-            return redirect(url_for('bookstore.books'))
-        
         # Add to cart (or replace cart if we want "direct buy" to be exclusive, 
         # but usually it just adds and goes to checkout)
         cart = session.get('cart', {})
         book_id_str = str(book_id)
+        if not reservations.hold(session.get('user_id'), book, cart.get(book_id_str, 0) + 1):
+            flash('Sorry, this book is out of stock.', 'error')
+            return redirect(url_for('bookstore.books'))
+        
         cart[book_id_str] = cart.get(book_id_str, 0) + 1
         session['cart'] = cart
         session.modified = True
@@ -233,19 +293,14 @@ def cancel_order(order_id):
             flash('Order not found.', 'error')
             return redirect(url_for('auth.dashboard'))
         
-        if order.status != 'Placed':
+        # Marks it cancelled, records the change and restores the book's stock.
+        # Buyers can only cancel before processing starts.
+        try:
+            transition(order.id, 'Cancelled', actor_id=user_id, from_status='Placed')
+        except InvalidTransition:
             flash('This order cannot be cancelled as it is already being processed.', 'warning')
             return redirect(url_for('auth.dashboard'))
-        
-        # Update order status
-        order.status = 'Cancelled'
-        order_repo.update(order)
-        
-        # Restore book stock
-        book = book_repo.get_by_id(order.book_id)
-        if book:
-            book.stock += order.quantity
-            book_repo.update(book)
+        book = order.book
         
         # Send notification
         user_email = session.get('email')
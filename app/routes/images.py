@@ -0,0 +1,46 @@
+import os
+from flask import Blueprint, abort, request, send_file, url_for
+from app.repositories.book_repo import BookRepository
+from app.services.images import FORMATS, WIDTHS, ImageError, bucket_width, image_cache, source_version
+
+images_bp = Blueprint("images", __name__)
+book_repo = BookRepository()
+
+# Links carry ?v=<source fingerprint>, so a given URL always names the same bytes
+IMMUTABLE = 'public, max-age=31536000, immutable'
+UNVERSIONED = 'public, max-age=300'
+
+def _image_url(book):
+    if not book:
+        return ''
+    image_url = book.get('image_url') if isinstance(book, dict) else book.image_url
+    return (image_url or '').strip()
+
+@images_bp.app_template_global()
+def thumbnail_url(book, width=WIDTHS[1]):
+    """Versioned /img link for a book cover at one of the bucket widths."""
+    book_id = book.get('id') if isinstance(book, dict) else book.id
+    return url_for('images.thumbnail', book_id=book_id, w=bucket_width(width), v=source_version(_image_url(book)))
+
+@images_bp.app_template_global()
+def thumbnail_srcset(book, widths=WIDTHS):
+    return ", ".join(f"{thumbnail_url(book, width)} {width}w" for width in widths)
+
+@images_bp.route("/img/<int:book_id>")
+def thumbnail(book_id):
+    """Serve a resized cover (WebP when the browser accepts it, else JPEG)."""
+    image_url = _image_url(book_repo.get_by_id(book_id))
+    if not image_url:
+        abort(404)
+    width = bucket_width(request.args.get('w', WIDTHS[1], type=int))
+    fmt = 'webp' if 'image/webp' in request.headers.get('Accept', '') else 'jpeg'
+    try:
+        path = image_cache.thumbnail(image_url, width, fmt)
+    except ImageError as e:
+        print(f"Image Proxy Error: {e}")
+        abort(404)
+
+    response = send_file(path, mimetype=FORMATS[fmt], etag=os.path.basename(path), conditional=True)
+    response.headers['Cache-Control'] = IMMUTABLE if request.args.get('v') == source_version(image_url) else UNVERSIONED
+    response.vary.add('Accept')
+    return response
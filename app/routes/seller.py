@@ -5,10 +5,15 @@ from app.models.book import Book
 from app.models.order import Order
 from app.routes.auth import login_required
 from functools import wraps
+from sqlalchemy.orm import contains_eager, joinedload
+from app.services import seller_analytics
 from app_aws import aws_app
 
 seller_bp = Blueprint("seller", __name__, url_prefix="/seller")
 
+BOOKS_PER_PAGE = 20
+SALES_PER_PAGE = 25
+
 def seller_required(f):
     """Decorator to require seller role for routes."""
     @wraps(f)
@@ -30,15 +35,18 @@ def seller_required(f):
 def dashboard():
     """Seller dashboard with their own books."""
     user_id = session.get('user_id')
-    my_books = Book.query.filter_by(seller_id=user_id).all()
+    page = request.args.get('page', 1, type=int)
+    pagination = Book.query.filter_by(seller_id=user_id).order_by(Book.id.desc()).paginate(
+        page=page, per_page=BOOKS_PER_PAGE, error_out=False)
     
-    # Calculate some stats for the seller
-    total_stock = sum(book.stock for book in my_books)
+    # Stats are SQL aggregates, not sums over every listing
+    inventory = seller_analytics.inventory_summary(user_id)
     
     return render_template(
         "seller_dashboard.html",
-        books=my_books,
-        total_stock=total_stock,
+        books=pagination.items,
+        pagination=pagination,
+        inventory=inventory,
         user=User.query.get(user_id),
         username=session.get('username')
     )
@@ -113,19 +121,20 @@ def sales():
     try:
         user_id = session.get('user_id')
         
-        # Get all books owned by this seller
-        my_book_ids = [b.id for b in Book.query.filter_by(seller_id=user_id).all()]
-        
-        # Get all orders for those books
-        my_sales = Order.query.filter(Order.book_id.in_(my_book_ids)).order_by(Order.order_date.desc()).all()
+        page = request.args.get('page', 1, type=int)
         
-        # Calculate total revenue for this seller
-        total_revenue = sum(sale.total_price for sale in my_sales)
+        # One page of orders for this seller's books, with the book (from the join) and buyer loaded in one query
+        pagination = Order.query.join(Order.book).filter(Book.seller_id == user_id).options(
+            contains_eager(Order.book), joinedload(Order.user)
+        ).order_by(Order.order_date.desc()).paginate(page=page, per_page=SALES_PER_PAGE, error_out=False)
         
         return render_template(
             "seller_orders.html",
-            sales=my_sales,
-            total_revenue=total_revenue,
+            sales=pagination.items,
+            pagination=pagination,
+            summary=seller_analytics.sales_summary(user_id),
+            monthly=seller_analytics.revenue_by_month(user_id),
+            top_titles=seller_analytics.top_titles(user_id),
             user=User.query.get(user_id),
             username=session.get('username')
         )
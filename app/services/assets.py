@@ -0,0 +1,164 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import tempfile
+from flask import request, send_file
+
+# Text assets worth precompressing; images and fonts are already compressed
+COMPRESSIBLE = {'.css', '.js', '.svg', '.json', '.map', '.txt', '.html', '.xml', '.ico'}
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:  # gzip only
+        return None
+    return brotli
+
+def _atomic_write(path, content, mode='wb'):
+    """Write `path` through a temporary file of this process's own, then rename it into place.
+
+    Workers building at the same time each rename a complete file, so readers
+    never see a partial one and no worker loses its temporary file to another.
+    """
+    with tempfile.NamedTemporaryFile(mode, dir=os.path.dirname(path), prefix=os.path.basename(path) + '.',
+                                     suffix='.tmp', delete=False) as handle:
+        handle.write(content)
+    try:
+        os.replace(handle.name, path)
+    except OSError:
+        os.unlink(handle.name)
+        raise
+
+def hashed_name(filename, digest):
+    """css/style.css -> css/style.<digest>.css"""
+    root, ext = os.path.splitext(filename)
+    return f"{root}.{digest}{ext}"
+
+class AssetPipeline:
+    """Content-hashed, precompressed copies of the static folder.
+
+    Each file under static/ is copied to the build directory as
+    name.<hash>.ext, plus .gz/.br siblings for text assets when they come
+    out smaller. A manifest maps logical names to hashed ones, so
+    url_for('static', filename='css/style.css') links to the hashed copy,
+    which is served as immutable with the best encoding the client accepts.
+    Files missing from the manifest are served from static/ as before.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.build_dir = None
+        self.static_folder = None
+        self.manifest = {}  # logical name -> {'hashed': ..., 'sha256': ..., 'encodings': [...]}
+        self._hashed = {}   # hashed name -> (logical name, manifest entry)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('STATIC_FINGERPRINT', True)
+        if not self.enabled:
+            return
+        # Without a configured directory, one temporary build is shared by every app in the process
+        self.build_dir = app.config.get('STATIC_BUILD_DIR') or (
+            self.build_dir if self.build_dir and self.build_dir.startswith(tempfile.gettempdir())
+            else tempfile.mkdtemp(prefix='bookbazaar-assets-'))
+        self.static_folder = app.static_folder
+        self.build()
+
+        app.url_defaults(self._rewrite_static_url)
+        send_static_file = app.view_functions['static']
+
+        def static(filename):
+            if filename in self._hashed:
+                return self._send_hashed(filename)
+            return send_static_file(filename=filename)
+        app.view_functions['static'] = static
+
+    def build(self, report=None):
+        """Fingerprint and compress every static file whose content changed since the last build."""
+        manifest_path = os.path.join(self.build_dir, 'manifest.json')
+        try:
+            with open(manifest_path) as handle:
+                previous = json.load(handle)
+        except (OSError, ValueError):
+            previous = {}
+
+        manifest = {}
+        for directory, _, files in os.walk(self.static_folder):
+            for file_name in files:
+                source = os.path.join(directory, file_name)
+                logical = os.path.relpath(source, self.static_folder).replace(os.sep, '/')
+                with open(source, 'rb') as handle:
+                    data = handle.read()
+                sha256 = hashlib.sha256(data).hexdigest()
+                entry = previous.get(logical)
+                if not (entry and entry['sha256'] == sha256 and self._outputs_exist(entry)):
+                    entry = self._write(logical, data, sha256)
+                    if report:
+                        report(f"  {logical} -> {entry['hashed']} ({', '.join(entry['encodings']) or 'identity'})")
+                manifest[logical] = entry
+
+        _atomic_write(manifest_path, json.dumps(manifest, indent=1, sort_keys=True), mode='w')
+        self.manifest = manifest
+        self._hashed = {entry['hashed']: (logical, entry) for logical, entry in manifest.items()}
+        return manifest
+
+    def _outputs_exist(self, entry):
+        names = [entry['hashed']] + [f"{entry['hashed']}.{encoding}" for encoding in entry['encodings']]
+        return all(os.path.exists(os.path.join(self.build_dir, name)) for name in names)
+
+    def _write(self, logical, data, sha256):
+        hashed = hashed_name(logical, sha256[:12])
+        target = os.path.join(self.build_dir, hashed)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        outputs = {'': data}
+        if os.path.splitext(logical)[1].lower() in COMPRESSIBLE:
+            outputs['gz'] = gzip.compress(data, compresslevel=9, mtime=0)
+            brotli = _brotli()
+            if brotli:
+                outputs['br'] = brotli.compress(data, quality=11)
+        encodings = []
+        for suffix, content in outputs.items():
+            if suffix and len(content) >= len(data):
+                continue
+            path = f"{target}.{suffix}" if suffix else target
+            _atomic_write(path, content)
+            if suffix:
+                encodings.append(suffix)
+        return {'hashed': hashed, 'sha256': sha256, 'encodings': encodings}
+
+    def _rewrite_static_url(self, endpoint, values):
+        if endpoint == 'static':
+            entry = self.manifest.get(values.get('filename'))
+            if entry:
+                values['filename'] = entry['hashed']
+
+    def _send_hashed(self, filename):
+        logical, entry = self._hashed[filename]
+        accepted = request.accept_encodings
+        encoding = next((name for name, suffix in (('br', 'br'), ('gzip', 'gz'))
+                         if suffix in entry['encodings'] and accepted[name]), None)
+        path = os.path.join(self.build_dir, filename)
+        if encoding:
+            path += '.br' if encoding == 'br' else '.gz'
+        mimetype = mimetypes.guess_type(logical)[0] or 'application/octet-stream'
+        response = send_file(path, mimetype=mimetype, etag=f"{entry['sha256'][:12]}-{encoding or 'identity'}",
+                             conditional=True)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Cache-Control'] = IMMUTABLE
+        response.vary.add('Accept-Encoding')
+        return response
+
+# Shared instance, configured by create_app
+assets = AssetPipeline()
+
+def build_assets_command():
+    """Fingerprint and precompress static files into STATIC_BUILD_DIR."""
+    if not assets.enabled:
+        print("STATIC_FINGERPRINT is off; nothing to build.")
+        return
+    print("Building static assets...")
+    manifest = assets.build(report=print)
+    print(f"✓ {len(manifest)} assets in {assets.build_dir}")
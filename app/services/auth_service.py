@@ -1,5 +1,7 @@
 from app.models.user import User
 from app.repositories.user_repo import UserRepository
+from app.services.password_hasher import hasher
+from app.services.rate_limit import unknown_emails
 
 repo = UserRepository()
 
@@ -11,9 +13,20 @@ class AuthService:
         )
         user.set_password(data["password"])
         repo.create(user)
+        unknown_emails.discard(user.email)
 
     def login(self, email, password):
+        if email in unknown_emails:
+            return None
+        
         user = repo.get_by_email(email)
-        if user and user.check_password(password):
+        if user is None:
+            unknown_emails.add(email)
+            return None
+        if user.check_password(password):
+            # Upgrade hashes made with older algorithm/cost settings
+            if hasher.needs_rehash(user.password_hash):
+                user.set_password(password)
+                repo.update_password_hash(user)
             return user
         return None
\ No newline at end of file
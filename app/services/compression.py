@@ -0,0 +1,100 @@
+import gzip
+import zlib
+from flask import request
+
+COMPRESSIBLE_TYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript', 'application/javascript',
+    'application/json', 'application/x-ndjson', 'application/xml', 'image/svg+xml',
+}
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:  # gzip only
+        return None
+    return brotli
+
+class ResponseCompressor:
+    """gzip/brotli Content-Encoding for text responses, negotiated per request.
+
+    Buffered responses are compressed when at least `min_size` bytes.
+    Streamed responses are compressed chunk by chunk with a flush after each
+    one, so compression never holds back bytes the application has already
+    produced. Responses that are already encoded, or file responses sent by
+    send_file (covers, fingerprinted assets), are left alone.
+    """
+
+    def __init__(self, min_size=1024, gzip_level=6, brotli_quality=5):
+        self.enabled = False
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def init_app(self, app):
+        self.enabled = app.config.get('COMPRESS_RESPONSES', True)
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', self.min_size)
+        self.gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', self.gzip_level)
+        self.brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', self.brotli_quality)
+        if self.enabled:
+            app.after_request(self.compress)
+
+    def _encoding(self):
+        accepted = request.accept_encodings
+        if accepted['br'] and _brotli():
+            return 'br'
+        if accepted['gzip']:
+            return 'gzip'
+        return None
+
+    def compress(self, response):
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_TYPES
+                or request.method == 'HEAD'):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = self._encoding()
+        if not encoding:
+            return response
+
+        if response.is_streamed:
+            response.response = self._stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            if encoding == 'br':
+                response.set_data(_brotli().compress(data, quality=self.brotli_quality))
+            else:
+                response.set_data(gzip.compress(data, compresslevel=self.gzip_level, mtime=0))
+        response.headers['Content-Encoding'] = encoding
+        # The encoded body differs byte-for-byte, so only a weak validator still holds
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def _stream(self, chunks, encoding):
+        if encoding == 'br':
+            compressor = _brotli().Compressor(quality=self.brotli_quality)
+            compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+        else:
+            compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)  # wbits=31: gzip container
+            compress, finish = compressor.compress, compressor.flush
+            flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                data = compress(chunk) + flush()
+                if data:
+                    yield data
+            yield finish()
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+# Shared instance, configured by create_app
+compressor = ResponseCompressor()
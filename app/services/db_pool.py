@@ -0,0 +1,104 @@
+import threading
+import time
+from flask import current_app, g
+from flask_sqlalchemy.query import Query
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+from app.extensions import db
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that records how long callers wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = {'checkouts': 0, 'wait_total_ms': 0.0, 'wait_max_ms': 0.0,
+                        'timeouts': 0, 'invalidated': 0}
+        self._metrics_lock = threading.Lock()
+        # recreate() copies listeners over, and they update the shared counters
+        if '_dispatch' not in kwargs:
+            event.listen(self, 'invalidate', self._count_invalidation)
+
+    def _count_invalidation(self, dbapi_connection, connection_record, exception):
+        """Stale connections found by pre-ping (or dropped mid-query) are discarded."""
+        with self._metrics_lock:
+            self.metrics['invalidated'] += 1
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._metrics_lock:
+                self.metrics['timeouts'] += 1
+            raise
+        finally:
+            waited = (time.perf_counter() - started) * 1000
+            with self._metrics_lock:
+                self.metrics['checkouts'] += 1
+                self.metrics['wait_total_ms'] += waited
+                self.metrics['wait_max_ms'] = max(self.metrics['wait_max_ms'], waited)
+
+    def recreate(self):
+        # dispose() swaps in a fresh pool; keep the counters running across it
+        pool = super().recreate()
+        pool.metrics, pool._metrics_lock = self.metrics, self._metrics_lock
+        return pool
+
+def init_app(app):
+    """Use the metered pool wherever a queue pool is configured (MySQL) and
+    build the read-replica engine from DB_REPLICA_ENGINE, if set.
+
+    Must run before db.init_app(app), which creates the primary engine.
+    """
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS')
+    if options and 'pool_size' in options:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'poolclass': MeteredQueuePool, **options}
+
+    replica = dict(app.config.get('DB_REPLICA_ENGINE') or {})
+    if replica:
+        if 'pool_size' in replica:
+            replica.setdefault('poolclass', MeteredQueuePool)
+        app.extensions['read_replica'] = create_engine(replica.pop('url'), **replica)
+    app.teardown_appcontext(_close_read_session)
+
+def read_session():
+    """Session for read-only reporting and listing queries.
+
+    Uses the read replica when one is configured, otherwise db.session.
+    Replicas can lag behind the primary, so pages that must show a write the
+    user just made (e.g. after a redirect) should keep using db.session.
+    """
+    engine = current_app.extensions.get('read_replica')
+    if engine is None:
+        return db.session
+    session = g.get('_read_session')
+    if session is None:
+        session = g._read_session = Session(bind=engine, query_cls=Query, autoflush=False)
+    return session
+
+def _close_read_session(exception=None):
+    session = g.pop('_read_session', None)
+    if session is not None:
+        session.close()
+
+def pool_stats():
+    """Pool usage for every engine (primary and replica). Needs an app context."""
+    engines = {'primary': db.engine}
+    if 'read_replica' in current_app.extensions:
+        engines['replica'] = current_app.extensions['read_replica']
+    stats = {}
+    for key, engine in engines.items():
+        pool = engine.pool
+        entry = {'pool': type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            entry.update(size=pool.size(), checked_out=pool.checkedout(),
+                         checked_in=pool.checkedin(), overflow=max(pool.overflow(), 0))
+        if isinstance(pool, MeteredQueuePool):
+            with pool._metrics_lock:
+                metrics = dict(pool.metrics)
+            checkouts = metrics['checkouts'] or 1
+            metrics['wait_avg_ms'] = metrics['wait_total_ms'] / checkouts
+            entry.update(metrics)
+        stats[key] = entry
+    return stats
@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import select
+from app.models.book import Book
+from app.models.order import Order
+from app.models.user import User
+from app.services.db_pool import read_session
+from app_aws import DYNAMODB_BOOKS_TABLE, DYNAMODB_ORDERS_TABLE, DYNAMODB_USERS_TABLE, scan_pages
+
+# kind -> (model, exported columns, date column for from/to filters, DynamoDB table).
+# Password hashes are never exported.
+EXPORTS = {
+    'orders': (Order, ['id', 'user_id', 'book_id', 'quantity', 'total_price', 'status', 'order_date'],
+               'order_date', DYNAMODB_ORDERS_TABLE),
+    'users': (User, ['id', 'username', 'email', 'role', 'is_validated', 'created_at'],
+              'created_at', DYNAMODB_USERS_TABLE),
+    'books': (Book, ['id', 'title', 'author', 'genre', 'price', 'stock', 'seller_id', 'image_url', 'created_at'],
+              'created_at', DYNAMODB_BOOKS_TABLE),
+}
+
+CHUNK_SIZE = 64 * 1024  # bytes buffered before each write to the response
+FETCH_SIZE = 1000       # rows per cursor fetch / Scan page
+
+def parse_date_range(date_from, date_to):
+    """Turn optional YYYY-MM-DD strings into [start, end) datetimes. Raises ValueError."""
+    start = datetime.strptime(date_from, '%Y-%m-%d') if date_from else None
+    end = datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1) if date_to else None
+    return start, end
+
+def sql_rows(kind, start=None, end=None):
+    """Stream rows as tuples from a server-side cursor, FETCH_SIZE at a time."""
+    model, columns, date_column, _ = EXPORTS[kind]
+    stmt = select(*(getattr(model, column) for column in columns)).order_by(model.id)
+    if start:
+        stmt = stmt.where(getattr(model, date_column) >= start)
+    if end:
+        stmt = stmt.where(getattr(model, date_column) < end)
+    result = read_session().execute(stmt.execution_options(stream_results=True, yield_per=FETCH_SIZE))
+    for partition in result.partitions():
+        yield from partition
+
+def dynamo_rows(kind, start=None, end=None):
+    """Stream rows as tuples from a paginated DynamoDB Scan (unordered)."""
+    _, columns, date_column, table_name = EXPORTS[kind]
+    from app_aws import _boto3
+    attr = _boto3().dynamodb.conditions.Attr(date_column)
+    condition = None
+    # Dates are stored as ISO strings, which sort chronologically
+    if start:
+        condition = attr.gte(start.isoformat())
+    if end:
+        condition = attr.lt(end.isoformat()) if condition is None else condition & attr.lt(end.isoformat())
+    for page in scan_pages(table_name, page_size=FETCH_SIZE, filter_expression=condition):
+        for item in page:
+            yield tuple(item.get(column) for column in columns)
+
+def _json_value(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def encode(rows, columns, fmt):
+    """Yield CSV or NDJSON text in roughly CHUNK_SIZE pieces."""
+    buffer = io.StringIO()
+    if fmt == 'csv':
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        write = writer.writerow
+    else:
+        def write(row):
+            buffer.write(json.dumps(dict(zip(columns, map(_json_value, row))), default=str))
+            buffer.write('\n')
+
+    for row in rows:
+        write(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def gzip_stream(chunks):
+    """Gzip a stream of text chunks incrementally."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+def export_stream(kind, fmt='csv', source='sql', start=None, end=None, compress=False):
+    """Body generator for /admin/export/<kind>."""
+    columns = EXPORTS[kind][1]
+    rows = dynamo_rows(kind, start, end) if source == 'dynamodb' else sql_rows(kind, start, end)
+    chunks = encode(rows, columns, fmt)
+    return gzip_stream(chunks) if compress else (chunk.encode('utf-8') for chunk in chunks)
@@ -0,0 +1,237 @@
+import hashlib
+import io
+import ipaddress
+import os
+import socket
+import tempfile
+import threading
+import urllib.request
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+WIDTHS = (160, 320, 640)  # thumbnail widths; requests are rounded up to one of these
+FORMATS = {'webp': 'image/webp', 'jpeg': 'image/jpeg'}
+# Locks serializing thumbnail builds; sources hashing to the same one build in turn
+KEY_LOCK_STRIPES = 64
+
+class ImageError(Exception):
+    """The source image could not be fetched or decoded."""
+
+def bucket_width(requested):
+    """Round a requested width up to the nearest bucket (largest bucket if above all)."""
+    for width in WIDTHS:
+        if requested <= width:
+            return width
+    return WIDTHS[-1]
+
+def source_version(image_url):
+    """Short fingerprint of a source URL, used as the ?v= cache-buster in /img links."""
+    return hashlib.sha1((image_url or '').encode('utf-8')).hexdigest()[:10]
+
+class ImageCache:
+    """Resized thumbnails of book covers in a size-capped on-disk cache.
+
+    Variants are stored as <digest>-<width>.<format>, where the digest is the
+    SHA-256 of the source image bytes, so identical covers share files. A small
+    url/<sha1(url)> file remembers which digest a source URL produced so a warm
+    request never touches the source. Files are evicted least recently used
+    once the cache grows past `max_bytes`; each worker tracks the sizes it
+    has seen, so the cap is approximate when several workers share a directory.
+    """
+
+    def __init__(self, max_bytes=512 * 1024 * 1024, fetch_timeout=5, max_source_bytes=10 * 1024 * 1024, quality=80):
+        self.directory = None
+        self.static_folder = None
+        self.max_bytes = max_bytes
+        self.fetch_timeout = fetch_timeout
+        self.max_source_bytes = max_source_bytes
+        self.quality = quality
+        self.allow_private_sources = False
+        self.hits = 0
+        self.misses = 0
+        self._files = OrderedDict()  # path -> size, least recently used first
+        self._total = 0
+        self._lock = threading.Lock()
+        # Striped build locks: a fixed number, however many sources are cached
+        self._key_locks = [threading.Lock() for _ in range(KEY_LOCK_STRIPES)]
+
+    def init_app(self, app):
+        self.directory = app.config.get('IMAGE_CACHE_DIR') or tempfile.mkdtemp(prefix='bookbazaar-img-')
+        self.static_folder = app.static_folder
+        self.max_bytes = app.config.get('IMAGE_CACHE_MAX_MB', self.max_bytes // (1024 * 1024)) * 1024 * 1024
+        self.fetch_timeout = app.config.get('IMAGE_FETCH_TIMEOUT', self.fetch_timeout)
+        self.max_source_bytes = app.config.get('IMAGE_MAX_SOURCE_MB', self.max_source_bytes // (1024 * 1024)) * 1024 * 1024
+        self.quality = app.config.get('IMAGE_QUALITY', self.quality)
+        self.allow_private_sources = app.config.get('IMAGE_ALLOW_PRIVATE_SOURCES', False)
+        os.makedirs(os.path.join(self.directory, 'url'), exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        """Load existing variants, oldest access first, so eviction survives restarts."""
+        entries = []
+        with os.scandir(self.directory) as found:
+            for entry in found:
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.path, stat.st_size))
+        with self._lock:
+            self._files.clear()
+            for _, path, size in sorted(entries):
+                self._files[path] = size
+            self._total = sum(self._files.values())
+
+    def thumbnail(self, image_url, width, fmt):
+        """Return the path of `image_url` resized to `width` in `fmt`, building it on a miss."""
+        url_file = os.path.join(self.directory, 'url', hashlib.sha1(image_url.encode('utf-8')).hexdigest())
+        digest = self._read(url_file)
+        if digest:
+            path = self._variant_path(digest, width, fmt)
+            if self._touch(path):
+                self.hits += 1
+                return path
+
+        # One worker thread builds a given source at a time; the others then hit
+        with self._key_lock(url_file):
+            digest = self._read(url_file)
+            if digest:
+                path = self._variant_path(digest, width, fmt)
+                if self._touch(path):
+                    self.hits += 1
+                    return path
+            self.misses += 1
+            source = self._load(image_url)
+            digest = hashlib.sha256(source).hexdigest()
+            path = self._variant_path(digest, width, fmt)
+            if not self._touch(path):
+                self._store(path, self._resize(source, width, fmt))
+            with open(url_file, 'w') as handle:
+                handle.write(digest)
+            return path
+
+    def _key_lock(self, key):
+        return self._key_locks[hash(key) % len(self._key_locks)]
+
+    def _variant_path(self, digest, width, fmt):
+        return os.path.join(self.directory, f"{digest}-{width}.{fmt}")
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path) as handle:
+                return handle.read().strip()
+        except OSError:
+            return None
+
+    def _touch(self, path):
+        """Mark a cached variant as recently used; False if it is not on disk."""
+        try:
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._total -= self._files.pop(path, 0)
+            return False
+        with self._lock:
+            if path in self._files:
+                self._files.move_to_end(path)
+            else:
+                self._files[path] = os.path.getsize(path)
+                self._total += self._files[path]
+        return True
+
+    def _store(self, path, data):
+        partial = f"{path}.{threading.get_ident()}.tmp"
+        with open(partial, 'wb') as handle:
+            handle.write(data)
+        os.replace(partial, path)
+        with self._lock:
+            self._total += len(data) - self._files.pop(path, 0)
+            self._files[path] = len(data)
+            while self._total > self.max_bytes and len(self._files) > 1:
+                old_path, size = self._files.popitem(last=False)
+                self._total -= size
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
+
+    def _load(self, image_url):
+        parsed = urlparse(image_url)
+        if not parsed.scheme:
+            # Plain paths ("/static/images/x.jpg", "images/x.jpg") are files under the static folder
+            relative = image_url.lstrip('/')
+            relative = relative[len('static/'):] if relative.startswith('static/') else relative
+            root = os.path.realpath(self.static_folder)
+            path = os.path.realpath(os.path.join(root, relative))
+            if not path.startswith(root + os.sep) or not os.path.isfile(path):
+                raise ImageError(f"No static file for {image_url}")
+            with open(path, 'rb') as handle:
+                data = handle.read(self.max_source_bytes + 1)
+            if len(data) > self.max_source_bytes:
+                raise ImageError(f"{image_url} is larger than {self.max_source_bytes} bytes")
+            return data
+        if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+            raise ImageError(f"Unsupported image source: {image_url}")
+        if not self.allow_private_sources:
+            self._check_public(parsed.hostname)
+        try:
+            request = urllib.request.Request(image_url, headers={'User-Agent': 'BookBazaar-ImageProxy'})
+            opener = urllib.request.build_opener(_CheckedRedirects(self))
+            with opener.open(request, timeout=self.fetch_timeout) as response:
+                data = response.read(self.max_source_bytes + 1)
+        except ImageError:
+            raise
+        except Exception as e:
+            raise ImageError(f"Could not fetch {image_url}: {e}") from e
+        if len(data) > self.max_source_bytes:
+            raise ImageError(f"{image_url} is larger than {self.max_source_bytes} bytes")
+        return data
+
+    @staticmethod
+    def _check_public(hostname):
+        """Refuse sources that resolve to internal addresses (instance metadata, VPC hosts)."""
+        try:
+            addresses = {info[4][0] for info in socket.getaddrinfo(hostname, None)}
+        except socket.gaierror as e:
+            raise ImageError(f"Cannot resolve {hostname}: {e}") from e
+        for address in addresses:
+            ip = ipaddress.ip_address(address.split('%')[0])
+            if not ip.is_global:
+                raise ImageError(f"{hostname} resolves to a non-public address")
+
+    def _resize(self, source, width, fmt):
+        from PIL import Image, UnidentifiedImageError
+        try:
+            with Image.open(io.BytesIO(source)) as image:
+                image.draft('RGB', (width, width * 4))  # cheap JPEG downscale while decoding
+                image = image.convert('RGB')
+                if image.width > width:
+                    image = image.resize((width, max(1, round(image.height * width / image.width))),
+                                         Image.Resampling.LANCZOS)
+                output = io.BytesIO()
+                image.save(output, format=fmt.upper(), quality=self.quality,
+                           **({'method': 4} if fmt == 'webp' else {'optimize': True, 'progressive': True}))
+                return output.getvalue()
+        except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+            raise ImageError(f"Cannot decode image: {e}") from e
+
+    def stats(self):
+        with self._lock:
+            return {'files': len(self._files), 'bytes': self._total, 'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses}
+
+class _CheckedRedirects(urllib.request.HTTPRedirectHandler):
+    """Apply the public-address check to every redirect hop, not just the first URL."""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        parsed = urlparse(newurl)
+        if parsed.scheme not in ('http', 'https'):
+            raise ImageError(f"Redirect to unsupported source: {newurl}")
+        if not self.cache.allow_private_sources:
+            self.cache._check_public(parsed.hostname)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+# Shared instance, configured by create_app
+image_cache = ImageCache()
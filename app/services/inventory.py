@@ -0,0 +1,57 @@
+import csv
+import io
+
+MAX_UPLOAD_ROWS = 50000
+
+def parse_stock_rows(records):
+    """Validate stock change records (dicts with book_id, action, amount).
+
+    `action` defaults to 'set'. Returns (changes, errors): changes are
+    (line, book_id, action, amount) tuples and errors are (line, message).
+    """
+    changes, errors = [], []
+    for line, record in enumerate(records, start=1):
+        try:
+            book_id = int(record.get('book_id'))
+            action = (record.get('action') or 'set').strip().lower()
+            amount = int(record.get('amount'))
+        except (TypeError, ValueError, AttributeError):
+            errors.append((line, "book_id and amount must be whole numbers."))
+            continue
+        if action not in ('set', 'add'):
+            errors.append((line, "action must be 'set' or 'add'."))
+        elif action == 'set' and amount < 0:
+            errors.append((line, "Stock cannot be set below zero."))
+        else:
+            changes.append((line, book_id, action, amount))
+    return changes, errors
+
+def read_inventory_csv(file_storage):
+    """Read an uploaded CSV with a book_id,action,amount header (action optional).
+
+    Data rows are numbered from 1, like parse_stock_rows.
+    """
+    text = io.TextIOWrapper(file_storage.stream, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(text)
+    if not reader.fieldnames or not {'book_id', 'amount'} <= set(reader.fieldnames):
+        raise ValueError("CSV needs a header row with book_id and amount columns (and optionally action).")
+    records = []
+    for record in reader:
+        records.append(record)
+        if len(records) > MAX_UPLOAD_ROWS:
+            raise ValueError(f"CSV has more than {MAX_UPLOAD_ROWS} rows; split it into several uploads.")
+    return records
+
+def apply_stock_changes(book_repo, records):
+    """Validate and apply records; return one result dict per input row."""
+    changes, errors = parse_stock_rows(records)
+    outcome = book_repo.bulk_update_stock([(book_id, action, amount) for _, book_id, action, amount in changes])
+
+    rows = [{'line': line, 'book_id': None, 'status': 'invalid', 'stock': None, 'dynamodb': None, 'message': message}
+            for line, message in errors]
+    for line, book_id, action, amount in changes:
+        result = outcome[book_id]
+        message = {'not_found': "No book with this id.",
+                   'invalid': "Stock would go below zero."}.get(result['status'], f"{action} {amount}")
+        rows.append({'line': line, 'book_id': book_id, 'message': message, **result})
+    return sorted(rows, key=lambda row: row['line'])
@@ -1,20 +1,141 @@
-import os
-import app_aws
+import asyncio
+import atexit
+import threading
+import time
+from app.services.notification_transports import make_transport
 
-class LocalNotifier:
-    def send(self, email, message):
-        print(f"[LOCAL NOTIFICATION] {email}: {message}")
+def merge(messages):
+    """One message for everything a recipient is due: the message itself, or a digest."""
+    if len(messages) == 1:
+        return messages[0]
+    return f"{len(messages)} updates from BookBazaar:\n" + "\n".join(f"- {message}" for message in messages)
 
 class NotificationService:
-    def __init__(self):
-        # Prefer environment variable, fallback to hardcoded value in app_aws.py
-        self.sns_topic_arn = os.environ.get('SNS_TOPIC_ARN') or app_aws.SNS_TOPIC_ARN
-        
-        # Check if topic is set (not placeholder)
-        if self.sns_topic_arn and "123456789012" not in self.sns_topic_arn:
-            self.notifier = app_aws.SNSNotifier()
-        else:
-            self.notifier = LocalNotifier()
+    """Customer notifications, coalesced per recipient and published in batches.
+
+    Messages are queued per recipient. The first one opens a window of
+    `coalesce_seconds`; everything queued for that recipient until it closes
+    goes out as a single digest. Due digests are handed to the transport
+    (see notification_transports) `batch_size` at a time, capped by what the
+    transport takes per call (ten for SNS PublishBatch). A background
+    thread, started with the first queued message, flushes closed windows,
+    and whatever is still queued is flushed when the process exits. With a
+    window of 0 messages are published as they are sent. Once more than
+    `max_pending` messages are queued, the sender flushes them itself, so a
+    burst slows its producer down instead of growing memory.
+    """
+
+    def __init__(self, coalesce_seconds=0, batch_size=10, max_pending=10000, transport='auto'):
+        self.notifier = make_transport(transport)
+        self.coalesce_seconds = coalesce_seconds
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._pending_count = 0
+        self._pending = {}  # email -> (window closes at, [messages])
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._counts = {'enqueued': 0, 'published': 0, 'publish_calls': 0, 'failed': 0}
+
+    def init_app(self, app):
+        self.coalesce_seconds = app.config.get('NOTIFY_COALESCE_SECONDS', self.coalesce_seconds)
+        self.batch_size = max(1, app.config.get('NOTIFY_BATCH_SIZE', self.batch_size))
+        self.max_pending = app.config.get('NOTIFY_MAX_PENDING', self.max_pending)
+        transport = make_transport(app.config.get('NOTIFY_TRANSPORT', 'auto'), app.config)
+        self.flush()
+        self.notifier, previous = transport, self.notifier
+        previous.close()
 
     def send(self, email, message):
-        self.notifier.send(email, message)
\ No newline at end of file
+        self.send_many([(email, message)])
+
+    async def send_async(self, email, message):
+        """Publish from a worker thread so it can overlap other I/O."""
+        await asyncio.to_thread(self.send, email, message)
+
+    def send_many(self, messages):
+        """Queue (email, message) pairs; a bulk operation's messages become one digest per recipient."""
+        if not self.enqueue(messages):
+            return
+        if not self.coalesce_seconds or self._pending_count > self.max_pending:
+            self.flush()
+        else:
+            self._start_flusher()
+
+    def enqueue(self, messages):
+        """Add messages to their recipients' windows without publishing. Returns how many were queued."""
+        count = 0
+        closes_at = time.monotonic() + self.coalesce_seconds
+        with self._lock:
+            for email, message in messages:
+                if not email:
+                    continue
+                self._pending.setdefault(email, (closes_at, []))[1].append(message)
+                count += 1
+            self._counts['enqueued'] += count
+            self._pending_count += count
+        return count
+
+    def flush(self, everything=True):
+        """Publish the recipients whose window has closed (all of them by default). Returns messages published."""
+        now = time.monotonic()
+        with self._lock:
+            due = [email for email, (closes_at, _) in self._pending.items() if everything or closes_at <= now]
+            digests, merged = [], []  # merged[i]: how many queued messages digests[i] carries
+            for email in due:
+                messages = self._pending.pop(email)[1]
+                self._pending_count -= len(messages)
+                digests.append((email, merge(messages)))
+                merged.append(len(messages))
+        published = 0
+        batch_size = min(self.batch_size, self.notifier.max_batch)
+        for start in range(0, len(digests), batch_size):
+            batch = digests[start:start + batch_size]
+            try:
+                refused = self.notifier.publish(batch)
+            except Exception as e:
+                print(f"Notification Error: {e}")
+                refused = range(len(batch))
+            published += len(batch) - len(refused)
+            with self._lock:
+                self._counts['publish_calls'] += 1
+                self._counts['published'] += len(batch) - len(refused)
+                # A refused digest loses every message merged into it
+                self._counts['failed'] += sum(merged[start + n] for n in refused)
+        return published
+
+    def stats(self):
+        """Messages queued vs digests published (and the transport calls spent on them) by this worker.
+
+        failed counts the messages inside refused digests, so saved only
+        counts messages that reached a recipient merged into a digest.
+        """
+        with self._lock:
+            counts = dict(self._counts, pending=self._pending_count)
+        counts['saved'] = counts['enqueued'] - counts['pending'] - counts['published'] - counts['failed']
+        counts['transport'] = dict(self.notifier.stats(), name=self.notifier.name)
+        return counts
+
+    def close(self):
+        """Publish everything queued and release the transport (worker shutdown)."""
+        self.flush()
+        self.notifier.close()
+
+    def _start_flusher(self):
+        if self._flusher:
+            return
+        with self._lock:
+            if not self._flusher:
+                self._flusher = threading.Thread(target=self._flush_forever, daemon=True)
+                self._flusher.start()
+                atexit.register(self.close)
+
+    def _flush_forever(self):
+        while True:
+            time.sleep(max(self.coalesce_seconds / 4, 0.05))
+            try:
+                self.flush(everything=False)
+            except Exception as e:
+                print(f"Notification flush Error: {e}")
+
+# Shared instance, configured by create_app
+notifications = NotificationService()
@@ -0,0 +1,217 @@
+import json
+import os
+import queue
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+import app_aws
+
+# name -> Transport subclass, filled by @register_transport
+TRANSPORTS = {}
+
+def register_transport(name):
+    """Class decorator making a transport selectable with NOTIFY_TRANSPORT=<name>."""
+    def register(cls):
+        cls.name = name
+        TRANSPORTS[name] = cls
+        return cls
+    return register
+
+def make_transport(name='auto', config=None):
+    """Build the transport called `name` from `config` (a dict such as app.config).
+
+    'auto' keeps the historical choice: SNS when a real topic ARN is
+    configured, otherwise stdout.
+    """
+    config = config or {}
+    if name == 'auto':
+        topic_arn = os.environ.get('SNS_TOPIC_ARN') or app_aws.SNS_TOPIC_ARN
+        name = 'sns' if topic_arn and "123456789012" not in topic_arn else 'stdout'
+    if name not in TRANSPORTS:
+        raise ValueError(f"Unknown notification transport: {name} (choose from {', '.join(sorted(TRANSPORTS))}).")
+    return TRANSPORTS[name].from_config(config)
+
+class Transport(ABC):
+    """Where published notifications go.
+
+    NotificationService hands a transport batches of at most `max_batch`
+    (email, message) pairs through `publish`, which reports the positions
+    that were refused so their messages are counted as failed. Transports
+    implement `send_batch`, returning how many they accepted (taken to be
+    the start of the batch), and override `publish` when they know exactly
+    which ones failed. A transport that cannot keep up should block the
+    caller or refuse the batch rather than buffer without bound.
+    """
+    name = None
+    max_batch = 10
+
+    @classmethod
+    def from_config(cls, config):
+        return cls()
+
+    def send(self, email, message):
+        return self.send_batch([(email, message)])
+
+    @abstractmethod
+    def send_batch(self, messages):
+        """Publish (email, message) pairs; returns how many were accepted."""
+
+    def publish(self, messages):
+        """Publish (email, message) pairs; returns the positions that were refused."""
+        return list(range(self.send_batch(messages), len(messages)))
+
+    def stats(self):
+        return {}
+
+    def close(self):
+        pass
+
+@register_transport('stdout')
+class LocalNotifier(Transport):
+    """Prints every notification (development)."""
+
+    def send_batch(self, messages):
+        for email, message in messages:
+            print(f"[LOCAL NOTIFICATION] {email}: {message}")
+        return len(messages)
+
+@register_transport('sns')
+class SNSTransport(Transport):
+    """SNS topic, ten messages per PublishBatch call."""
+
+    def __init__(self, notifier=None):
+        self.notifier = notifier or app_aws.SNSNotifier()
+
+    def send_batch(self, messages):
+        return self.notifier.send_batch(messages)
+
+    def publish(self, messages):
+        return self.notifier.publish_batch(messages)
+
+@register_transport('file')
+class FileTransport(Transport):
+    """Appends notifications as NDJSON lines, rotating the file at `max_bytes`.
+
+    One write per batch; `backups` rotated files (path.1 is the newest) are
+    kept, so disk use stays under (backups + 1) * max_bytes per file.
+    Rotation is only safe with a single writer, so `{pid}` in the path (the
+    default) gives each worker process its own file. The path is resolved
+    and the file opened on the first batch in each process, so workers
+    forked from a preloaded app do not share the parent's file.
+    """
+    max_batch = 500
+
+    def __init__(self, path, max_bytes=64 * 1024 * 1024, backups=5):
+        self.path_template = path
+        self.path = None
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.written = 0
+        self.rotations = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._pid = None
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config.get('NOTIFY_FILE_PATH') or 'notifications.{pid}.ndjson',
+                   max_bytes=int(config.get('NOTIFY_FILE_MAX_MB', 64) * 1024 * 1024),
+                   backups=config.get('NOTIFY_FILE_BACKUPS', 5))
+
+    def _open(self):
+        """This process's file, opened on first use (and again after a fork)."""
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self.path = self.path_template.replace('{pid}', str(self._pid))
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # The handle inherited from the parent stays the parent's to close
+            self._file = open(self.path, 'a', encoding='utf-8')
+        return self._file
+
+    def send_batch(self, messages):
+        sent_at = datetime.utcnow().isoformat()
+        lines = ''.join(json.dumps({'sent_at': sent_at, 'email': email, 'message': message}) + '\n'
+                        for email, message in messages)
+        with self._lock:
+            handle = self._open()
+            handle.write(lines)
+            handle.flush()
+            self.written += len(messages)
+            if handle.tell() >= self.max_bytes:
+                self._rotate()
+        return len(messages)
+
+    def _rotate(self):
+        self._file.close()
+        if self.backups:
+            for n in range(self.backups - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{n}"):
+                    os.replace(f"{self.path}.{n}", f"{self.path}.{n + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self.rotations += 1
+
+    def stats(self):
+        return {'path': self.path, 'written': self.written, 'rotations': self.rotations}
+
+    def close(self):
+        with self._lock:
+            if self._file and self._pid == os.getpid():
+                self._file.close()
+            self._file = self._pid = None
+
+@register_transport('queue')
+class QueueTransport(Transport):
+    """Hands batches to a bounded in-memory queue drained by a background thread.
+
+    Publishing returns as soon as the batch is queued. At most `max_batches`
+    batches wait in memory; when the queue is full the caller blocks for up
+    to `block_seconds` and the batch is then dropped (counted, not
+    buffered). The worker passes each batch to `consumer`, e.g. another
+    transport's send_batch; by default it only counts them, which is what
+    load tests want.
+    """
+    max_batch = 1000
+
+    def __init__(self, consumer=None, max_batches=1000, block_seconds=1.0):
+        self.consumer = consumer
+        self.block_seconds = block_seconds
+        self.delivered = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_batches)
+        self._worker = threading.Thread(target=self._drain_forever, daemon=True)
+        self._worker.start()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(max_batches=config.get('NOTIFY_QUEUE_BATCHES', 1000),
+                   block_seconds=config.get('NOTIFY_QUEUE_BLOCK_SECONDS', 1.0))
+
+    def send_batch(self, messages):
+        try:
+            self._queue.put(list(messages), timeout=self.block_seconds)
+        except queue.Full:
+            self.dropped += len(messages)
+            return 0
+        return len(messages)
+
+    def drain(self):
+        """Wait until every queued batch has been handed to the consumer."""
+        self._queue.join()
+
+    def _drain_forever(self):
+        while True:
+            batch = self._queue.get()
+            try:
+                delivered = self.consumer(batch) if self.consumer else len(batch)
+                self.delivered += delivered
+            except Exception as e:
+                print(f"Notification Error: {e}")
+            finally:
+                self._queue.task_done()
+
+    def stats(self):
+        return {'queued_batches': self._queue.qsize(), 'delivered': self.delivered, 'dropped': self.dropped}
+
+    def close(self):
+        self.drain()
@@ -0,0 +1,269 @@
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import func, insert, select, update
+from app.extensions import db
+from app.models.book import Book
+from app.models.job import BulkJob
+from app.models.order import Order
+from app.models.order_history import OrderStatusChange
+from app.models.user import User
+from app.services import sales_rollups
+from app.services.notification import notifications
+from app.services.render_cache import catalog_cache
+from app.services.reservations import return_stock
+from app_aws import DynamoOrderRepository
+
+# status -> statuses an order may move to from it
+TRANSITIONS = {
+    'Placed': ('Processing', 'Shipped', 'Cancelled'),
+    'Processing': ('Shipped', 'Cancelled'),
+    'Shipped': ('Delivered',),
+    'Delivered': (),
+    'Cancelled': (),
+}
+STATUSES = tuple(TRANSITIONS)
+
+# A running job that has not reported progress for this long is presumed dead
+STALE_AFTER = timedelta(minutes=5)
+
+# Optimistic retries when a chunk's orders change status under a transition
+MAX_ATTEMPTS = 3
+
+class InvalidTransition(ValueError):
+    """A status change the order lifecycle does not allow."""
+
+class JobAlreadyRunning(InvalidTransition):
+    """A bulk job to the same status is still running."""
+
+def sources_for(status):
+    """Statuses an order can be moved to `status` from."""
+    if status not in TRANSITIONS:
+        raise InvalidTransition(f"Unknown order status: {status}.")
+    return [source for source, targets in TRANSITIONS.items() if status in targets]
+
+def _rows(*conditions, limit=None):
+    """Everything a transition needs about the selected orders, in one SELECT."""
+    query = (select(Order.id, Order.status, Order.user_id, Order.book_id, Order.quantity, Order.total_price,
+                    Order.order_date, Book.seller_id)
+             .outerjoin(Book, Book.id == Order.book_id).where(*conditions).order_by(Order.id))
+    if limit:
+        query = query.limit(limit)
+    return db.session.execute(query).all()
+
+def _move(rows, to_status, actor_id):
+    """Move already-validated orders to `to_status` in the caller's transaction.
+
+    One conditional UPDATE per current status, history rows and rollup deltas
+    in bulk, and cancelled orders' units back into stock. Returns False (the
+    caller rolls back and re-reads) if any order changed status meanwhile.
+    """
+    by_source = defaultdict(list)
+    for row in rows:
+        by_source[row.status].append(row.id)
+    for source, order_ids in by_source.items():
+        result = db.session.execute(
+            update(Order).where(Order.id.in_(order_ids), Order.status == source)
+            .values(status=to_status).execution_options(synchronize_session=False))
+        if result.rowcount != len(order_ids):
+            return False
+
+    now = datetime.utcnow()
+    db.session.execute(insert(OrderStatusChange), [
+        {'order_id': row.id, 'from_status': row.status, 'to_status': to_status, 'changed_by': actor_id,
+         'changed_at': now} for row in rows])
+
+    # Core UPDATEs skip the Order mapper events, so the rollups are adjusted here
+    deltas = sales_rollups.new_deltas()
+    for row in rows:
+        for status, sign in ((row.status, -1), (to_status, 1)):
+            sales_rollups.add_contribution(deltas, row.order_date, status, row.total_price, row.quantity,
+                                           row.book_id, row.seller_id, sign)
+    sales_rollups.apply_deltas(db.session.connection(), deltas)
+
+    if to_status == 'Cancelled':
+        amounts = Counter()
+        for row in rows:
+            amounts[row.book_id] += row.quantity
+        return_stock(amounts)
+    return True
+
+def _sync_to_dynamo(order_ids, status, max_workers=8):
+    try:
+        return DynamoOrderRepository().update_status_many(order_ids, status, max_workers=max_workers)
+    except Exception as e:
+        print(f"DynamoDB Sync Error: {e}")
+        return {order_id: 'error' for order_id in order_ids}
+
+def transition(order_id, to_status, actor_id=None, from_status=None):
+    """Move one order to `to_status`, recording history. Commits, then syncs DynamoDB.
+
+    Raises InvalidTransition when the order's current status does not allow
+    it, or is not `from_status` when one is given.
+    """
+    for _ in range(MAX_ATTEMPTS):
+        rows = _rows(Order.id == order_id)
+        if not rows:
+            raise InvalidTransition("Order not found.")
+        if (to_status not in TRANSITIONS.get(rows[0].status, ())
+                or from_status is not None and rows[0].status != from_status):
+            raise InvalidTransition(f"An order that is {rows[0].status} cannot be marked {to_status}.")
+        if _move(rows, to_status, actor_id):
+            break
+        db.session.rollback()
+    else:
+        raise InvalidTransition("The order was changed by someone else; try again.")
+    db.session.commit()
+    if to_status == 'Cancelled':
+        catalog_cache.invalidate()
+    _sync_to_dynamo([order_id], to_status)
+
+def history(order_id):
+    """Status changes of one order, oldest first."""
+    return OrderStatusChange.query.filter_by(order_id=order_id).order_by(OrderStatusChange.changed_at,
+                                                                          OrderStatusChange.id).all()
+
+def job_kind(to_status):
+    return f"orders_to_{to_status.lower()}"
+
+def _status_message(order_ids, status):
+    if len(order_ids) == 1:
+        return f"Order #{order_ids[0]} has been {status.lower()}."
+    return f"Orders {', '.join(f'#{order_id}' for order_id in order_ids)} have been {status.lower()}."
+
+class OrderStatusJobRunner:
+    """Moves large selections of orders to a new status in a background thread.
+
+    Orders are processed in id-ordered chunks, each in one transaction of
+    conditional UPDATEs (see _move). After a chunk commits its DynamoDB
+    items are updated concurrently and every customer's orders in it are
+    queued as one message, which the notifier's coalescing window merges
+    with their other updates. Progress lives in the BulkJob table so
+    every worker can report it, and the selection only matches orders still
+    in a source status, so running a job again finishes whatever an earlier
+    run left.
+    """
+
+    def __init__(self, chunk_size=1000, dynamo_workers=8):
+        self.app = None
+        self.chunk_size = chunk_size
+        self.dynamo_workers = dynamo_workers
+        self._threads = {}
+
+    def init_app(self, app):
+        self.app = app
+        self.chunk_size = app.config.get('ORDER_STATUS_CHUNK_SIZE', self.chunk_size)
+        self.dynamo_workers = app.config.get('ORDER_STATUS_DYNAMO_WORKERS', self.dynamo_workers)
+
+    @staticmethod
+    def selection(to_status, from_status=None, order_ids=None, placed_before=None):
+        """SQL conditions for the orders a bulk transition applies to."""
+        sources = sources_for(to_status)
+        if from_status:
+            if from_status not in sources:
+                raise InvalidTransition(f"Orders that are {from_status} cannot be marked {to_status}.")
+            sources = [from_status]
+        if not sources:
+            raise InvalidTransition(f"No order can be marked {to_status}.")
+        conditions = [Order.status.in_(sources)]
+        if order_ids is not None:
+            conditions.append(Order.id.in_(order_ids))
+        if placed_before:
+            conditions.append(Order.order_date < placed_before)
+        return conditions
+
+    def start(self, to_status, admin_id, from_status=None, order_ids=None, placed_before=None):
+        """Start a bulk transition.
+
+        Raises JobAlreadyRunning while another job to the same status is in
+        progress: jobs do not record their selection, so this request's
+        orders cannot be assumed to be covered by it.
+        """
+        conditions = self.selection(to_status, from_status, order_ids, placed_before)
+        kind = job_kind(to_status)
+        active = BulkJob.query.filter(BulkJob.kind == kind, BulkJob.state.in_(('pending', 'running'))).first()
+        if active and datetime.utcnow() - active.updated_at < STALE_AFTER:
+            raise JobAlreadyRunning(f"Bulk job #{active.id} is already marking orders {to_status}; "
+                                    f"start this one when it has finished.")
+        if active:
+            active.state, active.error = 'failed', "Abandoned (no progress); superseded by a new run."
+
+        total = db.session.execute(select(func.count(Order.id)).where(*conditions)).scalar()
+        job = BulkJob(kind=kind, requested_by=admin_id, total=total)
+        db.session.add(job)
+        db.session.commit()
+
+        thread = threading.Thread(target=self._run, args=(self.app, job.id, to_status, admin_id, conditions),
+                                  daemon=True)
+        self._threads[job.id] = thread
+        thread.start()
+        return job
+
+    def wait(self, job_id, timeout=None):
+        """Block until a job started by this worker finishes (tests, CLI)."""
+        thread = self._threads.get(job_id)
+        if thread:
+            thread.join(timeout)
+
+    def _run(self, app, job_id, to_status, admin_id, conditions):
+        with app.app_context():
+            job = db.session.get(BulkJob, job_id)
+            job.state, job.updated_at = 'running', datetime.utcnow()
+            db.session.commit()
+            try:
+                last_id = 0
+                while True:
+                    rows = self._move_chunk(conditions, last_id, to_status, admin_id)
+                    if rows is None:
+                        break
+                    if rows:
+                        last_id = rows[-1].id
+                        self._after_chunk(rows, to_status, job)
+                    job.updated_at = datetime.utcnow()
+                    db.session.commit()
+
+                job.state = 'failed' if job.failed else 'done'
+                if job.failed:
+                    job.error = (f"{job.failed} orders were updated but not synced to DynamoDB; "
+                                 f"their DynamoDB status is stale.")
+            except Exception as e:
+                db.session.rollback()
+                job = db.session.get(BulkJob, job_id)
+                job.state, job.error = 'failed', str(e)[:500]
+            job.updated_at = datetime.utcnow()
+            db.session.commit()
+            self._threads.pop(job_id, None)
+
+    def _move_chunk(self, conditions, last_id, to_status, admin_id):
+        """Move the next chunk after `last_id`; returns its rows, or None when the selection is exhausted."""
+        for _ in range(MAX_ATTEMPTS):
+            rows = _rows(*conditions, Order.id > last_id, limit=self.chunk_size)
+            if not rows:
+                return None
+            if _move(rows, to_status, actor_id=admin_id):
+                db.session.commit()
+                if to_status == 'Cancelled':
+                    catalog_cache.invalidate()
+                return rows
+            # Some orders changed meanwhile; re-read the chunk so they are re-checked
+            db.session.rollback()
+        raise RuntimeError(f"Orders after #{last_id} kept changing; run the job again.")
+
+    def _after_chunk(self, rows, to_status, job):
+        order_ids = [row.id for row in rows]
+        outcome = _sync_to_dynamo(order_ids, to_status, self.dynamo_workers)
+        job.processed += len(rows)
+        job.failed += sum(result == 'error' for result in outcome.values())
+
+        by_user = defaultdict(list)
+        for row in rows:
+            by_user[row.user_id].append(row.id)
+        emails = dict(db.session.execute(select(User.id, User.email).where(User.id.in_(by_user))).all())
+        try:
+            notifications.send_many([(emails[user_id], _status_message(order_ids, to_status))
+                                     for user_id, order_ids in by_user.items() if user_id in emails])
+        except Exception as e:
+            print(f"Notification Error: {e}")
+
+# Shared instance, configured by create_app
+order_jobs = OrderStatusJobRunner()
@@ -0,0 +1,80 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class HasherBusy(Exception):
+    """Raised when too many password verifications are already queued."""
+
+class PasswordHasher:
+    """Password hashing with a configurable algorithm/cost.
+
+    Verification can run in a small process pool so a burst of logins uses at
+    most `workers` cores and never more than `max_pending` queued checks;
+    request threads waiting beyond `timeout` seconds get HasherBusy instead of
+    piling up. Bulk hashing for seeders uses a separate, short-lived pool.
+    """
+
+    def __init__(self, method='scrypt', workers=0, max_pending=16, timeout=5.0):
+        self.method = method
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._prefix = None
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', self.method)
+        self.workers = app.config.get('PASSWORD_VERIFY_WORKERS', self.workers)
+        self.max_pending = app.config.get('PASSWORD_VERIFY_MAX_PENDING', self.max_pending)
+        self.timeout = app.config.get('PASSWORD_VERIFY_TIMEOUT', self.timeout)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._prefix = None
+
+    def hash(self, password):
+        return generate_password_hash(password, method=self.method)
+
+    def needs_rehash(self, password_hash):
+        """True when a stored hash was made with a different algorithm or cost."""
+        if self._prefix is None:
+            # Werkzeug expands defaults ('scrypt' -> 'scrypt:32768:8:1'); hash once to learn the full form
+            self._prefix = self.hash('').split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self._prefix
+
+    def verify(self, password_hash, password):
+        if not password_hash:
+            return False
+        if not self.workers:
+            return check_password_hash(password_hash, password)
+
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HasherBusy("Too many login attempts in progress.")
+        try:
+            future = self._get_pool().submit(check_password_hash, password_hash, password)
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise HasherBusy("Password verification timed out.")
+        finally:
+            self._slots.release()
+
+    def hash_many(self, passwords, processes=None):
+        """Hash a list of passwords in parallel (bulk seeding). Order is preserved."""
+        passwords = list(passwords)
+        if len(passwords) < 2 or processes == 1:
+            return [self.hash(password) for password in passwords]
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            return list(pool.map(generate_password_hash, passwords, [self.method] * len(passwords),
+                                 chunksize=max(1, len(passwords) // 64)))
+
+    def _get_pool(self):
+        # Created on first use so it is forked after the server worker starts
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+# Shared instance, configured by create_app (standalone seeders read the env directly)
+hasher = PasswordHasher(method=os.environ.get('PASSWORD_HASH_METHOD', 'scrypt'))
@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import OrderedDict
+
+class MemoryBucketStore:
+    """Token buckets and expiring markers held in this worker's memory (bounded LRU)."""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._markers = OrderedDict()  # key -> expiry (monotonic)
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill_per_sec, cost=1):
+        """Refill the bucket, then remove `cost` tokens if available.
+
+        cost=0 only checks whether at least one token is left.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_per_sec)
+            allowed = tokens >= max(cost, 1)
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return allowed
+
+    def add_marker(self, key, ttl):
+        with self._lock:
+            self._markers[key] = time.monotonic() + ttl
+            self._markers.move_to_end(key)
+            while len(self._markers) > self.max_keys:
+                self._markers.popitem(last=False)
+
+    def has_marker(self, key):
+        with self._lock:
+            expires = self._markers.get(key)
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self._markers[key]
+                return False
+            return True
+
+    def remove_marker(self, key):
+        with self._lock:
+            self._markers.pop(key, None)
+
+class LoginRateLimiter:
+    """Per-IP and per-email token buckets in front of the login path.
+
+    Every attempt costs a token from the client IP's bucket. The email bucket
+    is only checked up front and charged on failed attempts, so attackers
+    guessing one account's password cannot lock its owner out for long.
+    With the DynamoDB backend, `fail_open` decides whether attempts are
+    allowed or refused while the table cannot be reached.
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self.backend = 'memory'
+        self.fail_open = True
+        self.enabled = True
+        self.ip_burst, self.ip_per_sec = 20, 20 / 60
+        self.email_burst, self.email_per_sec = 5, 1 / 60
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('LOGIN_RATE_LIMIT', True)
+        self.ip_burst = app.config.get('LOGIN_IP_BURST', self.ip_burst)
+        self.ip_per_sec = app.config.get('LOGIN_IP_PER_MINUTE', self.ip_per_sec * 60) / 60
+        self.email_burst = app.config.get('LOGIN_EMAIL_BURST', self.email_burst)
+        self.email_per_sec = app.config.get('LOGIN_EMAIL_PER_MINUTE', self.email_per_sec * 60) / 60
+        self.backend = app.config.get('LOGIN_RATE_LIMIT_BACKEND', 'memory')
+        self.fail_open = app.config.get('LOGIN_RATE_LIMIT_FAIL_OPEN', True)
+        # Built on first use, so LAZY_INIT workers boot without AWS clients
+        self.store = None
+        self._lock = threading.Lock()
+
+    def _bucket_store(self):
+        if self.store is None:
+            with self._lock:
+                if self.store is None:
+                    if self.backend == 'dynamodb':
+                        from app_aws import DynamoRateLimitRepository
+                        self.store = DynamoRateLimitRepository(fail_open=self.fail_open)
+                    else:
+                        self.store = MemoryBucketStore()
+        return self.store
+
+    def allow_attempt(self, ip, email):
+        if not self.enabled:
+            return True
+        store = self._bucket_store()
+        if not store.take(f"ip:{ip}", self.ip_burst, self.ip_per_sec):
+            return False
+        return store.take(f"email:{email}", self.email_burst, self.email_per_sec, cost=0)
+
+    def record_failure(self, email):
+        if self.enabled:
+            self._bucket_store().take(f"email:{email}", self.email_burst, self.email_per_sec)
+
+class UnknownEmailCache:
+    """Emails that recently matched no account, so repeat attempts skip UserRepository.
+
+    Entries are markers in the login limiter's store: this worker's memory,
+    or the shared DynamoDB table, where one keyed read replaces the users
+    table scan and registering clears the entry for every worker. Emails
+    are normalized, and a ttl of 0 disables the cache.
+    """
+
+    def __init__(self, limiter, ttl=60):
+        self.limiter = limiter
+        self.ttl = ttl
+
+    def init_app(self, app):
+        self.ttl = app.config.get('UNKNOWN_EMAIL_CACHE_TTL', self.ttl)
+
+    @staticmethod
+    def _key(email):
+        return f"unknown:{(email or '').strip().lower()}"
+
+    def add(self, email):
+        if self.ttl > 0:
+            self.limiter._bucket_store().add_marker(self._key(email), self.ttl)
+
+    def discard(self, email):
+        if self.ttl > 0:
+            self.limiter._bucket_store().remove_marker(self._key(email))
+
+    def __contains__(self, email):
+        return self.ttl > 0 and self.limiter._bucket_store().has_marker(self._key(email))
+
+# Shared instances, configured by create_app
+login_limiter = LoginRateLimiter()
+unknown_emails = UnknownEmailCache(login_limiter)
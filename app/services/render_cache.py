@@ -0,0 +1,87 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app.models.book import Book
+
+class RenderCache:
+    """In-process LRU cache of rendered HTML fragments.
+
+    Entries are tagged with a generation number; `invalidate()` bumps the
+    generation so every existing entry becomes stale at once. Each gunicorn
+    worker holds its own cache, so `ttl` bounds how long another worker can
+    serve a fragment after a write it did not see.
+    """
+
+    def __init__(self, ttl=60, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('CATALOG_CACHE_TTL', self.ttl)
+        self.max_entries = app.config.get('CATALOG_CACHE_SIZE', self.max_entries)
+
+    def get_or_render(self, key, render):
+        """Return (html, etag) for `key`, calling `render()` on a miss.
+
+        The generation is captured before rendering so a fragment built from
+        data that was invalidated mid-render is never served afterwards.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == self.generation and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2], entry[3]
+            self.misses += 1
+            generation = self.generation
+
+        html = render()
+        etag = hashlib.sha1(html.encode('utf-8')).hexdigest()
+        if self.ttl > 0:
+            with self._lock:
+                if generation == self.generation:
+                    self._entries[key] = (generation, time.monotonic() + self.ttl, html, etag)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+        return html, etag
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+# Rendered /books grid fragments
+catalog_cache = RenderCache()
+
+@event.listens_for(Book, 'after_insert')
+@event.listens_for(Book, 'after_update')
+@event.listens_for(Book, 'after_delete')
+def _book_changed(mapper, connection, target):
+    """Any SQL book write (new title, stock change, delete) invalidates the grid once committed.
+
+    These events fire at flush; invalidating then would let a render between
+    flush and commit cache the old rows under the new generation.
+    """
+    session = object_session(target)
+    if session is not None:
+        session.info['catalog_changed'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_catalog(session):
+    if session.info.pop('catalog_changed', False):
+        catalog_cache.invalidate()
+
+@event.listens_for(Session, 'after_transaction_end')
+def _forget_catalog_change(session, transaction):
+    # A rolled-back write changed nothing
+    if transaction.parent is None:
+        session.info.pop('catalog_changed', None)
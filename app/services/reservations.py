@@ -0,0 +1,217 @@
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models.book import Book
+from app.models.hold import StockHold
+from app.services.render_cache import catalog_cache
+from app.services.stock_shards import sharded_stock
+
+def take_stock(book_id, quantity):
+    """Atomically remove `quantity` available units of a book; False if there are not enough."""
+    taken = sharded_stock.take(book_id, quantity)
+    if taken is None:
+        result = db.session.execute(
+            update(Book).where(Book.id == book_id, Book.stock >= quantity)
+            .values(stock=Book.stock - quantity).execution_options(synchronize_session=False))
+        taken = result.rowcount == 1
+    return taken
+
+def return_stock(amounts):
+    """Put units back: `amounts` maps book_id -> quantity. One UPDATE for all unsharded books."""
+    amounts = {book_id: quantity for book_id, quantity in amounts.items() if quantity}
+    sharded = sharded_stock.totals(amounts) if amounts else {}
+    for book_id in sharded:
+        sharded_stock.give(book_id, amounts.pop(book_id))
+    if amounts:
+        db.session.execute(
+            update(Book).where(Book.id.in_(amounts))
+            .values(stock=Book.stock + case(amounts, value=Book.id)).execution_options(synchronize_session=False))
+
+def held_units():
+    """Units a book's holds own, as a correlated subquery for statements on Book."""
+    return (select(func.coalesce(func.sum(StockHold.quantity), 0))
+            .where(StockHold.book_id == Book.id).scalar_subquery())
+
+def held_by_book(book_ids):
+    """book_id -> units held in carts, for the books among `book_ids` that have holds."""
+    return dict(db.session.execute(
+        select(StockHold.book_id, func.sum(StockHold.quantity))
+        .where(StockHold.book_id.in_(list(book_ids))).group_by(StockHold.book_id)).all())
+
+def prepare_stock_counts(on_hand):
+    """Get ready to store physical counts: `on_hand` maps book_id -> copies on the shelf.
+
+    Book.stock is what can still be sold, i.e. on-hand minus the units held
+    in carts, so a count must be stored as `count - held_units()`. Holds on a
+    book whose new count cannot cover them are dropped (without returning
+    units); those buyers take from the remaining stock at checkout. Runs in
+    the caller's transaction.
+    """
+    book_ids = list(on_hand)
+    for start in range(0, len(book_ids), 500):
+        held = held_by_book(book_ids[start:start + 500])
+        over = [book_id for book_id, units in held.items() if units > on_hand[book_id]]
+        if over:
+            db.session.execute(delete(StockHold).where(StockHold.book_id.in_(over))
+                               .execution_options(synchronize_session=False))
+
+class Reservations:
+    """Time-limited stock holds for carts.
+
+    Adding to the cart (or opening the checkout review) reserves the units:
+    they leave the book's available stock at once, with a conditional
+    UPDATE, so a sold-out title is reported while the buyer is still
+    browsing rather than at checkout. Checkout converts the holds into
+    orders. Expired holds are returned in batches by a sweeper thread
+    (started with the first hold in each worker) or `flask sweep-holds`.
+    Holds are deleted with a conditional DELETE before their units are
+    returned, so a hold claimed by checkout and swept at the same moment
+    is only counted once.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self.ttl = timedelta(minutes=10)
+        self.sweep_seconds = 30
+        self.batch_size = 500
+        self._sweeper = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('STOCK_HOLDS', True)
+        self.ttl = timedelta(minutes=app.config.get('STOCK_HOLD_MINUTES', 10))
+        self.sweep_seconds = app.config.get('STOCK_HOLD_SWEEP_SECONDS', self.sweep_seconds)
+        self.batch_size = app.config.get('STOCK_HOLD_SWEEP_BATCH', self.batch_size)
+
+    def held(self, user_id):
+        """book_id -> units currently held for a buyer."""
+        return dict(db.session.execute(
+            select(StockHold.book_id, StockHold.quantity).where(StockHold.user_id == user_id)).all())
+
+    def expires_at(self, user_id):
+        """When the buyer's earliest hold runs out (None without holds)."""
+        return db.session.execute(
+            select(func.min(StockHold.expires_at)).where(StockHold.user_id == user_id)).scalar()
+
+    def hold(self, user_id, book, quantity):
+        """Reserve `quantity` units of `book` for a buyer, replacing their earlier hold on it.
+
+        Commits on success. Returns False, keeping any earlier hold, when not
+        enough stock is available. With holds disabled this only checks stock.
+        """
+        if not self.enabled:
+            return sharded_stock.available(book) >= quantity
+        self._start_sweeper()
+        try:
+            # The old hold's units go back first, so they count towards the new quantity
+            self._release(StockHold.user_id == user_id, StockHold.book_id == book.id)
+            if quantity > 0:
+                if not take_stock(book.id, quantity):
+                    db.session.rollback()
+                    return False
+                db.session.execute(insert(StockHold).values(
+                    user_id=user_id, book_id=book.id, quantity=quantity, expires_at=datetime.utcnow() + self.ttl))
+            db.session.commit()
+            return True
+        except IntegrityError:
+            # The same buyer placed this hold concurrently (double submit)
+            db.session.rollback()
+            return False
+
+    def release(self, user_id, book_id=None):
+        """Give back a buyer's hold on one book (or all their holds) and commit."""
+        if not self.enabled:
+            return
+        conditions = [StockHold.user_id == user_id]
+        if book_id is not None:
+            conditions.append(StockHold.book_id == book_id)
+        self._release(*conditions)
+        db.session.commit()
+
+    def claim(self, user_id, book_id, quantity):
+        """Turn a buyer's hold into `quantity` sold units, taking any shortfall from stock.
+
+        Runs in the caller's checkout transaction (nothing is committed) and
+        returns False when the units are no longer available; the caller
+        must then roll back, which also restores the hold.
+        """
+        if self.enabled:
+            hold = db.session.execute(select(StockHold.id, StockHold.quantity).where(
+                StockHold.user_id == user_id, StockHold.book_id == book_id)).first()
+            # Expired but not yet swept holds still own their units
+            if hold and db.session.execute(delete(StockHold).where(StockHold.id == hold.id)
+                                           .execution_options(synchronize_session=False)).rowcount:
+                if hold.quantity >= quantity:
+                    return_stock({book_id: hold.quantity - quantity})
+                    return True
+                quantity -= hold.quantity
+        return take_stock(book_id, quantity)
+
+    def sweep(self):
+        """Return the units of every expired hold, one batch per transaction. Returns holds released."""
+        released = 0
+        while True:
+            now = datetime.utcnow()
+            count, found = self._release(StockHold.expires_at < now, limit=self.batch_size)
+            db.session.commit()
+            released += count
+            if found < self.batch_size:
+                break
+        if released:
+            catalog_cache.invalidate()
+        return released
+
+    def _release(self, *conditions, limit=None):
+        """Delete the holds matching `conditions` and return their units. Returns (released, found)."""
+        query = select(StockHold.id, StockHold.book_id, StockHold.quantity).where(*conditions)
+        if limit:
+            query = query.order_by(StockHold.expires_at).limit(limit)
+        rows = db.session.execute(query).all()
+        found = len(rows)
+        if not rows:
+            return 0, 0
+        deleted = db.session.execute(
+            delete(StockHold).where(StockHold.id.in_([row.id for row in rows]), *conditions)
+            .execution_options(synchronize_session=False)).rowcount
+        if deleted != found:
+            # Some were claimed by a checkout meanwhile: return only the ones deleted here
+            db.session.rollback()
+            rows = [row for row in rows if db.session.execute(
+                delete(StockHold).where(StockHold.id == row.id, *conditions)
+                .execution_options(synchronize_session=False)).rowcount]
+        amounts = Counter()
+        for row in rows:
+            amounts[row.book_id] += row.quantity
+        return_stock(amounts)
+        return len(rows), found
+
+    def _start_sweeper(self):
+        if self._sweeper or not self.sweep_seconds:
+            return
+        with self._lock:
+            if not self._sweeper:
+                self._sweeper = threading.Thread(target=self._sweep_forever, args=(self.app,), daemon=True)
+                self._sweeper.start()
+
+    def _sweep_forever(self, app):
+        while True:
+            time.sleep(self.sweep_seconds)
+            with app.app_context():
+                try:
+                    self.sweep()
+                except Exception as e:
+                    print(f"Stock hold sweep Error: {e}")
+                    db.session.rollback()
+
+# Shared instance, configured by create_app
+reservations = Reservations()
+
+def sweep_holds_command():
+    """Return the stock of expired cart holds."""
+    print(f"✓ Released {reservations.sweep()} expired holds.")
@@ -0,0 +1,120 @@
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import and_, false, or_, select, update
+from app.extensions import db
+from app.models.job import BulkJob
+from app.models.user import User
+from app_aws import DynamoUserRepository
+
+# kind -> (target values, selection of users that still need the change).
+# A user leaves the selection once updated, so re-running a job only touches
+# whoever was not finished last time.
+ROLE_CHANGES = {
+    'promote_sellers': (
+        {'role': 'seller', 'is_validated': True},
+        lambda admin_id: User.role == 'buyer',
+    ),
+    'reset_buyers': (
+        {'role': 'buyer', 'is_validated': False},
+        lambda admin_id: and_(User.id != admin_id,
+                              or_(User.role != 'buyer', User.is_validated.is_not(false()))),
+    ),
+}
+
+# A running job that has not reported progress for this long is presumed dead
+STALE_AFTER = timedelta(minutes=5)
+
+class RoleJobRunner:
+    """Runs bulk role changes in a background thread, batch by batch.
+
+    Each batch is written to DynamoDB first (parallel UpdateItems), then the
+    users whose DynamoDB write succeeded or who are SQL-only are updated in
+    SQL. A crash or DynamoDB error therefore leaves those users in the SQL
+    selection, and running the job again finishes them. Progress lives in
+    the BulkJob table so every worker can report it.
+    """
+
+    def __init__(self, batch_size=500, dynamo_workers=8):
+        self.app = None
+        self.batch_size = batch_size
+        self.dynamo_workers = dynamo_workers
+        self._threads = {}
+
+    def init_app(self, app):
+        self.app = app
+        self.batch_size = app.config.get('ROLE_JOB_BATCH_SIZE', self.batch_size)
+        self.dynamo_workers = app.config.get('ROLE_JOB_DYNAMO_WORKERS', self.dynamo_workers)
+
+    def start(self, kind, admin_id):
+        """Start a job (or return the one of this kind already running)."""
+        values, selection = ROLE_CHANGES[kind]
+        active = BulkJob.query.filter(BulkJob.kind == kind, BulkJob.state.in_(('pending', 'running'))).first()
+        if active and datetime.utcnow() - active.updated_at < STALE_AFTER:
+            return active
+        if active:
+            active.state, active.error = 'failed', "Abandoned (no progress); superseded by a new run."
+
+        total = db.session.execute(select(db.func.count(User.id)).where(selection(admin_id))).scalar()
+        job = BulkJob(kind=kind, requested_by=admin_id, total=total)
+        db.session.add(job)
+        db.session.commit()
+
+        thread = threading.Thread(target=self._run, args=(self.app, job.id, kind, admin_id), daemon=True)
+        self._threads[job.id] = thread
+        thread.start()
+        return job
+
+    def wait(self, job_id, timeout=None):
+        """Block until a job started by this worker finishes (tests, CLI)."""
+        thread = self._threads.get(job_id)
+        if thread:
+            thread.join(timeout)
+
+    def _run(self, app, job_id, kind, admin_id):
+        values, selection = ROLE_CHANGES[kind]
+        with app.app_context():
+            job = db.session.get(BulkJob, job_id)
+            job.state, job.updated_at = 'running', datetime.utcnow()
+            db.session.commit()
+            try:
+                dynamo = DynamoUserRepository()
+                last_id = 0
+                while True:
+                    user_ids = db.session.execute(
+                        select(User.id).where(selection(admin_id), User.id > last_id)
+                        .order_by(User.id).limit(self.batch_size)
+                    ).scalars().all()
+                    if not user_ids:
+                        break
+                    last_id = user_ids[-1]
+
+                    try:
+                        outcome = dynamo.update_roles_many(user_ids, values['role'], values['is_validated'],
+                                                           max_workers=self.dynamo_workers)
+                    except Exception as e:
+                        print(f"DynamoDB Sync Error: {e}")
+                        outcome = {user_id: 'error' for user_id in user_ids}
+                    done = [user_id for user_id in user_ids if outcome[user_id] != 'error']
+
+                    if done:
+                        # Re-check the selection so concurrent edits are not overwritten
+                        db.session.execute(update(User).where(User.id.in_(done), selection(admin_id))
+                                           .values(**values).execution_options(synchronize_session=False))
+                    job.processed += len(done)
+                    job.failed += len(user_ids) - len(done)
+                    job.updated_at = datetime.utcnow()
+                    db.session.commit()
+
+                job.state = 'failed' if job.failed else 'done'
+                if job.failed:
+                    job.error = f"{job.failed} users could not be synced to DynamoDB; run the job again to retry them."
+            except Exception as e:
+                db.session.rollback()
+                job = db.session.get(BulkJob, job_id)
+                job.state, job.error = 'failed', str(e)[:500]
+            job.updated_at = datetime.utcnow()
+            db.session.commit()
+            self._threads.pop(job_id, None)
+
+# Shared instance, configured by create_app
+role_jobs = RoleJobRunner()
@@ -0,0 +1,227 @@
+from collections import defaultdict
+from datetime import timedelta
+from sqlalchemy import Integer, cast, delete, event, func, inspect, select
+from app.extensions import db
+from app.models.book import Book
+from app.models.order import Order
+from app.models.rollup import SalesRollup
+from app.services.db_pool import read_session
+
+GRANULARITIES = ('hour', 'day', 'month')
+CANCELLED = 'Cancelled'
+
+def bucket_start(moment, granularity):
+    if granularity == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == 'day':
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def next_bucket(start, granularity):
+    if granularity == 'hour':
+        return start + timedelta(hours=1)
+    if granularity == 'day':
+        return start + timedelta(days=1)
+    return (start + timedelta(days=32)).replace(day=1)
+
+def previous_bucket(start, granularity):
+    if granularity == 'hour':
+        return start - timedelta(hours=1)
+    if granularity == 'day':
+        return start - timedelta(days=1)
+    return (start - timedelta(days=1)).replace(day=1)
+
+def seller_book_key(seller_id, book_id=''):
+    """'<seller_id>:<book_id>'; with no book id, the prefix every key of that seller starts with."""
+    return f"{seller_id}:{book_id}"
+
+def add_contribution(deltas, order_date, status, total_price, quantity, book_id, seller_id, sign=1):
+    """Add (or with sign=-1 remove) one order's share of every rollup row to `deltas`."""
+    counted = status != CANCELLED
+    revenue, units = (total_price or 0) * sign, (quantity or 0) * sign
+    for granularity in GRANULARITIES:
+        start = bucket_start(order_date, granularity)
+        deltas[(granularity, start, 'status', status or '')][2] += sign
+        if counted:
+            seller = str(seller_id or 'system')
+            keys = [('all', ''), ('seller', seller), ('book', str(book_id))]
+            if granularity == 'month':
+                keys.append(('seller_book', seller_book_key(seller, book_id)))
+            for dimension, key in keys:
+                row = deltas[(granularity, start, dimension, key)]
+                row[0] += revenue
+                row[1] += units
+                row[2] += sign
+
+def new_deltas():
+    return defaultdict(lambda: [0.0, 0, 0])
+
+def apply_deltas(connection, deltas):
+    """Upsert-add `deltas` into sales_rollup in one executemany."""
+    rows = [
+        {'granularity': g, 'bucket_start': start, 'dimension': dim, 'dimension_key': key,
+         'revenue': revenue, 'units': units, 'orders': orders}
+        for (g, start, dim, key), (revenue, units, orders) in deltas.items()
+        if revenue or units or orders
+    ]
+    if not rows:
+        return
+    table = SalesRollup.__table__
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['granularity', 'bucket_start', 'dimension', 'dimension_key'],
+            set_={column: table.c[column] + stmt.excluded[column] for column in ('revenue', 'units', 'orders')}
+        )
+    elif dialect in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table)
+        stmt = stmt.on_duplicate_key_update(
+            **{column: table.c[column] + stmt.inserted[column] for column in ('revenue', 'units', 'orders')}
+        )
+    else:
+        for row in rows:
+            key = (table.c.granularity == row['granularity']) & (table.c.bucket_start == row['bucket_start']) \
+                & (table.c.dimension == row['dimension']) & (table.c.dimension_key == row['dimension_key'])
+            updated = connection.execute(table.update().where(key).values(
+                revenue=table.c.revenue + row['revenue'], units=table.c.units + row['units'],
+                orders=table.c.orders + row['orders']))
+            if not updated.rowcount:
+                connection.execute(table.insert().values(**row))
+        return
+    connection.execute(stmt, rows)
+
+def _seller_of(connection, book_id):
+    return connection.execute(select(Book.seller_id).where(Book.id == book_id)).scalar()
+
+def _old_value(state, attr):
+    history = state.attrs[attr].history
+    return history.deleted[0] if history.deleted else getattr(state.obj(), attr)
+
+# Incremental maintenance: every ORM write to an order adjusts its rollup rows in the
+# same transaction. Core-level bulk UPDATEs of orders must call apply_deltas themselves.
+@event.listens_for(Order, 'after_insert')
+def _order_inserted(mapper, connection, order):
+    deltas = new_deltas()
+    add_contribution(deltas, order.order_date, order.status, order.total_price, order.quantity,
+                     order.book_id, _seller_of(connection, order.book_id))
+    apply_deltas(connection, deltas)
+
+@event.listens_for(Order, 'after_update')
+def _order_updated(mapper, connection, order):
+    state = inspect(order)
+    fields = ('order_date', 'status', 'total_price', 'quantity', 'book_id')
+    if not any(state.attrs[field].history.has_changes() for field in fields):
+        return
+    old = {field: _old_value(state, field) for field in fields}
+    deltas = new_deltas()
+    add_contribution(deltas, old['order_date'], old['status'], old['total_price'], old['quantity'],
+                     old['book_id'], _seller_of(connection, old['book_id']), sign=-1)
+    add_contribution(deltas, order.order_date, order.status, order.total_price, order.quantity,
+                     order.book_id, _seller_of(connection, order.book_id))
+    apply_deltas(connection, deltas)
+
+@event.listens_for(Order, 'after_delete')
+def _order_deleted(mapper, connection, order):
+    deltas = new_deltas()
+    add_contribution(deltas, order.order_date, order.status, order.total_price, order.quantity,
+                     order.book_id, _seller_of(connection, order.book_id), sign=-1)
+    apply_deltas(connection, deltas)
+
+def backfill(chunk_size=5000, report=print):
+    """Rebuild every rollup row from the orders table, `chunk_size` orders at a time.
+
+    Run it while checkouts are quiet: orders placed between the wipe and the
+    end of the pass could be counted twice.
+    """
+    db.session.execute(delete(SalesRollup))
+    db.session.commit()
+    max_id = db.session.execute(select(func.max(Order.id))).scalar() or 0
+    processed = 0
+    for low in range(0, max_id, chunk_size):
+        rows = db.session.execute(
+            select(Order.order_date, Order.status, Order.total_price, Order.quantity, Order.book_id, Book.seller_id)
+            .outerjoin(Book, Order.book_id == Book.id)
+            .where(Order.id > low, Order.id <= low + chunk_size)
+        ).all()
+        deltas = new_deltas()
+        for row in rows:
+            add_contribution(deltas, *row)
+        apply_deltas(db.session.connection(), deltas)
+        db.session.commit()
+        processed += len(rows)
+        report(f"  orders up to id {min(low + chunk_size, max_id)}: {processed} processed")
+    return processed
+
+def series(granularity, start, end, dimension='all', key=''):
+    """[(bucket_start, revenue, units, orders)] for every bucket in [start, end), zero-filled."""
+    rows = read_session().execute(
+        select(SalesRollup.bucket_start, SalesRollup.revenue, SalesRollup.units, SalesRollup.orders)
+        .where(SalesRollup.granularity == granularity, SalesRollup.dimension == dimension,
+               SalesRollup.dimension_key == key,
+               SalesRollup.bucket_start >= start, SalesRollup.bucket_start < end)
+    ).all()
+    found = {row[0]: tuple(row[1:]) for row in rows}
+    points, bucket = [], bucket_start(start, granularity)
+    while bucket < end:
+        points.append((bucket, *found.get(bucket, (0, 0, 0))))
+        bucket = next_bucket(bucket, granularity)
+    return points
+
+def _in_range(stmt, start, end):
+    if start:
+        stmt = stmt.where(SalesRollup.bucket_start >= start)
+    if end:
+        stmt = stmt.where(SalesRollup.bucket_start < end)
+    return stmt
+
+def totals(dimension='all', key='', granularity='month', start=None, end=None):
+    """(revenue, units, orders) summed over the buckets in [start, end); all time by default."""
+    stmt = select(func.coalesce(func.sum(SalesRollup.revenue), 0), func.coalesce(func.sum(SalesRollup.units), 0),
+                  func.coalesce(func.sum(SalesRollup.orders), 0)).where(
+        SalesRollup.granularity == granularity, SalesRollup.dimension == dimension, SalesRollup.dimension_key == key)
+    return tuple(read_session().execute(_in_range(stmt, start, end)).one())
+
+def breakdown(dimension, granularity='month', start=None, end=None, limit=10):
+    """[(dimension_key, revenue, units, orders)] summed over the buckets in [start, end)."""
+    revenue = func.sum(SalesRollup.revenue)
+    order_by = func.sum(SalesRollup.orders) if dimension == 'status' else revenue
+    stmt = select(SalesRollup.dimension_key, revenue, func.sum(SalesRollup.units), func.sum(SalesRollup.orders)) \
+        .where(SalesRollup.granularity == granularity, SalesRollup.dimension == dimension)
+    return read_session().execute(
+        _in_range(stmt, start, end).group_by(SalesRollup.dimension_key).order_by(order_by.desc()).limit(limit)
+    ).all()
+
+def status_counts(granularity='month', start=None, end=None):
+    """[(status, count)] of orders by current status, cancelled included."""
+    count = func.sum(SalesRollup.orders)
+    stmt = select(SalesRollup.dimension_key.label('status'), count.label('count')) \
+        .where(SalesRollup.granularity == granularity, SalesRollup.dimension == 'status')
+    return read_session().execute(
+        _in_range(stmt, start, end).group_by(SalesRollup.dimension_key).having(count > 0).order_by(count.desc())
+    ).all()
+
+def top_books(limit=5, granularity='month', start=None, end=None):
+    """[(title, author, order_count, revenue)] for the most ordered books."""
+    order_count = func.sum(SalesRollup.orders)
+    stmt = select(SalesRollup.dimension_key, order_count.label('order_count'),
+                  func.sum(SalesRollup.revenue).label('revenue')) \
+        .where(SalesRollup.granularity == granularity, SalesRollup.dimension == 'book')
+    # Rank the rollup keys first so only the top rows are joined to their books
+    ranked = _in_range(stmt, start, end).group_by(SalesRollup.dimension_key) \
+        .order_by(order_count.desc()).limit(limit).subquery()
+    return read_session().execute(
+        select(Book.title, Book.author, ranked.c.order_count, ranked.c.revenue)
+        .join(ranked, Book.id == cast(ranked.c.dimension_key, Integer)).order_by(ranked.c.order_count.desc())
+    ).all()
+
+def backfill_command(chunk_size):
+    """Rebuild sales rollups from historical orders."""
+    print("Rebuilding sales rollups...")
+    total = backfill(chunk_size=chunk_size)
+    print(f"✓ Rolled up {total} orders.")
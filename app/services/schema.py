@@ -0,0 +1,29 @@
+from sqlalchemy import inspect, text
+from app.extensions import db
+
+def upgrade_schema():
+    """Create missing tables, then add the columns and indexes existing tables lack.
+
+    db.create_all() never alters a table that already exists, so a database
+    created before a column such as book.genre was added needs it added here
+    before anything queries the model. Only nullable columns can be added
+    this way; returns the "table.column" names that were.
+    """
+    db.create_all()
+    inspector = inspect(db.engine)
+    preparer = db.engine.dialect.identifier_preparer
+    added = []
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                connection.execute(text(
+                    f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} "
+                    f"{column.type.compile(dialect=db.engine.dialect)}"))
+                added.append(f"{table.name}.{column.name}")
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+    return added
@@ -0,0 +1,57 @@
+from sqlalchemy import insert, select, update
+from app.extensions import db
+
+BATCH_SIZE = 1000
+
+def _key(values, columns):
+    return tuple(values[column] for column in columns)
+
+def upsert_rows(model, rows, key_columns, update_columns, insert_only_columns=(), batch_size=BATCH_SIZE):
+    """Insert new rows and update changed ones, matched on a natural key.
+
+    Existing keys and their current values are read in one query; rows whose
+    `update_columns` already match are skipped, so re-running a seed touches
+    nothing. `insert_only_columns` (e.g. live stock, password hashes) are
+    written for new rows but never overwrite existing data. Nothing is
+    committed; the caller decides the transaction boundary.
+
+    Returns (inserted, updated, unchanged) where inserted and updated are
+    lists of row dicts (updated ones with 'id', the natural key under '_key'
+    and an '_old' dict of the replaced values) and unchanged is a count.
+    """
+    columns = [getattr(model, column) for column in (*key_columns, *update_columns)]
+    existing = {}
+    for row in db.session.execute(select(model.id, *columns)):
+        existing[tuple(row[1:1 + len(key_columns)])] = (row[0], dict(zip(update_columns, row[1 + len(key_columns):])))
+
+    inserted, updated, unchanged, seen = [], [], 0, set()
+    for row in rows:
+        key = _key(row, key_columns)
+        if key in seen:
+            continue  # first occurrence in the input wins
+        seen.add(key)
+        if key not in existing:
+            inserted.append({column: row[column] for column in (*key_columns, *update_columns, *insert_only_columns)
+                             if column in row})
+            continue
+        row_id, current = existing[key]
+        changes = {column: row[column] for column in update_columns
+                   if column in row and not _same(row[column], current[column])}
+        if changes:
+            updated.append({'id': row_id, **changes, '_key': key, '_old': current})
+        else:
+            unchanged += 1
+
+    for start in range(0, len(inserted), batch_size):
+        db.session.execute(insert(model), inserted[start:start + batch_size])
+    for start in range(0, len(updated), batch_size):
+        batch = [{column: value for column, value in row.items() if not column.startswith('_')}
+                 for row in updated[start:start + batch_size]]
+        # Executemany UPDATE by primary key; the session cache is not refreshed
+        db.session.execute(update(model), batch, execution_options={'synchronize_session': False})
+    return inserted, updated, unchanged
+
+def _same(new, old):
+    if isinstance(new, float) or isinstance(old, float):
+        return old is not None and new is not None and abs(float(new) - float(old)) < 0.005
+    return new == old
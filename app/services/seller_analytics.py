@@ -0,0 +1,55 @@
+from sqlalchemy import Integer, case, cast, func, select
+from app.extensions import db
+from app.models.book import Book
+from app.models.rollup import SalesRollup
+from app.services import sales_rollups
+from app.services.db_pool import read_session
+
+LOW_STOCK = 10
+
+def inventory_summary(seller_id):
+    """Listing count, total units and out-of-stock/low-stock counts in one query."""
+    row = db.session.execute(
+        select(
+            func.count(Book.id),
+            func.coalesce(func.sum(Book.stock), 0),
+            func.coalesce(func.sum(case((Book.stock <= 0, 1), else_=0)), 0),
+            func.coalesce(func.sum(case(((Book.stock > 0) & (Book.stock < LOW_STOCK), 1), else_=0)), 0),
+        ).where(Book.seller_id == seller_id)
+    ).one()
+    return {'listings': row[0], 'total_stock': row[1], 'out_of_stock': row[2], 'low_stock': row[3]}
+
+def sales_summary(seller_id):
+    """Order count, units sold and revenue for the seller's books, from the sales rollups."""
+    revenue, units, orders = sales_rollups.totals('seller', str(seller_id))
+    return {'orders': orders, 'units_sold': units, 'revenue': revenue,
+            'average_order': revenue / orders if orders else 0}
+
+def revenue_by_month(seller_id, months=12):
+    """[(YYYY-MM, revenue, units)] for the most recent `months` months with sales."""
+    rows = read_session().execute(
+        select(SalesRollup.bucket_start, SalesRollup.revenue, SalesRollup.units)
+        .where(SalesRollup.granularity == 'month', SalesRollup.dimension == 'seller',
+               SalesRollup.dimension_key == str(seller_id), SalesRollup.units != 0)
+        .order_by(SalesRollup.bucket_start.desc()).limit(months)
+    ).all()
+    return [(start.strftime('%Y-%m'), revenue, units) for start, revenue, units in reversed(rows)]
+
+def top_titles(seller_id, limit=5):
+    """[(title, units, revenue)] for the seller's best-selling books by revenue.
+
+    Reads only this seller's 'seller_book' rollup rows: a range of
+    ix_sales_rollup_key, not every book's rows.
+    """
+    prefix = sales_rollups.seller_book_key(seller_id)
+    revenue = func.sum(SalesRollup.revenue)
+    # ';' sorts right after ':', so the range holds exactly the keys starting with the prefix
+    ranked = (select(SalesRollup.dimension_key, func.sum(SalesRollup.units).label('units'), revenue.label('revenue'))
+              .where(SalesRollup.granularity == 'month', SalesRollup.dimension == 'seller_book',
+                     SalesRollup.dimension_key >= prefix, SalesRollup.dimension_key < prefix[:-1] + ';')
+              .group_by(SalesRollup.dimension_key).order_by(revenue.desc()).limit(limit).subquery())
+    book_id = cast(func.substr(ranked.c.dimension_key, len(prefix) + 1), Integer)
+    return read_session().execute(
+        select(Book.title, ranked.c.units, ranked.c.revenue)
+        .join(ranked, Book.id == book_id).order_by(ranked.c.revenue.desc())
+    ).all()
@@ -0,0 +1,74 @@
+import threading
+from contextlib import contextmanager
+from sqlalchemy import event
+from app.extensions import db
+
+class SQLiteTuner:
+    """Production pragmas and write serialization for file-backed SQLite.
+
+    Every new connection gets WAL journaling, synchronous=NORMAL, a busy
+    timeout, a larger page cache and memory-mapped reads. Ordinary
+    transactions keep the sqlite3 driver's lazy BEGIN, issued just before the
+    first write, so plain reads never hold a snapshot that a write would have
+    to upgrade. With the single writer on, `serialized_write()` opens its
+    transaction with BEGIN IMMEDIATE instead: the write lock is taken before
+    the block's reads, and other workers wait on busy_timeout instead of
+    failing with "database is locked".
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.single_writer = False
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Attach connect/begin hooks to the app's SQLite engine. Call right after db.init_app."""
+        with app.app_context():
+            engine = db.engine
+        database = engine.url.database
+        self.enabled = (app.config.get('SQLITE_TUNING', True) and engine.dialect.name == 'sqlite'
+                        and database not in (None, '', ':memory:'))
+        self.single_writer = self.enabled and app.config.get('SQLITE_SINGLE_WRITER', False)
+        if not self.enabled:
+            return
+
+        pragmas = [
+            f"PRAGMA journal_mode={app.config.get('SQLITE_JOURNAL_MODE', 'WAL')}",
+            f"PRAGMA synchronous={app.config.get('SQLITE_SYNCHRONOUS', 'NORMAL')}",
+            f"PRAGMA busy_timeout={int(app.config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))}",
+            # Negative cache_size is in KiB rather than pages
+            f"PRAGMA cache_size=-{int(app.config.get('SQLITE_CACHE_SIZE_KB', 65536))}",
+            f"PRAGMA mmap_size={int(app.config.get('SQLITE_MMAP_SIZE', 268435456))}",
+            "PRAGMA temp_store=MEMORY",
+        ]
+
+        @event.listens_for(engine, 'connect')
+        def _on_connect(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+    @contextmanager
+    def serialized_write(self):
+        """Run a read-modify-write block as this worker's only write transaction.
+
+        Threads queue on a lock, the current read transaction is ended so the
+        block's reads see the latest committed data, and the new transaction
+        starts with BEGIN IMMEDIATE. The block must commit; anything left
+        uncommitted is rolled back. A no-op unless SQLITE_SINGLE_WRITER is on.
+        """
+        if not self.single_writer:
+            yield
+            return
+        with self._lock:
+            db.session.commit()
+            try:
+                # The driver sees the open transaction and skips its own BEGIN
+                db.session.connection().exec_driver_sql("BEGIN IMMEDIATE")
+                yield
+            finally:
+                db.session.rollback()
+
+# Shared instance, configured by create_app
+sqlite_tuner = SQLiteTuner()
@@ -0,0 +1,198 @@
+import random
+import threading
+import time
+from sqlalchemy import delete, func, insert, select, update
+from app.extensions import db
+from app.models.book import Book
+from app.models.stock_shard import StockShard
+
+def split(total, shards):
+    """Spread `total` units over `shards` counters as evenly as possible."""
+    share, extra = divmod(max(int(total), 0), shards)
+    return [share + (1 if n < extra else 0) for n in range(shards)]
+
+class ShardedStock:
+    """Stock counters for hot titles, split over N shard rows.
+
+    A checkout of a flagged title decrements one randomly chosen shard with
+    a conditional UPDATE (stock >= quantity) and moves on to the others when
+    that shard runs dry, so concurrent buyers contend on N row locks instead
+    of one. Reads sum the shards and are cached per worker for
+    `cache_seconds`. Book.stock mirrors the total so listings and reports
+    keep reading one column; a worker rewrites it at most every
+    `mirror_seconds`. Books without shard rows use Book.stock as before.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.default_shards = 8
+        self.cache_seconds = 2.0
+        self.mirror_seconds = 5.0
+        self._lock = threading.Lock()
+        self._sharded = (frozenset(), 0.0)  # (book ids, expires)
+        self._totals = {}    # book_id -> (total, expires)
+        self._mirrored = {}  # book_id -> time of the last Book.stock rewrite
+
+    def init_app(self, app):
+        self.enabled = app.config.get('STOCK_SHARDING', True)
+        self.default_shards = app.config.get('STOCK_SHARDS', self.default_shards)
+        self.cache_seconds = app.config.get('STOCK_SHARD_CACHE_SECONDS', self.cache_seconds)
+        self.mirror_seconds = app.config.get('STOCK_SHARD_MIRROR_SECONDS', self.mirror_seconds)
+        self.clear_cache()
+
+    def clear_cache(self):
+        with self._lock:
+            self._sharded = (frozenset(), 0.0)
+            self._totals.clear()
+
+    # Reads
+
+    def sharded_ids(self):
+        """Ids of the books whose stock is sharded (cached)."""
+        book_ids, expires = self._sharded
+        if time.monotonic() >= expires:
+            book_ids = frozenset(db.session.execute(select(StockShard.book_id).distinct()).scalars())
+            self._sharded = (book_ids, time.monotonic() + self.cache_seconds)
+        return book_ids
+
+    def available(self, book):
+        """Units of `book` that can be sold: the cached shard sum for hot titles, else book.stock."""
+        if not self.enabled or book.id not in self.sharded_ids():
+            return book.stock or 0
+        cached = self._totals.get(book.id)
+        if cached and time.monotonic() < cached[1]:
+            return cached[0]
+        total = self.totals([book.id]).get(book.id, 0)
+        with self._lock:
+            self._totals[book.id] = (total, time.monotonic() + self.cache_seconds)
+        return total
+
+    def totals(self, book_ids):
+        """Current shard sums (uncached) for the sharded books among `book_ids`."""
+        return dict(db.session.execute(
+            select(StockShard.book_id, func.sum(StockShard.stock))
+            .where(StockShard.book_id.in_(list(book_ids))).group_by(StockShard.book_id)
+        ).all())
+
+    def totals_by_shard(self, book_id):
+        """shard -> stock for one book ({} when it is not sharded)."""
+        return dict(db.session.execute(
+            select(StockShard.shard, StockShard.stock).where(StockShard.book_id == book_id)).all())
+
+    # Writes (all run in the caller's transaction; nothing is committed here)
+
+    def take(self, book_id, quantity):
+        """Remove `quantity` units from a sharded title.
+
+        Returns None when the book is not sharded (the caller updates
+        Book.stock itself), otherwise True, or False when the shards together
+        hold fewer than `quantity` units (nothing is taken then).
+        """
+        if not self.enabled:
+            return None
+        stocks = self.totals_by_shard(book_id)
+        if not stocks:
+            return None
+        order = list(stocks)
+        random.shuffle(order)
+        # One conditional write on a shard that looked big enough; fall over to the rest
+        for shard in sorted(order, key=lambda shard: stocks[shard] < quantity):
+            if self._decrement(book_id, shard, quantity):
+                self._changed(book_id)
+                return True
+
+        # No single shard holds the whole quantity: gather it from several
+        taken, remaining = [], quantity
+        for shard in order:
+            amount = min(remaining, stocks[shard])
+            if amount > 0 and self._decrement(book_id, shard, amount):
+                taken.append((shard, amount))
+                remaining -= amount
+                if not remaining:
+                    self._changed(book_id)
+                    return True
+        for shard, amount in taken:
+            self._increment(book_id, shard, amount)
+        return False
+
+    def give(self, book_id, quantity):
+        """Return `quantity` units to a random shard. False when the book is not sharded."""
+        if not self.enabled:
+            return False
+        shards = db.session.execute(select(StockShard.shard).where(StockShard.book_id == book_id)).scalars().all()
+        if not shards:
+            return False
+        self._increment(book_id, random.choice(shards), quantity)
+        self._changed(book_id)
+        return True
+
+    def set_total(self, book_id, total, shards=None):
+        """Shard a book's stock (again): `total` units spread over `shards` rows, mirrored to Book.stock."""
+        shards = shards or len(self.totals_by_shard(book_id)) or self.default_shards
+        db.session.execute(delete(StockShard).where(StockShard.book_id == book_id))
+        db.session.execute(insert(StockShard), [
+            {'book_id': book_id, 'shard': shard, 'stock': stock} for shard, stock in enumerate(split(total, shards))])
+        db.session.execute(update(Book).where(Book.id == book_id).values(stock=max(int(total), 0))
+                           .execution_options(synchronize_session=False))
+        self._mirrored[book_id] = time.monotonic()
+        self.clear_cache()
+
+    def enable(self, book_id, shards=None):
+        """Flag a book as hot: move its stock (or its current shard sum) into `shards` counters."""
+        total = self.totals([book_id]).get(book_id)
+        if total is None:
+            total = db.session.execute(
+                select(func.coalesce(Book.stock, 0)).where(Book.id == book_id)).scalar_one_or_none()
+            if total is None:
+                return None
+        self.set_total(book_id, total, shards or self.default_shards)
+        return total
+
+    def disable(self, book_id):
+        """Fold a book's shards back into Book.stock."""
+        if not self.totals_by_shard(book_id):
+            return
+        self.mirror(book_id)
+        db.session.execute(delete(StockShard).where(StockShard.book_id == book_id))
+        self.clear_cache()
+
+    def mirror(self, book_id):
+        """Rewrite Book.stock with the shard sum."""
+        total = select(func.coalesce(func.sum(StockShard.stock), 0)).where(StockShard.book_id == book_id)
+        db.session.execute(update(Book).where(Book.id == book_id).values(stock=total.scalar_subquery())
+                           .execution_options(synchronize_session=False))
+        self._mirrored[book_id] = time.monotonic()
+
+    def _decrement(self, book_id, shard, amount):
+        result = db.session.execute(
+            update(StockShard)
+            .where(StockShard.book_id == book_id, StockShard.shard == shard, StockShard.stock >= amount)
+            .values(stock=StockShard.stock - amount).execution_options(synchronize_session=False))
+        return result.rowcount == 1
+
+    def _increment(self, book_id, shard, amount):
+        db.session.execute(
+            update(StockShard).where(StockShard.book_id == book_id, StockShard.shard == shard)
+            .values(stock=StockShard.stock + amount).execution_options(synchronize_session=False))
+
+    def _changed(self, book_id):
+        self._totals.pop(book_id, None)
+        # Keep the hot Book row out of most transactions: one mirror write per interval
+        if time.monotonic() - self._mirrored.get(book_id, float('-inf')) >= self.mirror_seconds:
+            self.mirror(book_id)
+
+# Shared instance, configured by create_app
+sharded_stock = ShardedStock()
+
+def shard_stock_command(book_id, shards):
+    """Split a hot title's stock over SHARDS counters (0 folds them back into the book row)."""
+    if shards:
+        total = sharded_stock.enable(book_id, shards)
+        if total is None:
+            print(f"Book {book_id} not found.")
+            return
+        print(f"✓ Book {book_id}: {total} units over {shards} shards.")
+    else:
+        sharded_stock.disable(book_id)
+        print(f"✓ Book {book_id}: stock folded back into the book row.")
+    db.session.commit()
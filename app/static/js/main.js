@@ -65,3 +65,21 @@ style.textContent = `
     }
 `;
 document.head.appendChild(style);
+
+// Bulk job progress (admin users page): poll running jobs until they finish
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('.bulk-job').forEach(row => {
+        if (row.dataset.state !== 'pending' && row.dataset.state !== 'running') return;
+        const poll = setInterval(() => {
+            fetch(row.dataset.jobUrl)
+                .then(response => response.json())
+                .then(job => {
+                    row.querySelector('.job-state').textContent = job.state;
+                    row.querySelector('.job-progress').textContent = `${job.processed} / ${job.total}`;
+                    row.querySelector('.job-failed').textContent = job.failed;
+                    if (job.state === 'done' || job.state === 'failed') clearInterval(poll);
+                })
+                .catch(() => clearInterval(poll));
+        }, 2000);
+    });
+});
@@ -1,15 +1,14 @@
-import boto3
 import os
 import sys
+import time
 import argparse
-from dotenv import load_dotenv
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 
-# Load environment variables
-load_dotenv()
-
-from botocore.exceptions import ClientError
+# boto3 (~200 ms to import) and .env loading are deferred to first AWS use,
+# so importing this module from the web app stays cheap at worker boot.
+from botocore.exceptions import BotoCoreError, ClientError
 from decimal import Decimal
-from werkzeug.security import generate_password_hash
 # Hardcoded Configuration (Edit these directly)
 AWS_REGION = "us-east-1"
 SNS_TOPIC_ARN = "arn:aws:sns:us-east-1:339713020789:BookBazaarNotifications"
@@ -18,6 +17,62 @@ SNS_TOPIC_ARN = "arn:aws:sns:us-east-1:339713020789:BookBazaarNotifications"
 DYNAMODB_BOOKS_TABLE = "BookBazaarBooks"
 DYNAMODB_USERS_TABLE = "BookBazaarUsers"
 DYNAMODB_ORDERS_TABLE = "BookBazaarOrders"
+DYNAMODB_RATE_LIMITS_TABLE = "BookBazaarRateLimits"
+
+# Catalog listing is spread over N partitions of TypeIndex ('book#shard0'..)
+# instead of a single hot 'book' partition.
+LISTING_SHARDS = int(os.environ.get('LISTING_SHARDS', 4))
+
+# Browse indexes on the Books table: index name -> partition key attribute
+BROWSE_INDEXES = {
+    'author': ('AuthorIndex', 'author_key'),
+    'genre': ('GenreIndex', 'genre_key'),
+    'price': ('PriceBucketIndex', 'price_bucket'),
+}
+
+# Upper edges (INR) of the price buckets used by PriceBucketIndex
+PRICE_BUCKET_EDGES = [250, 500, 750, 1000]
+
+def listing_shard(book_id):
+    """Stable listing partition for a book id, e.g. 'book#shard2'."""
+    return f"book#shard{zlib.crc32(str(book_id).encode('utf-8')) % LISTING_SHARDS}"
+
+def price_bucket(price):
+    """Label of the price bucket a price falls into, e.g. '250-500' or '1000+'."""
+    lower = 0
+    for edge in PRICE_BUCKET_EDGES:
+        if float(price) < edge:
+            return f"{lower}-{edge}"
+        lower = edge
+    return f"{lower}+"
+
+def price_bucket_labels():
+    """All price bucket labels in ascending order."""
+    bounds = [0] + PRICE_BUCKET_EDGES
+    labels = [f"{lo}-{hi}" for lo, hi in zip(bounds, bounds[1:])]
+    return labels + [f"{PRICE_BUCKET_EDGES[-1]}+"]
+
+def price_bucket_range(label):
+    """Inverse of price_bucket: (min_price, max_price) with max_price None for the top bucket."""
+    lower, _, upper = label.partition('-')
+    if label.endswith('+'):
+        return float(label[:-1]), None
+    return float(lower), float(upper)
+
+def normalize_key(value):
+    """Case-insensitive partition key value for author/genre browse indexes."""
+    return ' '.join(str(value).split()).lower()
+
+def book_index_attributes(book_data):
+    """Derived attributes that place a book item in the listing and browse indexes."""
+    attributes = {'type': listing_shard(book_data['id'])}
+    if book_data.get('author'):
+        attributes['author_key'] = normalize_key(book_data['author'])
+    if book_data.get('genre'):
+        attributes['genre_key'] = normalize_key(book_data['genre'])
+    if book_data.get('price') is not None:
+        attributes['price_bucket'] = price_bucket(book_data['price'])
+    return attributes
 
 class AWSApp:
     """Central point for AWS resource management."""
@@ -42,15 +97,28 @@ class AWSApp:
     @property
     def dynamodb(self):
         if self._dynamodb is None:
-            self._dynamodb = boto3.resource('dynamodb', region_name=self.region)
+            self._dynamodb = _boto3().resource('dynamodb', region_name=self.region)
         return self._dynamodb
         
     @property
     def sns(self):
         if self._sns is None:
-            self._sns = boto3.client('sns', region_name=self.region)
+            self._sns = _boto3().client('sns', region_name=self.region)
         return self._sns
 
+_env_loaded = False
+
+def _boto3():
+    """Import boto3 on first use, loading AWS settings from .env beforehand."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+    import boto3
+    import boto3.dynamodb.conditions
+    return boto3
+
 # Global instance for easy access
 aws_app = AWSApp()
 
@@ -83,6 +151,40 @@ class SNSNotifier:
         except ClientError as e:
             print(f"[AWS SNS ERROR] {e.response['Error']['Message']}")
 
+    def send_batch(self, messages):
+        """Publish up to ten (email, message) pairs with one PublishBatch call. Returns how many were accepted."""
+        return len(messages) - len(self.publish_batch(messages))
+
+    def publish_batch(self, messages):
+        """Like send_batch, but returns the positions in `messages` that SNS refused."""
+        if not self.topic_arn:
+            for email, message in messages:
+                print(f"[AWS SNS MOCK] No Topic ARN found. Notification for {email}: {message}")
+            return []
+
+        try:
+            response = self.aws.sns.publish_batch(
+                TopicArn=self.topic_arn,
+                PublishBatchRequestEntries=[{
+                    'Id': str(n),
+                    'Message': message,
+                    'Subject': "BookBazaar Order Update",
+                    'MessageAttributes': {
+                        'email': {
+                            'DataType': 'String',
+                            'StringValue': email
+                        }
+                    }
+                } for n, (email, message) in enumerate(messages)]
+            )
+            for failure in response.get('Failed', []):
+                print(f"[AWS SNS ERROR] {failure.get('Code')}: {failure.get('Message')}")
+            accepted = {int(entry['Id']) for entry in response.get('Successful', [])}
+            return [n for n in range(len(messages)) if n not in accepted]
+        except ClientError as e:
+            print(f"[AWS SNS ERROR] {e.response['Error']['Message']}")
+            return list(range(len(messages)))
+
 class DynamoBookRepository:
     """AWS DynamoDB implementation for Book repository."""
     
@@ -92,15 +194,69 @@ class DynamoBookRepository:
         self.table = self.aws.dynamodb.Table(self.table_name)
         
     def get_paginated(self, limit=8, last_key=None):
-        """Query Books table using TypeIndex for efficient pagination."""
-        query_params = {
+        """Scatter-gather a page of books across the sharded TypeIndex partitions.
+
+        Each shard is queried concurrently for up to `limit` items, the results
+        are merged by id and the first `limit` are returned. `last_key` (and the
+        returned LastEvaluatedKey) holds one cursor per shard so the next page
+        resumes every partition where this one stopped.
+        """
+        cursors = last_key or {'shards': {f"book#shard{n}": None for n in range(LISTING_SHARDS)}}
+        shards = cursors['shards']
+
+        with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+            pages = dict(zip(shards, pool.map(
+                lambda shard: self._query_shard(shard, limit, shards[shard]),
+                shards
+            )))
+
+        merged = sorted(
+            ((item['id'], shard, item) for shard, (items, _) in pages.items() for item in items),
+            key=lambda entry: entry[0]
+        )[:limit]
+
+        next_shards = {}
+        for shard, (items, shard_last_key) in pages.items():
+            consumed = [item for _, owner, item in merged if owner == shard]
+            if len(consumed) < len(items):
+                # Resume right after the last item we actually returned
+                next_shards[shard] = {'id': consumed[-1]['id'], 'type': shard} if consumed else shards[shard]
+            elif shard_last_key:
+                next_shards[shard] = shard_last_key
+            # else: shard exhausted, drop it from the cursor
+
+        return {
+            'Items': [item for _, _, item in merged],
+            'LastEvaluatedKey': {'shards': next_shards} if next_shards else None
+        }
+
+    def _query_shard(self, shard, limit, start_key):
+        """Query one listing partition. Uses the (thread-safe) client behind the resource."""
+        params = {
+            'TableName': self.table_name,
             'IndexName': 'TypeIndex',
-            'KeyConditionExpression': boto3.dynamodb.conditions.Key('type').eq('book'),
+            'KeyConditionExpression': _boto3().dynamodb.conditions.Key('type').eq(shard),
+            'Limit': limit
+        }
+        if start_key:
+            params['ExclusiveStartKey'] = start_key
+
+        response = self.aws.dynamodb.meta.client.query(**params)
+        return response.get('Items', []), response.get('LastEvaluatedKey')
+
+    def browse(self, field, value, limit=8, last_key=None):
+        """Query a browse index (author, genre or price bucket) for one value."""
+        index_name, key_attr = BROWSE_INDEXES[field]
+        if field != 'price':
+            value = normalize_key(value)
+        query_params = {
+            'IndexName': index_name,
+            'KeyConditionExpression': _boto3().dynamodb.conditions.Key(key_attr).eq(value),
             'Limit': limit
         }
         if last_key:
             query_params['ExclusiveStartKey'] = last_key
-        
+
         response = self.table.query(**query_params)
         return {
             'Items': response.get('Items', []),
@@ -110,8 +266,8 @@ class DynamoBookRepository:
     def add(self, book_data):
         """Put item into DynamoDB."""
         try:
-            # Add type for GSI grouping
-            book_data['type'] = 'book'
+            # Listing shard and browse keys for the GSIs
+            book_data.update(book_index_attributes(book_data))
             
             # Convert float to Decimal for DynamoDB
             if 'price' in book_data:
@@ -122,6 +278,46 @@ class DynamoBookRepository:
         except ClientError as e:
             print(f"Error adding to DynamoDB: {e.response['Error']['Message']}")
             return False
+
+    def update_stock_many(self, plan, max_workers=8):
+        """Apply stock changes concurrently with one UpdateItem per book.
+
+        `plan` maps book_id -> ('set', value) or ('add', delta). Books that are
+        not in DynamoDB (SQL-only) are skipped. Returns book_id -> 'synced',
+        'skipped' or 'error'.
+        """
+        client = self.aws.dynamodb.meta.client
+
+        def update(book_id, op, value):
+            expression = 'SET stock = :v' if op == 'set' else 'ADD stock :v'
+            try:
+                client.update_item(
+                    TableName=self.table_name,
+                    Key={'id': str(book_id)},
+                    UpdateExpression=expression,
+                    ConditionExpression='attribute_exists(id)',
+                    ExpressionAttributeValues={':v': value}
+                )
+                return 'synced'
+            except ClientError as e:
+                if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                    return 'skipped'
+                print(f"Error updating stock in DynamoDB: {e.response['Error']['Message']}")
+                return 'error'
+
+        if not plan:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(plan))) as pool:
+            outcomes = pool.map(lambda entry: update(entry[0], *entry[1]), plan.items())
+            return dict(zip(plan, outcomes))
+
+    def get_by_id(self, book_id):
+        """Get a single book item. Uses the thread-safe client so lookups can run concurrently."""
+        response = self.aws.dynamodb.meta.client.get_item(
+            TableName=self.table_name,
+            Key={'id': str(book_id)}
+        )
+        return response.get('Item')
             
 class DynamoUserRepository:
     """AWS DynamoDB implementation for User repository."""
@@ -137,7 +333,7 @@ class DynamoUserRepository:
             # Assuming email is a unique attribute, but not the primary key (id is PK)
             # For simplicity in this demo, we'll use scan. In production, use GSI.
             response = self.table.scan(
-                FilterExpression=boto3.dynamodb.conditions.Attr('email').eq(email)
+                FilterExpression=_boto3().dynamodb.conditions.Attr('email').eq(email)
             )
             items = response.get('Items', [])
             return items[0] if items else None
@@ -154,6 +350,49 @@ class DynamoUserRepository:
             print(f"Error adding user to DynamoDB: {e.response['Error']['Message']}")
             return False
 
+    def update_password_hash(self, user_id, password_hash):
+        """Replace a user's stored password hash (rehash on login)."""
+        try:
+            self.table.update_item(
+                Key={'id': str(user_id)},
+                UpdateExpression='SET password_hash = :h',
+                ExpressionAttributeValues={':h': password_hash}
+            )
+            return True
+        except ClientError as e:
+            print(f"Error updating user in DynamoDB: {e.response['Error']['Message']}")
+            return False
+
+    def update_roles_many(self, user_ids, role, is_validated, max_workers=8):
+        """Set role/is_validated on many users concurrently (one UpdateItem each).
+
+        Writes are idempotent, so retries are safe. Users missing from DynamoDB
+        are skipped. Returns user_id -> 'synced', 'skipped' or 'error'.
+        """
+        client = self.aws.dynamodb.meta.client
+
+        def update(user_id):
+            try:
+                client.update_item(
+                    TableName=self.table_name,
+                    Key={'id': str(user_id)},
+                    UpdateExpression='SET #r = :r, is_validated = :v',
+                    ConditionExpression='attribute_exists(id)',
+                    ExpressionAttributeNames={'#r': 'role'},
+                    ExpressionAttributeValues={':r': role, ':v': is_validated}
+                )
+                return 'synced'
+            except ClientError as e:
+                if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                    return 'skipped'
+                print(f"Error updating user role in DynamoDB: {e.response['Error']['Message']}")
+                return 'error'
+
+        if not user_ids:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(user_ids))) as pool:
+            return dict(zip(user_ids, pool.map(update, user_ids)))
+
 class DynamoOrderRepository:
     """AWS DynamoDB implementation for Order repository."""
     
@@ -167,18 +406,49 @@ class DynamoOrderRepository:
         try:
             if 'total_price' in order_data:
                 order_data['total_price'] = Decimal(str(order_data['total_price']))
-            self.table.put_item(Item=order_data)
+            # Client (not Table resource) so concurrent puts from worker threads are safe
+            self.aws.dynamodb.meta.client.put_item(TableName=self.table_name, Item=order_data)
             return True
         except ClientError as e:
             print(f"Error adding order to DynamoDB: {e.response['Error']['Message']}")
             return False
             
+    def update_status_many(self, order_ids, status, max_workers=8):
+        """Set the status of many orders concurrently (one UpdateItem each).
+
+        Writes are idempotent, so retries are safe. Orders missing from
+        DynamoDB are skipped. Returns order_id -> 'synced', 'skipped' or 'error'.
+        """
+        client = self.aws.dynamodb.meta.client
+
+        def update(order_id):
+            try:
+                client.update_item(
+                    TableName=self.table_name,
+                    Key={'id': str(order_id)},
+                    UpdateExpression='SET #s = :s',
+                    ConditionExpression='attribute_exists(id)',
+                    ExpressionAttributeNames={'#s': 'status'},
+                    ExpressionAttributeValues={':s': status}
+                )
+                return 'synced'
+            except ClientError as e:
+                if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                    return 'skipped'
+                print(f"Error updating order status in DynamoDB: {e.response['Error']['Message']}")
+                return 'error'
+
+        if not order_ids:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(order_ids))) as pool:
+            return dict(zip(order_ids, pool.map(update, order_ids)))
+
     def get_by_seller_id(self, seller_id):
         """Scan for orders belonging to books owned by a seller."""
         # Note: In production, use GSI on seller_id for performance
         try:
             response = self.table.scan(
-                FilterExpression=boto3.dynamodb.conditions.Attr('seller_id').eq(seller_id)
+                FilterExpression=_boto3().dynamodb.conditions.Attr('seller_id').eq(seller_id)
             )
             return response.get('Items', [])
         except ClientError as e:
@@ -186,35 +456,171 @@ class DynamoOrderRepository:
             return []
 
 
+def scan_pages(table_name, page_size=500, filter_expression=None, aws_instance=None):
+    """Yield a table's items one Scan page at a time (for exports of any size)."""
+    table = (aws_instance or aws_app).dynamodb.Table(table_name)
+    params = {'Limit': page_size}
+    if filter_expression is not None:
+        params['FilterExpression'] = filter_expression
+    while True:
+        response = table.scan(**params)
+        yield response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            return
+        params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+class DynamoRateLimitRepository:
+    """Token buckets shared by all workers/instances, stored in DynamoDB.
+
+    Each bucket is one item updated with an optimistic conditional write.
+    A bucket still contended after three attempts counts as empty, so a
+    flood of attempts on one key is refused rather than let through. When
+    DynamoDB itself fails, `fail_open` decides: allow (logins keep working)
+    or refuse (throttling is never bypassed). The same table keeps expiring
+    markers, such as emails that matched no account.
+    """
+    
+    def __init__(self, aws_instance=None, fail_open=True):
+        self.aws = aws_instance or aws_app
+        self.table_name = DYNAMODB_RATE_LIMITS_TABLE
+        self.table = self.aws.dynamodb.Table(self.table_name)
+        self.fail_open = fail_open
+        
+    def take(self, key, capacity, refill_per_sec, cost=1):
+        for _ in range(3):
+            now = time.time()
+            try:
+                item = self.table.get_item(Key={'key': key}, ConsistentRead=True).get('Item')
+                if item:
+                    previous = item['updated']
+                    tokens = min(capacity, float(item['tokens']) + (now - float(previous)) * refill_per_sec)
+                else:
+                    previous, tokens = None, capacity
+                allowed = tokens >= max(cost, 1)
+                if not allowed or cost == 0:
+                    return allowed
+                
+                if previous is None:
+                    condition = {'ConditionExpression': 'attribute_not_exists(#k)',
+                                 'ExpressionAttributeNames': {'#k': 'key'}}
+                else:
+                    condition = {'ConditionExpression': '#u = :prev',
+                                 'ExpressionAttributeNames': {'#u': 'updated'},
+                                 'ExpressionAttributeValues': {':prev': previous}}
+                self.table.put_item(
+                    Item={
+                        'key': key,
+                        'tokens': Decimal(str(round(tokens - cost, 6))),
+                        'updated': Decimal(str(round(now, 6))),
+                        'expires_at': int(now + capacity / refill_per_sec) + 60
+                    },
+                    **condition
+                )
+                return True
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    print(f"Rate limit error: {e.response['Error']['Message']}")
+                    return self.fail_open
+            except BotoCoreError as e:
+                print(f"Rate limit error: {e}")
+                return self.fail_open
+        return False
+
+    def add_marker(self, key, ttl):
+        """Remember `key` for `ttl` seconds."""
+        try:
+            self.table.put_item(Item={'key': key, 'expires_at': int(time.time() + ttl)})
+        except (ClientError, BotoCoreError) as e:
+            print(f"Rate limit error: {e}")
+
+    def has_marker(self, key):
+        """True while a marker added for `key` has not expired (TTL deletion lags, so check it here)."""
+        try:
+            item = self.table.get_item(Key={'key': key}, ConsistentRead=True).get('Item')
+        except (ClientError, BotoCoreError) as e:
+            print(f"Rate limit error: {e}")
+            return False
+        return bool(item) and int(item['expires_at']) > time.time()
+
+    def remove_marker(self, key):
+        try:
+            self.table.delete_item(Key={'key': key})
+        except (ClientError, BotoCoreError) as e:
+            print(f"Rate limit error: {e}")
+
+def _book_gsi(index_name, hash_key):
+    return {
+        'IndexName': index_name,
+        'KeySchema': [
+            {'AttributeName': hash_key, 'KeyType': 'HASH'},
+            {'AttributeName': 'id', 'KeyType': 'RANGE'}
+        ],
+        'Projection': {'ProjectionType': 'ALL'},
+        'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+    }
+
+# TypeIndex holds the sharded listing ('book#shardN'); the others back /books filters
+BOOK_INDEXES = [_book_gsi('TypeIndex', 'type')] + [
+    _book_gsi(index_name, key_attr) for index_name, key_attr in BROWSE_INDEXES.values()
+]
+BOOK_INDEX_ATTRIBUTES = [
+    {'AttributeName': index['KeySchema'][0]['AttributeName'], 'AttributeType': 'S'}
+    for index in BOOK_INDEXES
+]
+
+def ensure_book_indexes():
+    """Add any missing listing/browse GSIs to an existing Books table (one per update)."""
+    table = aws_app.dynamodb.Table(DYNAMODB_BOOKS_TABLE)
+    existing = {index['IndexName'] for index in (table.global_secondary_indexes or [])}
+    for index, attribute in zip(BOOK_INDEXES, BOOK_INDEX_ATTRIBUTES):
+        if index['IndexName'] in existing:
+            continue
+        print(f"Adding {index['IndexName']} to {DYNAMODB_BOOKS_TABLE}...")
+        table.update(
+            AttributeDefinitions=[attribute, {'AttributeName': 'id', 'AttributeType': 'S'}],
+            GlobalSecondaryIndexUpdates=[{'Create': index}]
+        )
+        table.meta.client.get_waiter('table_exists').wait(TableName=DYNAMODB_BOOKS_TABLE)
+    print("✓ Books table indexes up to date.")
+
+def reindex_books():
+    """Backfill listing shard and browse keys on existing book items."""
+    table = aws_app.dynamodb.Table(DYNAMODB_BOOKS_TABLE)
+    scan_kwargs = {}
+    count = 0
+    with table.batch_writer() as batch:
+        while True:
+            response = table.scan(**scan_kwargs)
+            for item in response.get('Items', []):
+                item.update(book_index_attributes(item))
+                batch.put_item(Item=item)
+                count += 1
+            if 'LastEvaluatedKey' not in response:
+                break
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    print(f"✓ Reindexed {count} books.")
+
 def setup_aws():
     """Setup AWS resources (DynamoDB tables and SNS topics)."""
     print("Setting up AWS resources for BookBazaar...")
     
     # 1. Create Books Table
     try:
-        print("Creating Books table with TypeIndex GSI...")
+        print("Creating Books table with listing and browse GSIs...")
         table = aws_app.dynamodb.create_table(
             TableName='BookBazaarBooks',
             KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
-            AttributeDefinitions=[
-                {'AttributeName': 'id', 'AttributeType': 'S'},
-                {'AttributeName': 'type', 'AttributeType': 'S'}
-            ],
-            GlobalSecondaryIndexes=[
-                {
-                    'IndexName': 'TypeIndex',
-                    'KeySchema': [
-                        {'AttributeName': 'type', 'KeyType': 'HASH'},
-                        {'AttributeName': 'id', 'KeyType': 'RANGE'}
-                    ],
-                    'Projection': {'ProjectionType': 'ALL'},
-                    'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
-                }
-            ],
+            AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}] + BOOK_INDEX_ATTRIBUTES,
+            GlobalSecondaryIndexes=BOOK_INDEXES,
             ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
         )
         table.wait_until_exists()
         print("✓ Books table created with indexing.")
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ResourceInUseException':
+            ensure_book_indexes()
+        else:
+            print(f"Books table: {e}")
     except Exception as e:
         print(f"Books table: {e}")
 
@@ -255,6 +661,23 @@ def setup_aws():
     except Exception as e:
         print(f"Users table: {e}")
 
+    # 5. Create Rate Limits Table (shared login token buckets, expired by TTL)
+    try:
+        print("Creating Rate Limits table...")
+        table = aws_app.dynamodb.create_table(
+            TableName=DYNAMODB_RATE_LIMITS_TABLE,
+            KeySchema=[{'AttributeName': 'key', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'key', 'AttributeType': 'S'}],
+            ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+        )
+        table.wait_until_exists()
+        aws_app.dynamodb.meta.client.update_time_to_live(
+            TableName=DYNAMODB_RATE_LIMITS_TABLE,
+            TimeToLiveSpecification={'Enabled': True, 'AttributeName': 'expires_at'}
+        )
+        print("✓ Rate Limits table created.")
+    except Exception as e:
+        print(f"Rate Limits table: {e}")
 
     print("\nAWS environment setup complete.")
 
@@ -265,7 +688,7 @@ def verify_aws():
     
     # Check credentials
     try:
-        boto3.client('sts').get_caller_identity()
+        _boto3().client('sts').get_caller_identity()
         print("[OK] AWS Credentials found.")
     except Exception:
         print("[FAIL] AWS credentials not found. Run 'aws configure'.")
@@ -312,21 +735,24 @@ def seed_db():
     # 1. Seed Users
     user_map = {} # username -> id mapping for relationships
     try:
+        from app.services.password_hasher import hasher
         with open(os.path.join(data_dir, 'users.csv'), 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for i, row in enumerate(reader, 1):
-                user_id = f"u{i}"
-                user_data = {
-                    'id': user_id,
-                    'username': row['username'],
-                    'email': row['email'],
-                    'role': row['role'],
-                    'is_validated': row['is_validated'].lower() == 'true',
-                    'password_hash': generate_password_hash(row['password'])
-                }
-                user_repo.add(user_data)
-                user_map[row['username']] = user_id
-                print(f"  Added user: {row['username']}")
+            rows = list(csv.DictReader(f))
+        # Hash all passwords in parallel before writing
+        password_hashes = hasher.hash_many(row['password'] for row in rows)
+        for i, (row, password_hash) in enumerate(zip(rows, password_hashes), 1):
+            user_id = f"u{i}"
+            user_data = {
+                'id': user_id,
+                'username': row['username'],
+                'email': row['email'],
+                'role': row['role'],
+                'is_validated': row['is_validated'].lower() == 'true',
+                'password_hash': password_hash
+            }
+            user_repo.add(user_data)
+            user_map[row['username']] = user_id
+            print(f"  Added user: {row['username']}")
         print("✓ Users seeded.")
     except Exception as e:
         print(f"Error seeding users: {e}")
@@ -343,6 +769,7 @@ def seed_db():
                     'id': book_id,
                     'title': row['title'],
                     'author': row['author'],
+                    'genre': row.get('genre', ''),
                     'description': row['description'],
                     'price': float(row['price']),
                     'stock': int(row['stock']),
@@ -403,10 +830,13 @@ def run_server():
         traceback.print_exc()
 
 if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+    
     parser = argparse.ArgumentParser(description="BookBazaar AWS Utility")
-    parser.add_argument("command", choices=["setup", "verify", "run", "seed"], 
+    parser.add_argument("command", choices=["setup", "verify", "run", "seed", "reindex"], 
                         nargs='?', default="run",
-                        help="Command to run (setup, verify, run, seed). Default is 'run'.")
+                        help="Command to run (setup, verify, run, seed, reindex). Default is 'run'.")
     
     args = parser.parse_args()
     
@@ -418,3 +848,5 @@ if __name__ == "__main__":
         run_server()
     elif args.command == "seed":
         seed_db()
+    elif args.command == "reindex":
+        reindex_books()
@@ -0,0 +1,19 @@
+"""
+ASGI entry point for BookBazaar.
+
+    uvicorn asgi:asgi_app --workers 4
+
+Views declared `async def` (cart, checkout, order dashboard) overlap their
+independent DynamoDB/SNS calls with asyncio.gather under either server;
+this entry point serves the same app to an ASGI server instead of gunicorn.
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from asgiref.wsgi import WsgiToAsgi
+from app import create_app
+
+app = create_app()
+asgi_app = WsgiToAsgi(app)
@@ -0,0 +1,57 @@
+"""
+Time to first byte, total time and bytes sent for /admin/orders with 10,000
+orders: buffered vs streamed rendering, each uncompressed, gzip and brotli.
+
+    python -m benchmarks.bench_admin_list_streaming
+"""
+
+import time
+from datetime import datetime
+from benchmarks.common import benchmark_app
+
+ORDERS = 10_000
+ENCODINGS = [('identity', ''), ('gzip', 'gzip'), ('br', 'br, gzip')]
+
+def _timed_get(client, accept_encoding):
+    start = time.perf_counter()
+    response = client.get('/admin/orders', headers={'Accept-Encoding': accept_encoding}, buffered=False)
+    first_byte = None
+    sent = 0
+    for chunk in response.response:
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+        sent += len(chunk)
+    total = time.perf_counter() - start
+    response.close()
+    return first_byte, total, sent
+
+def run(repeats=3):
+    print(f"/admin/orders with {ORDERS} orders (best of {repeats})")
+    print(f"{'mode':<10} {'encoding':<9} {'TTFB ms':>9} {'total ms':>9} {'KiB sent':>9}")
+    for streamed in (False, True):
+        with benchmark_app(books=100, config_overrides={'STREAM_ADMIN_LISTS': streamed}) as (app, client):
+            from app.extensions import db
+            from app.models.order import Order
+            from app.models.user import User
+            with app.app_context():
+                admin = User.query.filter_by(email="bench@example.com").first()
+                admin.role = 'admin'
+                db.session.execute(Order.__table__.insert(), [
+                    {'user_id': admin.id, 'book_id': 1 + i % 100, 'quantity': 1 + i % 3, 'total_price': 10.0,
+                     'status': 'Placed', 'order_date': datetime(2024, 1, 1 + i % 28)}
+                    for i in range(ORDERS)
+                ])
+                db.session.commit()
+            with client.session_transaction() as sess:
+                sess['user_role'] = 'admin'
+
+            for label, accept_encoding in ENCODINGS:
+                _timed_get(client, accept_encoding)  # warm-up
+                runs = [_timed_get(client, accept_encoding) for _ in range(repeats)]
+                first_byte = min(run[0] for run in runs)
+                total = min(run[1] for run in runs)
+                print(f"{'streamed' if streamed else 'buffered':<10} {label:<9} {first_byte * 1000:9.1f} "
+                      f"{total * 1000:9.1f} {runs[0][2] / 1024:9.0f}")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,84 @@
+"""
+Marking ORDERS placed orders as shipped: one transition() per order (a
+transaction, a DynamoDB UpdateItem and a notification each) vs the bulk
+status job (chunked conditional UPDATEs, concurrent DynamoDB updates and one
+message per customer per chunk).
+
+Runs on a SQLite file with DynamoDB/SNS mocked by moto; the notifier is
+replaced by a counter so only the number of messages is compared.
+
+    python -m benchmarks.bench_bulk_order_status
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ORDERS = 5000
+CUSTOMERS = 400
+
+def _app(database_url):
+    os.environ['FLASK_ENV'] = 'testing'
+    from config import TestingConfig
+    TestingConfig.SQLALCHEMY_DATABASE_URI = database_url
+    from app import create_app
+    return create_app()
+
+def _seed(app):
+    from app.extensions import db
+    from app.models.book import Book
+    from app.models.order import Order
+    from app.models.user import User
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        admin = User(username="root", email="root@example.com", role="admin", password_hash="x")
+        customers = [User(username=f"c{n}", email=f"c{n}@example.com", role="buyer", password_hash="x")
+                     for n in range(CUSTOMERS)]
+        book = Book(title="Bulk", author="Author", price=10, stock=0)
+        db.session.add_all([admin, book, *customers])
+        db.session.flush()
+        start = datetime(2024, 1, 1)
+        db.session.add_all([Order(user_id=customers[n % CUSTOMERS].id, book_id=book.id, quantity=1, total_price=10,
+                                  order_date=start + timedelta(minutes=n)) for n in range(ORDERS)])
+        db.session.commit()
+        return admin.id
+
+def run(label, bulk, database_url):
+    from moto import mock_aws
+    sent = []
+    with mock_aws(), contextlib.redirect_stdout(io.StringIO()):
+        from app.services.notification import NotificationService
+        NotificationService.send = lambda self, email, message: sent.append(email)
+        NotificationService.send_many = lambda self, messages, max_workers=8: sent.extend(messages)
+        app = _app(database_url)
+        admin_id = _seed(app)
+        from app.extensions import db
+        from app.models.order import Order
+        from app.services.order_lifecycle import order_jobs, transition
+
+        started = time.perf_counter()
+        with app.app_context():
+            if bulk:
+                job = order_jobs.start('Shipped', admin_id)
+                order_jobs.wait(job.id)
+                db.session.rollback()  # end the read snapshot taken before the job committed
+            else:
+                notifier = NotificationService()
+                for order in Order.query.with_entities(Order.id, Order.user_id).all():
+                    transition(order.id, 'Shipped', actor_id=admin_id)
+                    notifier.send(str(order.user_id), f"Order #{order.id} has been shipped.")
+            shipped = Order.query.filter_by(status='Shipped').count()
+            elapsed = time.perf_counter() - started
+            db.engine.dispose()
+    print(f"{label:<18} {elapsed:7.2f} s  shipped={shipped}  messages={len(sent)}")
+
+if __name__ == "__main__":
+    print(f"{ORDERS} placed orders from {CUSTOMERS} customers")
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        run("one by one", False, database_url)
+        run("bulk status job", True, database_url)
@@ -0,0 +1,30 @@
+"""
+Render-time savings of the /books grid cache.
+
+    python -m benchmarks.bench_catalog_cache
+"""
+
+from app.services.render_cache import catalog_cache
+from benchmarks.common import benchmark_app, measure
+
+def run(books=2000, iterations=200):
+    with benchmark_app(books=books) as (app, client):
+        print(f"/books with {books} books in SQLite")
+
+        catalog_cache.ttl = 0
+        uncached = measure("uncached (query + full render)", lambda: client.get('/books'), iterations)
+
+        catalog_cache.ttl = app.config['CATALOG_CACHE_TTL']
+        cached = measure("cached grid fragment", lambda: client.get('/books'), iterations)
+
+        etag = client.get('/books').headers['ETag']
+        not_modified = measure(
+            "conditional GET (304)",
+            lambda: client.get('/books', headers={'If-None-Match': etag}),
+            iterations
+        )
+
+        print(f"\nfragment cache speed-up: {uncached / cached:.1f}x, 304 speed-up: {uncached / not_modified:.1f}x")
+
+if __name__ == "__main__":
+    run()
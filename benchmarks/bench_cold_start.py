@@ -0,0 +1,42 @@
+"""
+First-request latency of a freshly created app, with and without warm-up.
+
+    python -m benchmarks.bench_cold_start
+"""
+
+import tempfile
+import time
+from config import TestingConfig
+from app.services.render_cache import catalog_cache
+from benchmarks.common import benchmark_app, measure
+
+PAGES = ['/books', '/cart', '/dashboard']
+
+def first_requests(client):
+    timings = {}
+    for path in PAGES:
+        start = time.perf_counter()
+        client.get(path)
+        timings[path] = (time.perf_counter() - start) * 1000
+    return timings
+
+def run(books=500):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for warmup, bytecode_dir in [(False, None), (True, None), (True, cache_dir), (True, cache_dir)]:
+            TestingConfig.TEMPLATE_WARMUP = warmup
+            TestingConfig.TEMPLATE_CACHE_DIR = bytecode_dir
+            catalog_cache.invalidate()
+            with benchmark_app(books=books) as (app, client):
+                cold = first_requests(client)
+                report = app.extensions['startup_report']
+                label = f"warmup={warmup} bytecode_cache={'on' if bytecode_dir else 'off'}"
+                print(f"{label}: create_app {report['total_ms']:.1f} ms, first requests " +
+                      ", ".join(f"{path} {ms:.1f} ms" for path, ms in cold.items()))
+            catalog_cache.invalidate()
+
+    with benchmark_app(books=books) as (app, client):
+        for path in PAGES:
+            measure(f"steady state {path}", lambda: client.get(path), 50)
+
+if __name__ == "__main__":
+    run()
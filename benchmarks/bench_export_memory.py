@@ -0,0 +1,43 @@
+"""
+Peak Python memory while streaming /admin/export/orders for growing table
+sizes. Streaming should keep the peak flat as the row count grows.
+
+    python -m benchmarks.bench_export_memory
+"""
+
+import time
+import tracemalloc
+from datetime import datetime
+from benchmarks.common import benchmark_app
+
+SIZES = [10_000, 50_000, 200_000]
+
+def run():
+    for size in SIZES:
+        with benchmark_app() as (app, client):
+            from app.extensions import db
+            from app.models.order import Order
+            from app.models.user import User
+            with app.app_context():
+                admin = User.query.filter_by(email="bench@example.com").first()
+                admin.role = 'admin'
+                db.session.execute(Order.__table__.insert(), [
+                    {'user_id': admin.id, 'book_id': 1 + i % 100, 'quantity': 1, 'total_price': 10.0,
+                     'status': 'Placed', 'order_date': datetime(2024, 1, 1)}
+                    for i in range(size)
+                ])
+                db.session.commit()
+
+            for fmt in ('csv', 'ndjson'):
+                tracemalloc.start()
+                start = time.perf_counter()
+                response = client.get(f'/admin/export/orders?format={fmt}&gzip=1', buffered=False)
+                sent = sum(len(chunk) for chunk in response.response)
+                elapsed = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"{size:>8} rows {fmt:<6} {elapsed:6.2f} s  {sent / 1024:8.0f} KiB gzip  "
+                      f"peak {peak / 1024 / 1024:6.2f} MiB")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,76 @@
+"""
+Flash sale: BUYERS shoppers chase STOCK copies of one title, with and
+without cart holds.
+
+Every buyer adds the book to the cart while it still looks available, then
+opens the checkout review and places the order, so without holds the
+contention surfaces only at POST /checkout. With holds the losers are told
+at add-to-cart time and never reach checkout. Reported: orders placed,
+failed checkouts (POST /checkout answered with "insufficient stock") and
+the requests spent on them.
+
+    python -m benchmarks.bench_flash_sale_holds
+"""
+
+import contextlib
+import io
+import time
+from benchmarks.common import benchmark_app
+
+BUYERS = 400
+STOCK = 50
+
+def run(label, holds):
+    with contextlib.redirect_stdout(io.StringIO()), benchmark_app(config_overrides={'STOCK_HOLDS': holds}) as (app, _):
+        from app.extensions import db
+        from app.models.book import Book
+        from app.models.user import User
+        from app.routes import bookstore
+
+        async def skip(*args, **kwargs):
+            return None
+        bookstore.notifier.send_async = skip
+        bookstore.order_repo.sync_to_dynamo_async = skip
+
+        with app.app_context():
+            book = Book(title="Flash Sale", author="Author", price=10, stock=STOCK)
+            buyers = [User(username=f"buyer{n}", email=f"buyer{n}@example.com", role="buyer", password_hash="x")
+                      for n in range(BUYERS)]
+            db.session.add_all([book, *buyers])
+            db.session.commit()
+            book_id, buyer_ids = book.id, [buyer.id for buyer in buyers]
+
+        from app.services.reservations import reservations
+        reservations.enabled = holds  # config_overrides are applied after create_app
+        clients = []
+        for buyer_id in buyer_ids:
+            client = app.test_client()
+            with client.session_transaction() as sess:
+                sess.update(user_id=buyer_id, username="buyer", email="buyer@example.com", user_role="buyer")
+            clients.append(client)
+
+        started = time.perf_counter()
+        requests = placed = failed = 0
+        # Everyone browses and fills a cart before anyone pays
+        in_cart = []
+        for client in clients:
+            response = client.post(f'/cart/add/{book_id}', follow_redirects=True)
+            requests += 1
+            if b'added to cart' in response.data:
+                in_cart.append(client)
+        for client in in_cart:
+            client.get('/checkout')
+            response = client.post('/checkout', follow_redirects=True)
+            requests += 2
+            if b'insufficient stock' in response.data:
+                failed += 1
+            else:
+                placed += 1
+        elapsed = time.perf_counter() - started
+    print(f"{label:<12} placed={placed:4d} failed checkouts={failed:4d} requests={requests:5d} "
+          f"({elapsed:.2f} s)")
+
+if __name__ == "__main__":
+    print(f"{BUYERS} buyers, {STOCK} copies")
+    run("no holds", False)
+    run("cart holds", True)
@@ -0,0 +1,137 @@
+"""
+Checkout throughput on one hot title: a single Book.stock row vs the stock
+split over STOCK_SHARDS counter rows.
+
+Each scenario forks WORKERS processes (like gunicorn workers), each running
+THREADS request threads that POST /checkout for the same book. "failed"
+counts checkouts that did not complete; "lost" counts stock decrements
+overwritten by a concurrent checkout (orders placed minus stock removed).
+
+By default the database is a SQLite file, where every write takes the
+database-wide lock, so sharding mostly buys correctness there. Point
+BENCH_DATABASE_URL at a scratch PostgreSQL/MySQL database (its tables are
+dropped and recreated) to measure row-lock contention, which is what the
+shards spread out:
+
+    python -m benchmarks.bench_hot_title_checkout
+    BENCH_DATABASE_URL=postgresql://bench@localhost/bench_scratch python -m benchmarks.bench_hot_title_checkout
+"""
+
+import contextlib
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+WORKERS = 4
+THREADS = 8
+CHECKOUTS_PER_THREAD = 25
+STOCK = 10 ** 6
+
+SCENARIOS = [
+    ("one stock row", 0),
+    ("4 stock shards", 4),
+    ("16 stock shards", 16),
+]
+
+def _make_app(database_url):
+    os.environ['FLASK_ENV'] = 'testing'
+    from config import TestingConfig
+    TestingConfig.SQLALCHEMY_DATABASE_URI = database_url
+    TestingConfig.LAZY_INIT = True
+    from app import create_app
+    return create_app()
+
+def _seed(database_url, shards):
+    from moto import mock_aws
+    from app.extensions import db
+    from app.models.book import Book
+    from app.models.user import User
+    from app.services.stock_shards import sharded_stock
+    with mock_aws():
+        app = _make_app(database_url)
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            user = User(username="bench", email="bench@example.com", role="buyer", password_hash="x")
+            book = Book(title="Launch Day", author="Author", price=10, stock=STOCK)
+            db.session.add_all([user, book])
+            db.session.commit()
+            if shards:
+                sharded_stock.enable(book.id, shards)
+                db.session.commit()
+            return user.id, book.id
+
+def _worker(database_url, user_id, book_id, start_at, results):
+    from moto import mock_aws
+    from app.routes import bookstore
+
+    async def skip(*args, **kwargs):
+        return None
+
+    # Measure the SQL write path only
+    bookstore.notifier.send_async = skip
+    bookstore.order_repo.sync_to_dynamo_async = skip
+
+    with mock_aws(), contextlib.redirect_stdout(io.StringIO()):
+        app = _make_app(database_url)
+        counts = {'ok': 0, 'failed': 0}
+        lock = threading.Lock()
+
+        def run():
+            client = app.test_client()
+            for _ in range(CHECKOUTS_PER_THREAD):
+                with client.session_transaction() as sess:
+                    sess.update(user_id=user_id, username="bench", email="bench@example.com",
+                                user_role="buyer", cart={str(book_id): 1})
+                response = client.post('/checkout')
+                ok = '/dashboard' in response.headers.get('Location', '')
+                with lock:
+                    counts['ok' if ok else 'failed'] += 1
+
+        while time.time() < start_at:
+            time.sleep(0.001)
+        threads = [threading.Thread(target=run) for _ in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    results.put(counts)
+
+def _remaining(database_url, book_id):
+    from sqlalchemy import create_engine, text
+    engine = create_engine(database_url)
+    with engine.connect() as conn:
+        shards = conn.execute(text("SELECT SUM(stock) FROM stock_shard WHERE book_id = :id"), {'id': book_id}).scalar()
+        stock = conn.execute(text("SELECT stock FROM book WHERE id = :id"), {'id': book_id}).scalar()
+    engine.dispose()
+    return shards if shards is not None else stock
+
+def run_scenario(label, shards, database_url):
+    user_id, book_id = _seed(database_url, shards)
+    results = multiprocessing.Queue()
+    start_at = time.time() + 2.0  # let every worker finish booting first
+    workers = [multiprocessing.Process(target=_worker, args=(database_url, user_id, book_id, start_at, results))
+               for _ in range(WORKERS)]
+    for worker in workers:
+        worker.start()
+    totals = {'ok': 0, 'failed': 0}
+    for _ in workers:
+        for key, value in results.get().items():
+            totals[key] += value
+    elapsed = time.time() - start_at
+    for worker in workers:
+        worker.join()
+    removed = STOCK - _remaining(database_url, book_id)
+    print(f"{label:<20} {totals['ok'] / elapsed:8.1f} orders/s  "
+          f"placed={totals['ok']:4d} failed={totals['failed']:4d} lost={totals['ok'] - removed:4d}")
+
+if __name__ == "__main__":
+    multiprocessing.set_start_method('spawn')
+    print(f"{WORKERS} workers x {THREADS} threads x {CHECKOUTS_PER_THREAD} checkouts of one title")
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = os.environ.get('BENCH_DATABASE_URL') or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        for label, shards in SCENARIOS:
+            run_scenario(label, shards, database_url)
@@ -0,0 +1,40 @@
+"""
+Worker boot profile: `-X importtime` of create_app() in eager and lazy modes.
+
+    python -m benchmarks.bench_import_time
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BOOT = 'from app import create_app; create_app()'
+
+def boot(env_overrides):
+    env = dict(os.environ, FLASK_ENV='testing', STARTUP_REPORT='false', **env_overrides)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', BOOT],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    top_level = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, module = line.split('|')
+        if cumulative.strip().isdigit() and not module.startswith('  '):
+            top_level.append((int(cumulative) / 1000, module.strip()))
+    return wall_ms, sorted(top_level, reverse=True)
+
+def run(top=8):
+    for label, overrides in [("eager", {'LAZY_INIT': 'false'}), ("lazy", {'LAZY_INIT': 'true'})]:
+        wall_ms, top_level = boot(overrides)
+        print(f"\n{label}: interpreter + create_app {wall_ms:.0f} ms wall")
+        for ms, module in top_level[:top]:
+            print(f"  {ms:8.1f} ms  {module}")
+        print(f"  boto3 imported at boot: {'yes' if any(m == 'boto3' for _, m in top_level) else 'no'}")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,83 @@
+"""
+Legitimate login latency while a credential-stuffing burst hammers /login,
+with the login rate limiter off and on.
+
+The attack comes from a handful of IPs trying leaked (mostly unknown) emails;
+the real user logs in from their own IP. Password hashing uses the production
+default so the cost of letting attack attempts reach verification shows up.
+
+    python -m benchmarks.bench_login_under_attack
+"""
+
+import contextlib
+import io
+import threading
+import time
+from benchmarks.common import benchmark_app
+
+ATTACKERS = 4
+ATTACK_SECONDS = 4.0
+
+def _attack(app, attacker, victims, stop):
+    client = app.test_client()
+    i = 0
+    while not stop.is_set():
+        i += 1
+        email = victims[i % len(victims)] if i % 3 == 0 else f"leak{attacker}-{i}@example.com"
+        client.post('/login', data={'email': email, 'password': f"guess-{i}"},
+                    environ_base={'REMOTE_ADDR': f"198.51.100.{attacker}"})
+        time.sleep(0.01)  # requests arrive over the network, not in a tight loop
+
+def run_scenario(limited):
+    overrides = {'LOGIN_RATE_LIMIT': limited, 'PASSWORD_HASH_METHOD': 'scrypt',
+                 'PASSWORD_VERIFY_WORKERS': 0}
+    # Repository fallback messages from the attack threads would drown the results
+    with contextlib.redirect_stdout(io.StringIO()), benchmark_app(config_overrides=overrides) as (app, _):
+        from app.extensions import db
+        from app.models.user import User
+        from app.services.password_hasher import hasher
+        from app.services.rate_limit import login_limiter
+
+        hasher.init_app(app)
+        login_limiter.init_app(app)
+        verifications = []
+        verify = hasher.verify
+        hasher.verify = lambda *args: verifications.append(1) or verify(*args)
+        with app.app_context():
+            user = User.query.filter_by(email="bench@example.com").first()
+            user.set_password("bench")
+            victim = User(username="victim", email="victim@example.com", role="buyer")
+            victim.set_password("not-guessable")
+            db.session.add(victim)
+            db.session.commit()
+
+        stop = threading.Event()
+        attackers = [threading.Thread(target=_attack, args=(app, n, ["victim@example.com"], stop))
+                     for n in range(ATTACKERS)]
+        for thread in attackers:
+            thread.start()
+
+        client = app.test_client()
+        latencies = []
+        start = time.perf_counter()
+        while time.perf_counter() - start < ATTACK_SECONDS:
+            t0 = time.perf_counter()
+            response = client.post('/login', data={'email': "bench@example.com", 'password': "bench"},
+                                   environ_base={'REMOTE_ADDR': "192.0.2.10"})
+            latencies.append((time.perf_counter() - t0) * 1000)
+            client.get('/logout')
+            time.sleep(0.05)
+        stop.set()
+        for thread in attackers:
+            thread.join()
+        del hasher.verify
+
+    latencies.sort()
+    label = "limiter on " if limited else "limiter off"
+    print(f"{label}: legit logins in {ATTACK_SECONDS:.0f} s={len(latencies):3d}, "
+          f"p50={latencies[len(latencies) // 2]:7.1f} ms, max={latencies[-1]:7.1f} ms, "
+          f"hash verifications={len(verifications)}, last status={response.status_code}")
+
+if __name__ == "__main__":
+    run_scenario(limited=False)
+    run_scenario(limited=True)
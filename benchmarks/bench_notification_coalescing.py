@@ -0,0 +1,52 @@
+"""
+Notification traffic for a busy hour: BUYERS customers each place and cancel
+a few orders, then an admin ships ORDERS orders in bulk chunks. Compares one
+publish per event (the old behaviour: window 0, batches of one) with a
+coalescing window and PublishBatch groups of ten.
+
+The SNS call is simulated with PUBLISH_MS of latency per request, so the
+time column shows what the API calls would cost.
+
+    python -m benchmarks.bench_notification_coalescing
+"""
+
+import time
+from app.services.notification import NotificationService
+from app.services.notification_transports import Transport
+
+BUYERS = 200
+EVENTS_PER_BUYER = 5
+ORDERS = 5000
+CHUNK = 1000
+PUBLISH_MS = 5
+
+class SimulatedSNS(Transport):
+    def send_batch(self, messages):
+        time.sleep(PUBLISH_MS / 1000)
+        return len(messages)
+
+def run(label, coalesce_seconds, batch_size):
+    service = NotificationService(coalesce_seconds=coalesce_seconds, batch_size=batch_size)
+    service.notifier = SimulatedSNS()
+    started = time.perf_counter()
+    for n in range(EVENTS_PER_BUYER):
+        for buyer in range(BUYERS):
+            service.send(f"buyer{buyer}@example.com", f"Order placed for: Book {n}")
+    for start in range(0, ORDERS, CHUNK):
+        chunk = [(f"buyer{order % BUYERS}@example.com", f"Order #{order} has been shipped.")
+                 for order in range(start, start + CHUNK)]
+        if coalesce_seconds:
+            service.send_many(chunk)
+        else:
+            for email, message in chunk:
+                service.send(email, message)
+    service.flush()  # the window closes
+    elapsed = time.perf_counter() - started
+    stats = service.stats()
+    print(f"{label:<26} enqueued={stats['enqueued']:5d} published={stats['published']:5d} "
+          f"publish calls={stats['publish_calls']:5d} ({elapsed:.2f} s)")
+
+if __name__ == "__main__":
+    print(f"{BUYERS} buyers x {EVENTS_PER_BUYER} events, then {ORDERS} orders shipped in chunks of {CHUNK}")
+    run("one publish per event", 0, 1)
+    run("coalesced, batches of 10", 60, 10)
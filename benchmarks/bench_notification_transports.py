@@ -0,0 +1,50 @@
+"""
+Load-test throughput of the notification transports: MESSAGES notifications
+sent in chunks of CHUNK recipients (window 0, TRANSPORT_BATCH per call)
+through stdout (to a pipe), the rotating NDJSON file and the in-memory
+queue. Peak RSS growth shows the queue and file stay bounded.
+
+    python -m benchmarks.bench_notification_transports
+"""
+
+import contextlib
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from app.services.notification import NotificationService
+from app.services.notification_transports import make_transport
+
+MESSAGES = 1_000_000
+CHUNK = 1000
+TRANSPORT_BATCH = 500
+
+def run(label, transport):
+    service = NotificationService(batch_size=TRANSPORT_BATCH)
+    service.notifier = transport
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    for start in range(0, MESSAGES, CHUNK):
+        service.send_many([(f"c{n}@example.com", f"Order #{start + n} has been shipped.") for n in range(CHUNK)])
+    service.close()
+    elapsed = time.perf_counter() - started
+    grown = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before) / 1024
+    stats = service.stats()
+    print(f"{label:<8} {MESSAGES / elapsed:10,.0f} msgs/s  published={stats['published']:,} "
+          f"failed={stats['failed']:,}  peak RSS +{grown:.0f} MB", file=sys.__stdout__)
+
+if __name__ == "__main__":
+    print(f"{MESSAGES:,} notifications")
+    # stdout as a load test sees it: a pipe into a log collector
+    reader = subprocess.Popen([sys.executable, '-c', 'import sys\nfor _ in sys.stdin: pass'], stdin=subprocess.PIPE,
+                              text=True)
+    with contextlib.redirect_stdout(reader.stdin):
+        run("stdout", make_transport('stdout'))
+    reader.stdin.close()
+    reader.wait()
+    with tempfile.TemporaryDirectory() as tmp:
+        run("file", make_transport('file', {'NOTIFY_FILE_PATH': os.path.join(tmp, 'notifications.ndjson'),
+                                            'NOTIFY_FILE_MAX_MB': 16, 'NOTIFY_FILE_BACKUPS': 2}))
+    run("queue", make_transport('queue', {'NOTIFY_QUEUE_BATCHES': 100}))
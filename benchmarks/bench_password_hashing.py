@@ -0,0 +1,44 @@
+"""
+Password verification throughput (logins/second per core) for candidate
+hash settings, and bulk hashing speed for seeders.
+
+    python -m benchmarks.bench_password_hashing
+"""
+
+import os
+import time
+from app.services.password_hasher import PasswordHasher
+
+METHODS = ['scrypt', 'scrypt:16384:8:1', 'pbkdf2:sha256:600000', 'pbkdf2:sha256:260000']
+
+def logins_per_second(method, seconds=1.0):
+    hasher = PasswordHasher(method=method)
+    stored = hasher.hash('correct horse battery staple')
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        hasher.verify(stored, 'correct horse battery staple')
+        count += 1
+    return count / (time.perf_counter() - start)
+
+def bulk_hashing(method, users=50):
+    hasher = PasswordHasher(method=method)
+    passwords = [f"password-{i}" for i in range(users)]
+    timings = {}
+    for label, processes in [("serial", 1), (f"parallel x{os.cpu_count()}", None)]:
+        start = time.perf_counter()
+        hasher.hash_many(passwords, processes=processes)
+        timings[label] = time.perf_counter() - start
+    return timings
+
+def run():
+    print("Verification throughput (single core):")
+    for method in METHODS:
+        print(f"  {method:<24} {logins_per_second(method):8.1f} logins/s")
+
+    print("\nBulk hashing 50 users with the default method:")
+    for label, seconds in bulk_hashing('scrypt').items():
+        print(f"  {label:<24} {seconds:8.2f} s")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,122 @@
+"""
+Concurrent checkout throughput on a SQLite file: default rollback journal vs
+WAL + pragmas vs WAL + pragmas + single-writer queue.
+
+Each scenario forks WORKERS processes (like gunicorn workers), each running
+THREADS request threads that POST /checkout against the same database file.
+Failed checkouts are the "database is locked" error path; "lost" counts
+stock decrements overwritten by a concurrent checkout (orders placed minus
+stock actually removed).
+
+    python -m benchmarks.bench_sqlite_checkout
+"""
+
+import contextlib
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+WORKERS = 4
+THREADS = 4
+CHECKOUTS_PER_THREAD = 25
+BOOKS = 20
+
+SCENARIOS = [
+    ("rollback journal, default pragmas", {'SQLITE_TUNING': False, 'SQLITE_SINGLE_WRITER': False}),
+    ("WAL + pragmas", {'SQLITE_TUNING': True, 'SQLITE_SINGLE_WRITER': False}),
+    ("WAL + pragmas + single writer", {'SQLITE_TUNING': True, 'SQLITE_SINGLE_WRITER': True}),
+]
+
+def _make_app(db_path, overrides):
+    os.environ['FLASK_ENV'] = 'testing'
+    from config import TestingConfig
+    TestingConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+    TestingConfig.LAZY_INIT = True
+    for key, value in overrides.items():
+        setattr(TestingConfig, key, value)
+    from app import create_app
+    return create_app()
+
+def _seed(db_path):
+    from moto import mock_aws
+    from app.extensions import db
+    from app.models.book import Book
+    from app.models.user import User
+    with mock_aws():
+        app = _make_app(db_path, {'SQLITE_TUNING': False})
+        with app.app_context():
+            user = User(username="bench", email="bench@example.com", role="buyer")
+            user.set_password("bench")
+            db.session.add(user)
+            db.session.add_all([Book(title=f"Book {i}", author="Author", price=10, stock=10 ** 6)
+                                for i in range(BOOKS)])
+            db.session.commit()
+            return user.id
+
+def _worker(db_path, overrides, user_id, start_at, results):
+    from moto import mock_aws
+    from app.routes import bookstore
+
+    async def skip(*args, **kwargs):
+        return None
+
+    # Measure the SQL write path only
+    bookstore.notifier.send_async = skip
+    bookstore.order_repo.sync_to_dynamo_async = skip
+
+    with mock_aws(), contextlib.redirect_stdout(io.StringIO()):
+        app = _make_app(db_path, overrides)
+        counts = {'ok': 0, 'failed': 0}
+        lock = threading.Lock()
+
+        def run(thread_no):
+            client = app.test_client()
+            for i in range(CHECKOUTS_PER_THREAD):
+                with client.session_transaction() as sess:
+                    sess.update(user_id=user_id, username="bench", email="bench@example.com",
+                                user_role="buyer", cart={str(1 + (thread_no + i) % BOOKS): 1})
+                response = client.post('/checkout')
+                ok = '/dashboard' in response.headers.get('Location', '')
+                with lock:
+                    counts['ok' if ok else 'failed'] += 1
+
+        while time.time() < start_at:
+            time.sleep(0.001)
+        threads = [threading.Thread(target=run, args=(n,)) for n in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    results.put(counts)
+
+def run_scenario(label, overrides):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        user_id = _seed(db_path)
+        results = multiprocessing.Queue()
+        start_at = time.time() + 2.0  # let every worker finish booting first
+        workers = [multiprocessing.Process(target=_worker, args=(db_path, overrides, user_id, start_at, results))
+                   for _ in range(WORKERS)]
+        for worker in workers:
+            worker.start()
+        totals = {'ok': 0, 'failed': 0}
+        for _ in workers:
+            for key, value in results.get().items():
+                totals[key] += value
+        elapsed = time.time() - start_at
+        for worker in workers:
+            worker.join()
+        import sqlite3
+        with contextlib.closing(sqlite3.connect(db_path)) as conn:
+            removed = conn.execute("SELECT SUM(?) - SUM(stock) FROM book", (10 ** 6,)).fetchone()[0]
+    print(f"{label:<36} {totals['ok'] / elapsed:8.1f} orders/s  "
+          f"placed={totals['ok']:4d} failed={totals['failed']:4d} lost={totals['ok'] - removed:4d}")
+
+if __name__ == "__main__":
+    multiprocessing.set_start_method('spawn')
+    print(f"{WORKERS} workers x {THREADS} threads x {CHECKOUTS_PER_THREAD} checkouts")
+    for label, overrides in SCENARIOS:
+        run_scenario(label, overrides)
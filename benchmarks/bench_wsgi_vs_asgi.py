@@ -0,0 +1,109 @@
+"""
+Cart page throughput at high concurrency: gunicorn (WSGI) vs uvicorn (ASGI).
+
+Both servers run benchmarks.serve, where each DynamoDB call is delayed to
+simulate network latency; the /cart view fetches its books concurrently.
+
+    python -m benchmarks.bench_wsgi_vs_asgi [concurrency] [requests]
+"""
+
+import http.cookiejar
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CART_SIZE = 8
+
+SERVERS = {
+    'wsgi (gunicorn gthread)': ['gunicorn', '-k', 'gthread', '-w', '2', '--threads', '32',
+                                '-b', '127.0.0.1:{port}', 'benchmarks.serve:app'],
+    'asgi (uvicorn)': ['uvicorn', '--workers', '2', '--port', '{port}', '--log-level', 'warning',
+                       'benchmarks.serve:asgi_app'],
+}
+
+def seed(env):
+    """Create and seed the SQL database shared by all server workers."""
+    script = (
+        "from app import create_app\n"
+        "from app.extensions import db\n"
+        "from app.models.book import Book\n"
+        "from app.models.user import User\n"
+        "app = create_app()\n"
+        "with app.app_context():\n"
+        "    db.create_all()\n"
+        "    user = User(username='bench', email='bench@example.com', role='buyer')\n"
+        "    user.set_password('bench')\n"
+        "    db.session.add(user)\n"
+        f"    db.session.add_all([Book(title=f'Book {{i}}', author='A', price=100, stock=10**6) for i in range({CART_SIZE})])\n"
+        "    db.session.commit()\n"
+    )
+    subprocess.run([sys.executable, '-c', script], cwd=ROOT, env=env, check=True)
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_until_up(base, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(base + '/login', timeout=1)
+            return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {base} did not start")
+
+def logged_in_opener(base):
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    opener.open(base + '/login', urllib.parse.urlencode({'email': 'bench@example.com', 'password': 'bench'}).encode())
+    for book_id in range(1, CART_SIZE + 1):
+        opener.open(base + f'/cart/add/{book_id}', b'')
+    return opener
+
+def hammer(opener, url, concurrency, total):
+    def one(_):
+        start = time.perf_counter()
+        opener.open(url).read()
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+    return total / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+def run(concurrency=64, total=640):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, FLASK_ENV='production', STARTUP_REPORT='false', LAZY_INIT='true',
+                   DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                   SECRET_KEY='bench-secret', CATALOG_CACHE_TTL='0')
+        seed(env)
+        print(f"/cart with {CART_SIZE} books, {concurrency} concurrent clients, {total} requests, "
+              f"{os.environ.get('BENCH_AWS_LATENCY_MS', 20)} ms per AWS call")
+        for label, command in SERVERS.items():
+            port = free_port()
+            base = f"http://127.0.0.1:{port}"
+            server = subprocess.Popen([part.format(port=port) for part in command], cwd=ROOT, env=env,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                wait_until_up(base)
+                opener = logged_in_opener(base)
+                throughput, p50, p99 = hammer(opener, base + '/cart', concurrency, total)
+                print(f"{label:<26} {throughput:8.1f} req/s   p50 {p50:7.1f} ms   p99 {p99:7.1f} ms")
+            finally:
+                server.terminate()
+                server.wait()
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    run(*args)
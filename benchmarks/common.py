@@ -0,0 +1,55 @@
+"""
+Shared helpers for the BookBazaar benchmark scripts.
+
+Benchmarks run against the testing config (in-memory SQLite) with AWS mocked
+by moto, so they need no credentials and no network. Run them from the repo
+root, e.g. `python -m benchmarks.bench_catalog_cache`.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from moto import mock_aws
+
+@contextmanager
+def benchmark_app(books=0, config_overrides=None):
+    """Yield a testing app seeded with `books` books and a logged-in buyer client."""
+    os.environ['FLASK_ENV'] = 'testing'
+    with mock_aws():
+        from app import create_app
+        from app.extensions import db
+        from app.models.book import Book
+        from app.models.user import User
+
+        app = create_app()
+        app.config.update(config_overrides or {})
+        with app.app_context():
+            user = User(username="bench", email="bench@example.com", role="buyer")
+            user.set_password("bench")
+            db.session.add(user)
+            db.session.add_all([
+                Book(title=f"Book {i}", author=f"Author {i % 50}", genre="Fiction",
+                     description="Benchmark book " * 8, price=100 + i % 900, stock=10)
+                for i in range(books)
+            ])
+            db.session.commit()
+            user_id = user.id
+
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = user_id
+            sess['username'] = "bench"
+            sess['email'] = "bench@example.com"
+            sess['user_role'] = "buyer"
+        yield app, client
+
+def measure(label, fn, iterations=200):
+    """Run `fn` `iterations` times and print mean latency in milliseconds."""
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    mean_ms = elapsed / iterations * 1000
+    print(f"{label:<40} {mean_ms:8.3f} ms/op  ({iterations / elapsed:8.1f} ops/s)")
+    return mean_ms
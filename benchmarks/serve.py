@@ -0,0 +1,54 @@
+"""
+App module for the server benchmarks (gunicorn/uvicorn target).
+
+AWS is mocked by moto inside each worker process and every AWS API call is
+delayed by BENCH_AWS_LATENCY_MS to stand in for real DynamoDB/SNS round
+trips. SQL uses the database from DATABASE_URL, seeded by the runner.
+"""
+
+import os
+import time
+
+from moto import mock_aws
+
+_mock = mock_aws()
+_mock.start()
+
+import boto3
+
+AWS_LATENCY = float(os.environ.get('BENCH_AWS_LATENCY_MS', 20)) / 1000
+
+boto3.setup_default_session(region_name='us-east-1')
+boto3.DEFAULT_SESSION.events.register('before-call', lambda **kwargs: time.sleep(AWS_LATENCY))
+
+from asgiref.wsgi import WsgiToAsgi
+from app import create_app
+from app.models.book import Book
+from app_aws import BOOK_INDEXES, BOOK_INDEX_ATTRIBUTES, DynamoBookRepository
+
+def _create_tables():
+    dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+    dynamodb.create_table(
+        TableName='BookBazaarBooks',
+        KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}] + BOOK_INDEX_ATTRIBUTES,
+        GlobalSecondaryIndexes=BOOK_INDEXES,
+        ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+    )
+    dynamodb.create_table(
+        TableName='BookBazaarOrders',
+        KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
+        ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+    )
+
+_create_tables()
+app = create_app()
+
+with app.app_context():
+    repo = DynamoBookRepository()
+    for book in Book.query.all():
+        repo.add({'id': str(book.id), 'title': book.title, 'author': book.author,
+                  'price': book.price, 'stock': book.stock, 'image_url': book.image_url or ''})
+
+asgi_app = WsgiToAsgi(app)
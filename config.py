@@ -15,19 +15,156 @@ class Config:
     MYSQL_PASSWORD = os.environ.get('MYSQL_PASSWORD')
     MYSQL_DB = os.environ.get('MYSQL_DB')
     MYSQL_HOST = os.environ.get('MYSQL_HOST', 'localhost')
+    # Optional read replica for admin reporting and catalog listing fallbacks
+    MYSQL_REPLICA_HOST = os.environ.get('MYSQL_REPLICA_HOST')
+    
+    # Connection pool (MySQL). Recycle below the server/RDS proxy idle timeout and
+    # pre-ping on checkout so idle workers never hand out a dropped connection.
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 280))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))
+    DB_CONNECT_TIMEOUT = int(os.environ.get('DB_CONNECT_TIMEOUT', 5))
+    DB_READ_TIMEOUT = int(os.environ.get('DB_READ_TIMEOUT', 30))
+    DB_REPLICA_ENGINE = None
     
     if MYSQL_USER and MYSQL_PASSWORD and MYSQL_DB:
         SQLALCHEMY_DATABASE_URI = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DB}"
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            'pool_size': DB_POOL_SIZE,
+            'max_overflow': DB_MAX_OVERFLOW,
+            'pool_recycle': DB_POOL_RECYCLE,
+            'pool_pre_ping': DB_POOL_PRE_PING,
+            'pool_timeout': DB_POOL_TIMEOUT,
+            'connect_args': {'connect_timeout': DB_CONNECT_TIMEOUT, 'read_timeout': DB_READ_TIMEOUT},
+        }
+        if MYSQL_REPLICA_HOST:
+            DB_REPLICA_ENGINE = {
+                'url': f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_REPLICA_HOST}/{MYSQL_DB}",
+                **SQLALCHEMY_ENGINE_OPTIONS,
+            }
     else:
         SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
             'sqlite:///' + os.path.join(BASE_DIR, 'bookbazaar.db')
             
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # File-backed SQLite (single-box deployments): WAL and pragmas set on every
+    # connection; SQLITE_SINGLE_WRITER queues checkout writes behind one lock
+    # per worker and opens them with BEGIN IMMEDIATE
+    SQLITE_TUNING = os.environ.get('SQLITE_TUNING', 'true').lower() == 'true'
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 65536))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 268435456))
+    SQLITE_SINGLE_WRITER = os.environ.get('SQLITE_SINGLE_WRITER', 'true').lower() == 'true'
+    
     # Session settings
     SESSION_TYPE = 'filesystem'
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
     
+    # Rendered /books grid cache (per worker; 0 disables)
+    CATALOG_CACHE_TTL = int(os.environ.get('CATALOG_CACHE_TTL', 60))
+    CATALOG_CACHE_SIZE = int(os.environ.get('CATALOG_CACHE_SIZE', 256))
+    
+    # Startup: persistent Jinja bytecode cache, template/catalog warm-up and timing report
+    TEMPLATE_CACHE_DIR = os.environ.get('TEMPLATE_CACHE_DIR') or os.path.join(BASE_DIR, '.jinja_cache')
+    TEMPLATE_WARMUP = os.environ.get('TEMPLATE_WARMUP', 'true').lower() == 'true'
+    STARTUP_REPORT = os.environ.get('STARTUP_REPORT', 'true').lower() == 'true'
+    
+    # Static files: content-hashed, gzip/brotli copies in STATIC_BUILD_DIR, served as immutable
+    STATIC_FINGERPRINT = os.environ.get('STATIC_FINGERPRINT', 'true').lower() == 'true'
+    STATIC_BUILD_DIR = os.environ.get('STATIC_BUILD_DIR') or os.path.join(BASE_DIR, '.static_build')
+    
+    # Response compression (negotiated br/gzip) for text bodies of at least COMPRESS_MIN_SIZE bytes
+    COMPRESS_RESPONSES = os.environ.get('COMPRESS_RESPONSES', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 5))
+    # Stream the full-table admin lists (orders, users) while they render
+    STREAM_ADMIN_LISTS = os.environ.get('STREAM_ADMIN_LISTS', 'true').lower() == 'true'
+    
+    # Cover thumbnails served by /img: on-disk cache location and size cap, source limits.
+    # Sources resolving to private/internal addresses are refused unless allowed here.
+    IMAGE_CACHE_DIR = os.environ.get('IMAGE_CACHE_DIR') or os.path.join(BASE_DIR, '.image_cache')
+    IMAGE_CACHE_MAX_MB = int(os.environ.get('IMAGE_CACHE_MAX_MB', 512))
+    IMAGE_FETCH_TIMEOUT = float(os.environ.get('IMAGE_FETCH_TIMEOUT', 5))
+    IMAGE_MAX_SOURCE_MB = int(os.environ.get('IMAGE_MAX_SOURCE_MB', 10))
+    IMAGE_QUALITY = int(os.environ.get('IMAGE_QUALITY', 80))
+    IMAGE_ALLOW_PRIVATE_SOURCES = os.environ.get('IMAGE_ALLOW_PRIVATE_SOURCES', 'false').lower() == 'true'
+    
+    # Hot titles flagged with `flask shard-stock` keep their stock in STOCK_SHARDS
+    # counter rows; summed reads are cached per worker and Book.stock is
+    # rewritten with the total at most every STOCK_SHARD_MIRROR_SECONDS
+    STOCK_SHARDING = os.environ.get('STOCK_SHARDING', 'true').lower() == 'true'
+    STOCK_SHARDS = int(os.environ.get('STOCK_SHARDS', 8))
+    STOCK_SHARD_CACHE_SECONDS = float(os.environ.get('STOCK_SHARD_CACHE_SECONDS', 2))
+    STOCK_SHARD_MIRROR_SECONDS = float(os.environ.get('STOCK_SHARD_MIRROR_SECONDS', 5))
+    
+    # Cart holds: adding to the cart reserves stock for STOCK_HOLD_MINUTES; a
+    # per-worker sweeper returns expired holds every STOCK_HOLD_SWEEP_SECONDS
+    # (0 leaves it to `flask sweep-holds`)
+    STOCK_HOLDS = os.environ.get('STOCK_HOLDS', 'true').lower() == 'true'
+    STOCK_HOLD_MINUTES = float(os.environ.get('STOCK_HOLD_MINUTES', 10))
+    STOCK_HOLD_SWEEP_SECONDS = float(os.environ.get('STOCK_HOLD_SWEEP_SECONDS', 30))
+    STOCK_HOLD_SWEEP_BATCH = int(os.environ.get('STOCK_HOLD_SWEEP_BATCH', 500))
+    
+    # Lazy mode: no AWS clients or catalog priming at boot, only on first use
+    LAZY_INIT = os.environ.get('LAZY_INIT', 'false').lower() == 'true'
+    # Run db.create_all() in create_app; production uses the create-db command instead
+    AUTO_CREATE_TABLES = os.environ.get('AUTO_CREATE_TABLES', 'true').lower() == 'true'
+    
+    # Password hashing: any Werkzeug method string, e.g. 'scrypt:32768:8:1' or
+    # 'pbkdf2:sha256:600000'. Stored hashes made with other settings are upgraded on login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+    # Processes for login verification per worker (0 = verify on the request thread)
+    PASSWORD_VERIFY_WORKERS = int(os.environ.get('PASSWORD_VERIFY_WORKERS', 2))
+    PASSWORD_VERIFY_MAX_PENDING = int(os.environ.get('PASSWORD_VERIFY_MAX_PENDING', 16))
+    PASSWORD_VERIFY_TIMEOUT = float(os.environ.get('PASSWORD_VERIFY_TIMEOUT', 5))
+    
+    # Login throttling: token buckets per client IP and per email ('memory' per
+    # worker, or 'dynamodb' shared via the BookBazaarRateLimits table)
+    LOGIN_RATE_LIMIT = os.environ.get('LOGIN_RATE_LIMIT', 'true').lower() == 'true'
+    LOGIN_RATE_LIMIT_BACKEND = os.environ.get('LOGIN_RATE_LIMIT_BACKEND', 'memory')
+    LOGIN_IP_BURST = int(os.environ.get('LOGIN_IP_BURST', 20))
+    LOGIN_IP_PER_MINUTE = float(os.environ.get('LOGIN_IP_PER_MINUTE', 20))
+    LOGIN_EMAIL_BURST = int(os.environ.get('LOGIN_EMAIL_BURST', 5))
+    LOGIN_EMAIL_PER_MINUTE = float(os.environ.get('LOGIN_EMAIL_PER_MINUTE', 1))
+    # When the dynamodb backend errors: allow attempts (true) or refuse them (false)
+    LOGIN_RATE_LIMIT_FAIL_OPEN = os.environ.get('LOGIN_RATE_LIMIT_FAIL_OPEN', 'true').lower() == 'true'
+    # Seconds an email that matched no account is rejected without a lookup (0 disables);
+    # kept in the rate limit backend, so with dynamodb registering clears it for every worker
+    UNKNOWN_EMAIL_CACHE_TTL = int(os.environ.get('UNKNOWN_EMAIL_CACHE_TTL', 60))
+    # Proxies in front of the app whose X-Forwarded-For/-Proto are trusted
+    # (1 behind an ALB); the login IP buckets key on the resulting client IP
+    TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', 0))
+    
+    # Bulk role jobs: users per batch and concurrent DynamoDB UpdateItem calls
+    ROLE_JOB_BATCH_SIZE = int(os.environ.get('ROLE_JOB_BATCH_SIZE', 500))
+    ROLE_JOB_DYNAMO_WORKERS = int(os.environ.get('ROLE_JOB_DYNAMO_WORKERS', 8))
+    # Notifications: messages to one recipient within NOTIFY_COALESCE_SECONDS become one digest;
+    # digests are published NOTIFY_BATCH_SIZE (at most 10) per SNS PublishBatch call
+    NOTIFY_COALESCE_SECONDS = float(os.environ.get('NOTIFY_COALESCE_SECONDS', 10))
+    NOTIFY_BATCH_SIZE = int(os.environ.get('NOTIFY_BATCH_SIZE', 10))
+    # Messages queued before senders flush them themselves (bounds memory during bursts)
+    NOTIFY_MAX_PENDING = int(os.environ.get('NOTIFY_MAX_PENDING', 10000))
+    # Where notifications go: auto (SNS with a real topic ARN, else stdout), sns, stdout, file or queue
+    NOTIFY_TRANSPORT = os.environ.get('NOTIFY_TRANSPORT', 'auto')
+    # file: NDJSON log rotated at NOTIFY_FILE_MAX_MB, keeping NOTIFY_FILE_BACKUPS old files;
+    # one writer per file, so {pid} is replaced with each worker's process id
+    NOTIFY_FILE_PATH = os.environ.get('NOTIFY_FILE_PATH') or os.path.join(BASE_DIR, 'notifications.{pid}.ndjson')
+    NOTIFY_FILE_MAX_MB = float(os.environ.get('NOTIFY_FILE_MAX_MB', 64))
+    NOTIFY_FILE_BACKUPS = int(os.environ.get('NOTIFY_FILE_BACKUPS', 5))
+    # queue: batches held in memory, and how long a sender waits for room before the batch is dropped
+    NOTIFY_QUEUE_BATCHES = int(os.environ.get('NOTIFY_QUEUE_BATCHES', 1000))
+    NOTIFY_QUEUE_BLOCK_SECONDS = float(os.environ.get('NOTIFY_QUEUE_BLOCK_SECONDS', 1))
+    
+    # Bulk order status changes: orders per SQL transaction and concurrent DynamoDB UpdateItem calls
+    ORDER_STATUS_CHUNK_SIZE = int(os.environ.get('ORDER_STATUS_CHUNK_SIZE', 1000))
+    ORDER_STATUS_DYNAMO_WORKERS = int(os.environ.get('ORDER_STATUS_DYNAMO_WORKERS', 8))
+    
     # AWS Configuration placeholders (for future migration)
     # AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
     # DYNAMODB_TABLE_PREFIX = os.environ.get('DYNAMODB_TABLE_PREFIX', 'bookbazaar')
@@ -43,11 +180,22 @@ class ProductionConfig(Config):
     DEBUG = False
     TESTING = False
     # In production, SECRET_KEY must be set via environment variable
+    AUTO_CREATE_TABLES = os.environ.get('AUTO_CREATE_TABLES', 'false').lower() == 'true'
     
 class TestingConfig(Config):
     """Testing environment configuration."""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    DB_REPLICA_ENGINE = None
+    TEMPLATE_CACHE_DIR = None
+    IMAGE_CACHE_DIR = None  # a fresh temporary directory per app
+    STATIC_BUILD_DIR = None  # a temporary directory shared by the test session
+    STARTUP_REPORT = False
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    PASSWORD_VERIFY_WORKERS = 0
+    STOCK_HOLD_SWEEP_SECONDS = 0  # tests sweep explicitly
+    NOTIFY_COALESCE_SECONDS = 0  # publish as soon as sent
 
 # Configuration dictionary
 config = {
@@ -2,7 +2,8 @@ import boto3
 import csv
 import os
 from decimal import Decimal
-from werkzeug.security import generate_password_hash
+from app_aws import book_index_attributes
+from app.services.password_hasher import hasher
 
 # --- Configuration ---
 AWS_REGION = "us-east-1"
@@ -32,8 +33,11 @@ def seed_data(data_dir):
         print(f"\n--- Syncing Users from {os.path.basename(users_file)} ---")
         users_table = dynamodb.Table(TABLE_USERS)
         with open(users_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for i, row in enumerate(reader, 1):
+            rows = list(csv.DictReader(f))
+        # Password hashing dominates user seeding; spread it over all cores
+        password_hashes = hasher.hash_many(row['password'] for row in rows)
+        with users_table.batch_writer() as batch:
+            for i, (row, password_hash) in enumerate(zip(rows, password_hashes), 1):
                 user_id = f"u{i}"
                 item = {
                     'id': user_id,
@@ -41,9 +45,9 @@ def seed_data(data_dir):
                     'email': row['email'],
                     'role': row['role'],
                     'is_validated': row.get('is_validated', 'True').lower() == 'true',
-                    'password_hash': generate_password_hash(row['password'])
+                    'password_hash': password_hash
                 }
-                users_table.put_item(Item=item)
+                batch.put_item(Item=item)
                 user_map[row['username']] = user_id
         print(f"  ✓ {len(user_map)} users synced.")
     else:
@@ -78,15 +82,16 @@ def seed_data(data_dir):
 
                     item = {
                         'id': book_id,
-                        'type': 'book',
                         'title': row.get('title', 'Unknown'),
                         'author': row.get('author', 'Unknown'),
+                        'genre': row.get('genre', ''),
                         'description': row.get('description', ''),
                         'price': get_decimal(row.get('price', 0)),
                         'stock': int(row.get('stock', 50) or 50),
                         'seller_id': seller_id,
                         'image_url': row.get('image_url') or f"/static/images/placeholder.jpg"
                     }
+                    item.update(book_index_attributes(item))
                     batch.put_item(Item=item)
                     book_map[row.get('title')] = book_id
                     
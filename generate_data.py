@@ -0,0 +1,344 @@
+"""
+Synthetic catalog generator for load tests and benchmarks.
+
+Produces a deterministic catalog of N books, M users and K orders:
+  * book popularity follows a Zipf law (a few titles take most orders),
+  * books are spread over sellers with a Zipf skew (a few big sellers),
+  * order dates follow a seasonal curve (Nov/Dec peak, summer dip,
+    busier weekends and evenings) over the chosen date range.
+
+Rows are generated in fixed-size chunks, each from its own seeded RNG, so
+the output depends only on the seed and the counts, never on how many
+processes generated it. Targets:
+
+    python generate_data.py --books 100000 --users 50000 --orders 10000000 --target csv --out data/generated
+    python generate_data.py --books 2000 --users 500 --orders 50000 --target sql
+    python generate_data.py --books 2000 --users 500 --orders 50000 --target dynamodb
+
+CSV files have the /admin/export columns (app/services/export.py) plus
+password_hash for users and description for books, which loading the files
+back as a working catalog needs. The sql target writes to
+the app's configured database (tables must be empty; sales rollups are
+rebuilt afterwards). The dynamodb target writes with BatchWriteItem to
+whatever endpoint boto3 is configured for (AWS, or moto in tests).
+"""
+
+import argparse
+import bisect
+import csv
+import os
+import random
+import shutil
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import accumulate
+from multiprocessing import Pool
+
+CHUNK_SIZE = 50_000  # rows per generated chunk (and per RNG seed)
+# EXPORTS' columns, plus what a loadable catalog needs: users' password_hash, books' description
+USER_COLUMNS = ['id', 'username', 'email', 'password_hash', 'role', 'is_validated', 'created_at']
+BOOK_COLUMNS = ['id', 'title', 'author', 'genre', 'description', 'price', 'stock', 'seller_id', 'image_url',
+                'created_at']
+ORDER_COLUMNS = ['id', 'user_id', 'book_id', 'quantity', 'total_price', 'status', 'order_date']
+
+GENRES = [('Fiction', 30), ('Mystery & Thriller', 14), ('Romance', 12), ('Science Fiction', 8), ('Fantasy', 8),
+          ('Self-Help & Business', 9), ('Biography', 5), ('History', 5), ('Children', 6), ('Poetry', 3)]
+TITLE_WORDS = ("Silent River Midnight Garden Empire Shadow Winter Atlas Ember Library Ocean Crown Stone "
+               "Letters Harbor Journey Secret Mountain City Light Forest Dream Storm Glass Iron Paper "
+               "House Road Star Summer Memory Fire Wild Hidden Last First Golden Broken Lost").split()
+FIRST_NAMES = "Asha Ravi Maya Arjun Clara Daniel Priya Omar Lena Kabir Sofia Ishaan Noor Elena Vikram".split()
+LAST_NAMES = "Sharma Iyer Walker Khan Rossi Menon Patel Chen Fischer Das Silva Kapoor Novak Reyes Rao".split()
+
+# Relative order volume by month (Jan..Dec), weekday (Mon..Sun) and hour of day
+MONTH_WEIGHTS = [0.9, 0.8, 0.9, 0.9, 0.9, 0.8, 0.75, 0.8, 0.95, 1.1, 1.6, 1.9]
+WEEKDAY_WEIGHTS = [0.9, 0.9, 0.95, 1.0, 1.1, 1.3, 1.25]
+HOUR_WEIGHTS = [0.2, 0.1, 0.1, 0.1, 0.1, 0.2, 0.4, 0.7, 0.9, 1.0, 1.1, 1.2,
+                1.3, 1.2, 1.1, 1.1, 1.2, 1.4, 1.7, 2.0, 2.1, 1.8, 1.2, 0.6]
+
+class CatalogSpec:
+    """Counts, seed and distributions of one synthetic catalog."""
+
+    def __init__(self, books, users, orders, seed=42, book_zipf=1.0, seller_zipf=1.2,
+                 start=datetime(2023, 1, 1), end=datetime(2025, 1, 1), chunk_size=CHUNK_SIZE):
+        self.books, self.users, self.orders = books, users, orders
+        self.seed = seed
+        self.book_zipf, self.seller_zipf = book_zipf, seller_zipf
+        self.start, self.end = start, end
+        self.chunk_size = chunk_size
+        # User 1 is an admin, the next ~2% are sellers, everyone else buys
+        self.sellers = max(1, users // 50) if users > 1 else 0
+        self._rank_step = _coprime_step(books) if books else 1
+        self._tables = None
+
+    def chunks(self, count):
+        return [(start, min(start + self.chunk_size, count + 1)) for start in range(1, count + 1, self.chunk_size)]
+
+    def rng(self, kind, start):
+        return random.Random(f"{self.seed}:{kind}:{start}")
+
+    @property
+    def tables(self):
+        """Cumulative weights for the weighted draws, built once per process."""
+        if self._tables is None:
+            days, day_weights = [], []
+            day = self.start.replace(hour=0, minute=0, second=0, microsecond=0)
+            while day < self.end:
+                days.append(day)
+                day_weights.append(MONTH_WEIGHTS[day.month - 1] * WEEKDAY_WEIGHTS[day.weekday()])
+                day += timedelta(days=1)
+            self._tables = {
+                'book_rank': list(accumulate(1 / rank ** self.book_zipf for rank in range(1, self.books + 1))),
+                'seller_rank': list(accumulate(1 / rank ** self.seller_zipf for rank in range(1, self.sellers + 1))),
+                'days': days,
+                'day': list(accumulate(day_weights)),
+                'hour': list(accumulate(HOUR_WEIGHTS)),
+                'genre': list(accumulate(weight for _, weight in GENRES)),
+            }
+        return self._tables
+
+    def book_for_rank(self, rank):
+        """Scatter popularity ranks over book ids so bestsellers are not simply ids 1, 2, 3..."""
+        return (rank * self._rank_step) % self.books + 1
+
+    def book_price(self, book_id):
+        """Price of a book as a pure function of (seed, id), so order workers need no book table."""
+        x = _mix(self.seed * 1_000_003 + book_id)
+        # Roughly log-uniform between ₹99 and ₹2499, rounded to a ₹.00 / ₹.99 price point
+        price = 99 * (2499 / 99) ** ((x % 10_000) / 10_000)
+        return round(price) + (0.0 if x & 1 else -0.01)
+
+def _mix(value):
+    """splitmix64 finalizer: a cheap, well-spread integer hash."""
+    value = (value + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return value ^ (value >> 31)
+
+def _coprime_step(n):
+    step = int(n * 0.618) or 1
+    while _gcd(step, n) != 1:
+        step += 1
+    return step
+
+def _gcd(a, b):
+    while b:
+        a, b = b, a % b
+    return a
+
+def _draw(rng, cumulative):
+    return bisect.bisect(cumulative, rng.random() * cumulative[-1])
+
+def user_rows(spec, start, stop, password_hash):
+    rng = spec.rng('users', start)
+    for user_id in range(start, stop):
+        if user_id == 1:
+            role, validated = 'admin', True
+        elif user_id <= 1 + spec.sellers:
+            role, validated = 'seller', rng.random() < 0.9
+        else:
+            role, validated = 'buyer', False
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        created = spec.start - timedelta(days=rng.randrange(1, 720), seconds=rng.randrange(86400))
+        yield (user_id, f"{first.lower()}.{last.lower()}{user_id}", f"user{user_id}@example.com",
+               password_hash, role, validated, created)
+
+def book_rows(spec, start, stop):
+    rng = spec.rng('books', start)
+    tables = spec.tables
+    for book_id in range(start, stop):
+        genre = GENRES[_draw(rng, tables['genre'])][0]
+        title = " ".join(rng.sample(TITLE_WORDS, rng.choice((2, 3, 3, 4)))).title()
+        author = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        seller_id = 2 + _draw(rng, tables['seller_rank']) if spec.sellers else None
+        created = spec.start - timedelta(days=rng.randrange(1, 365))
+        yield (book_id, title, author, genre, f"A {genre.lower()} title by {author}.", spec.book_price(book_id),
+               rng.choice((0, 3, 8, 15, 25, 40, 60, 100)), seller_id, None, created)
+
+def order_rows(spec, start, stop):
+    rng = spec.rng('orders', start)
+    random_, bisect_ = rng.random, bisect.bisect
+    tables = spec.tables
+    days, book_rank, day_table, hour_table = tables['days'], tables['book_rank'], tables['day'], tables['hour']
+    book_total, day_total, hour_total = book_rank[-1], day_table[-1], hour_table[-1]
+    buyers_from, buyers = 2 + spec.sellers, max(1, spec.users - 1 - spec.sellers)
+    has_buyers = spec.users > 1 + spec.sellers
+    prices = {}  # popular books repeat constantly, so remember their prices
+    for order_id in range(start, stop):
+        book_id = spec.book_for_rank(bisect_(book_rank, random_() * book_total))
+        price = prices.get(book_id)
+        if price is None:
+            price = prices[book_id] = spec.book_price(book_id)
+        user_id = buyers_from + int(buyers * random_() ** 1.5) if has_buyers else 1
+        quantity = 1 if random_() < 0.8 else (2, 2, 3, 4)[int(random_() * 4)]
+        hour = bisect_(hour_table, random_() * hour_total)
+        ordered = days[bisect_(day_table, random_() * day_total)] + timedelta(
+            seconds=hour * 3600 + int(random_() * 3600))
+        age = (spec.end - ordered).days
+        if random_() < 0.04:
+            status = 'Cancelled'
+        elif age < 2:
+            status = 'Placed' if random_() < 0.6 else 'Processing'
+        elif age < 7:
+            status = 'Shipped'
+        else:
+            status = 'Delivered'
+        yield (order_id, user_id, book_id, quantity, round(price * quantity, 2), status, ordered)
+
+# --- Workers (module level so multiprocessing can pickle them) ---
+
+_spec = None
+
+def _init_worker(spec):
+    global _spec
+    _spec = spec
+
+def _rows(kind, start, stop, password_hash):
+    if kind == 'users':
+        return user_rows(_spec, start, stop, password_hash)
+    if kind == 'books':
+        return book_rows(_spec, start, stop)
+    return order_rows(_spec, start, stop)
+
+def _csv_part(job):
+    kind, start, stop, password_hash, path = job
+    with open(path, 'w', newline='', encoding='utf-8') as handle:
+        csv.writer(handle).writerows(_rows(kind, start, stop, password_hash))
+    return stop - start
+
+def _chunk(job):
+    kind, start, stop, password_hash = job
+    return list(_rows(kind, start, stop, password_hash))
+
+# --- Targets ---
+
+COLUMNS = {'users': USER_COLUMNS, 'books': BOOK_COLUMNS, 'orders': ORDER_COLUMNS}
+
+def _jobs(spec, password_hash):
+    for kind, count in (('users', spec.users), ('books', spec.books), ('orders', spec.orders)):
+        for start, stop in spec.chunks(count):
+            yield kind, start, stop, password_hash
+
+def _pool(spec, workers):
+    return Pool(processes=workers, initializer=_init_worker, initargs=(spec,))
+
+def write_csv(spec, out_dir, password_hash, workers=None, report=print):
+    """Write users.csv, books.csv and orders.csv into out_dir; parts are generated in parallel."""
+    os.makedirs(out_dir, exist_ok=True)
+    parts_dir = os.path.join(out_dir, '.parts')
+    os.makedirs(parts_dir, exist_ok=True)
+    jobs = [(kind, start, stop, password_hash, os.path.join(parts_dir, f"{kind}-{start:012d}.csv"))
+            for kind, start, stop, password_hash in _jobs(spec, password_hash)]
+    with _pool(spec, workers) as pool:
+        for done, _ in enumerate(pool.imap_unordered(_csv_part, jobs), 1):
+            if done % 20 == 0 or done == len(jobs):
+                report(f"  {done}/{len(jobs)} chunks generated")
+    for kind, columns in COLUMNS.items():
+        with open(os.path.join(out_dir, f"{kind}.csv"), 'w', newline='', encoding='utf-8') as target:
+            csv.writer(target).writerow(columns)
+            for job in jobs:
+                if job[0] == kind:
+                    with open(job[4], encoding='utf-8') as part:
+                        shutil.copyfileobj(part, target)
+    shutil.rmtree(parts_dir)
+
+def write_sql(spec, password_hash, workers=None, report=print):
+    """Insert the catalog into the app database (empty tables), then rebuild sales rollups.
+
+    Chunks are generated in worker processes and inserted by this process in
+    executemany batches, so SQLite sees a single writer.
+    """
+    from sqlalchemy import func, select
+    from app.extensions import db
+    from app.models.book import Book
+    from app.models.order import Order
+    from app.models.user import User
+    from app.services import sales_rollups
+
+    models = {'users': User, 'books': Book, 'orders': Order}
+    if any(db.session.execute(select(func.count()).select_from(model)).scalar() for model in models.values()):
+        raise SystemExit("The users/books/orders tables must be empty; generated ids start at 1.")
+    jobs = list(_jobs(spec, password_hash))
+    with _pool(spec, workers) as pool:
+        # imap keeps chunk order, so ids go in ascending (users before books before orders)
+        for done, ((kind, *_), rows) in enumerate(zip(jobs, pool.imap(_chunk, jobs)), 1):
+            columns = COLUMNS[kind]
+            db.session.execute(models[kind].__table__.insert(), [dict(zip(columns, row)) for row in rows])
+            db.session.commit()
+            if done % 20 == 0 or done == len(jobs):
+                report(f"  {done}/{len(jobs)} chunks inserted")
+    # Core inserts skip the ORM events that maintain the rollups
+    sales_rollups.backfill(report=lambda message: None)
+
+def write_dynamodb(spec, password_hash, workers=None, aws_instance=None, report=print):
+    """Write the catalog to the DynamoDB tables with batch writers (items shaped like the repositories')."""
+    from app_aws import (DYNAMODB_BOOKS_TABLE, DYNAMODB_ORDERS_TABLE, DYNAMODB_USERS_TABLE, aws_app,
+                         book_index_attributes)
+    dynamodb = (aws_instance or aws_app).dynamodb
+    tables = {'users': DYNAMODB_USERS_TABLE, 'books': DYNAMODB_BOOKS_TABLE, 'orders': DYNAMODB_ORDERS_TABLE}
+
+    def item(kind, row):
+        item = {column: value for column, value in zip(COLUMNS[kind], row) if value is not None}
+        for key in ('id', 'user_id', 'book_id', 'seller_id'):
+            if key in item:
+                item[key] = str(item[key])
+        for key in ('price', 'total_price'):
+            if key in item:
+                item[key] = Decimal(str(item[key]))
+        for key in ('created_at', 'order_date'):
+            if key in item:
+                item[key] = item[key].isoformat()
+        if kind == 'books':
+            item.update(book_index_attributes(item))
+        return item
+
+    jobs = list(_jobs(spec, password_hash))
+    with _pool(spec, workers) as pool:
+        for done, ((kind, *_), rows) in enumerate(zip(jobs, pool.imap(_chunk, jobs)), 1):
+            with dynamodb.Table(tables[kind]).batch_writer() as batch:
+                for row in rows:
+                    batch.put_item(Item=item(kind, row))
+            if done % 20 == 0 or done == len(jobs):
+                report(f"  {done}/{len(jobs)} chunks written")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic BookBazaar catalog")
+    parser.add_argument("--books", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--target", choices=["csv", "sql", "dynamodb"], default="csv")
+    parser.add_argument("--out", default=os.path.join("data", "generated"), help="Output directory for csv")
+    parser.add_argument("--workers", type=int, default=None, help="Generator processes (default: all cores)")
+    parser.add_argument("--book-zipf", type=float, default=1.0, help="Zipf exponent of title popularity")
+    parser.add_argument("--seller-zipf", type=float, default=1.2, help="Zipf exponent of books per seller")
+    parser.add_argument("--from", dest="date_from", default="2023-01-01", help="First order date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", default="2025-01-01", help="End of order dates (exclusive)")
+    parser.add_argument("--password", default="password", help="Password every generated user gets")
+    args = parser.parse_args(argv)
+
+    spec = CatalogSpec(args.books, args.users, args.orders, seed=args.seed, book_zipf=args.book_zipf,
+                       seller_zipf=args.seller_zipf, start=datetime.strptime(args.date_from, '%Y-%m-%d'),
+                       end=datetime.strptime(args.date_to, '%Y-%m-%d'))
+    from app.services.password_hasher import hasher
+    # Hashing millions of passwords is pointless here; everyone shares one hash
+    password_hash = hasher.hash(args.password)
+
+    started = time.perf_counter()
+    print(f"Generating {args.users} users, {args.books} books, {args.orders} orders (seed {args.seed})...")
+    if args.target == 'csv':
+        write_csv(spec, args.out, password_hash, workers=args.workers)
+        where = args.out
+    elif args.target == 'dynamodb':
+        write_dynamodb(spec, password_hash, workers=args.workers)
+        where = "DynamoDB"
+    else:
+        from app import create_app
+        app = create_app()
+        with app.app_context():
+            write_sql(spec, password_hash, workers=args.workers)
+            where = app.config['SQLALCHEMY_DATABASE_URI']
+    print(f"✓ Catalog written to {where} in {time.perf_counter() - started:.1f} s")
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,21 @@
 """
 Database initialization script for BookBazaar.
 Creates tables and seeds with extensive book data (INR Pricing) and admin user.
+
+Safe to re-run against a populated database: existing tables are kept,
+books are matched on title + author and users on email, and only missing or
+changed rows are written. Live stock and existing passwords are never reset.
 """
 
 from app import create_app
 from app.extensions import db
 from app.models.book import Book
 from app.models.user import User
+from app.services.password_hasher import hasher
+from app.services.schema import upgrade_schema
+from app.services.seeding import upsert_rows
+
+BOOK_FIELDS = ('title', 'author', 'genre', 'description', 'price', 'stock', 'image_url')
 
 def init_database():
     """Initialize database and seed with sample data."""
@@ -14,12 +23,9 @@ def init_database():
     app = create_app()
     
     with app.app_context():
-        # Drop all tables and recreate (for clean initialization)
-        print("Dropping existing tables...")
-        db.drop_all()
-        
-        print("Creating new tables...")
-        db.create_all()
+        # Creates missing tables and columns only; existing data is left in place
+        print("Creating missing tables...")
+        upgrade_schema()
         
         # Seed books with extensive realistic data (INR Prices)
         print("Seeding books...")
@@ -29,6 +35,7 @@ def init_database():
             Book(
                 title="The Midnight Library",
                 author="Matt Haig",
+                genre="Fiction",
                 description="Between life and death there is a library. When Nora Seed finds herself in the Midnight Library, she has a chance to make things right.",
                 price=499.00,
                 stock=15,
@@ -37,6 +44,7 @@ def init_database():
             Book(
                 title="Project Hail Mary",
                 author="Andy Weir",
+                genre="Fiction",
                 description="A lone astronaut must save the earth from disaster in this incredible new science-based thriller from the author of The Martian.",
                 price=599.00,
                 stock=8,
@@ -45,6 +53,7 @@ def init_database():
             Book(
                 title="The Seven Husbands of Evelyn Hugo",
                 author="Taylor Jenkins Reid",
+                genre="Fiction",
                 description="Aging and reclusive Hollywood movie icon Evelyn Hugo is finally ready to tell the truth about her glamorous and scandalous life.",
                 price=450.00,
                 stock=16,
@@ -53,6 +62,7 @@ def init_database():
             Book(
                 title="The Silent Patient",
                 author="Alex Michaelides",
+                genre="Fiction",
                 description="A woman's act of violence against her husband—and the therapist obsessed with uncovering her motive. A shocking psychological thriller.",
                 price=399.00,
                 stock=13,
@@ -61,6 +71,7 @@ def init_database():
             Book(
                 title="Klara and the Sun",
                 author="Kazuo Ishiguro",
+                genre="Fiction",
                 description="From her place in the store, Klara, an Artificial Friend with outstanding observational qualities, watches carefully the behavior of those who come in.",
                 price=550.00,
                 stock=9,
@@ -69,6 +80,7 @@ def init_database():
             Book(
                 title="The Four Winds",
                 author="Kristin Hannah",
+                genre="Fiction",
                 description="A stunning novel about the bonds of family and the power of hope. Texas, 1921. The Great Depression looms on the horizon.",
                 price=495.00,
                 stock=7,
@@ -77,6 +89,7 @@ def init_database():
             Book(
                 title="Where the Crawdads Sing",
                 author="Delia Owens",
+                genre="Fiction",
                 description="For years, rumors of the 'Marsh Girl' have haunted Barkley Cove. So in late 1969, when handsome Chase Andrews is found dead, the locals immediately suspect her.",
                 price=425.00,
                 stock=20,
@@ -85,6 +98,7 @@ def init_database():
             Book(
                 title="The Invisible Life of Addie LaRue",
                 author="V.E. Schwab",
+                genre="Fiction",
                 description="A life no one will remember. A story you will never forget. France, 1714: in a moment of desperation, a young woman makes a Faustian bargain.",
                 price=525.00,
                 stock=11,
@@ -93,6 +107,7 @@ def init_database():
             Book(
                 title="The House in the Cerulean Sea",
                 author="T.J. Klune",
+                genre="Fiction",
                 description="A magical island. A dangerous task. A burning secret. Linus Baker leads a quiet, solitary life. At forty, he lives in a tiny house with a devious cat.",
                 price=480.00,
                 stock=14,
@@ -101,6 +116,7 @@ def init_database():
             Book(
                 title="Anxious People",
                 author="Fredrik Backman",
+                genre="Fiction",
                 description="A poignant comedy about a crime that never happened, a hostage drama that never unfolded, and eight extremely anxious strangers.",
                 price=395.00,
                 stock=12,
@@ -111,6 +127,7 @@ def init_database():
             Book(
                 title="Dune",
                 author="Frank Herbert",
+                genre="Science Fiction & Fantasy",
                 description="Set on the desert planet Arrakis, Dune is the story of the boy Paul Atreides, heir to a noble family tasked with ruling this inhospitable world.",
                 price=699.00,
                 stock=18,
@@ -119,6 +136,7 @@ def init_database():
             Book(
                 title="The Name of the Wind",
                 author="Patrick Rothfuss",
+                genre="Science Fiction & Fantasy",
                 description="Told in Kvothe's own voice, this is the tale of the magically gifted young man who grows to be the most notorious wizard his world has ever seen.",
                 price=550.00,
                 stock=14,
@@ -127,6 +145,7 @@ def init_database():
             Book(
                 title="The Way of Kings",
                 author="Brandon Sanderson",
+                genre="Science Fiction & Fantasy",
                 description="Epic fantasy series starter. Roshar is a world of stone and storms. Unite them. A breathtaking saga of war and magic.",
                 price=899.00,
                 stock=10,
@@ -135,6 +154,7 @@ def init_database():
             Book(
                 title="Neuromancer",
                 author="William Gibson",
+                genre="Science Fiction & Fantasy",
                 description="The groundbreaking cyberpunk novel. Case was the sharpest data-thief in the matrix—until he crossed the wrong people.",
                 price=399.00,
                 stock=12,
@@ -143,6 +163,7 @@ def init_database():
             Book(
                 title="Foundation",
                 author="Isaac Asimov",
+                genre="Science Fiction & Fantasy",
                 description="The first novel in the Foundation series. Galactic Empire is crumbling. Haria Seldon uses psychohistory to save knowledge.",
                 price=349.00,
                 stock=15,
@@ -151,6 +172,7 @@ def init_database():
             Book(
                 title="The Fellowship of the Ring",
                 author="J.R.R. Tolkien",
+                genre="Science Fiction & Fantasy",
                 description="The first volume in the Lord of the Rings trilogy. One Ring to rule them all, One Ring to find them, One Ring to bring them all.",
                 price=599.00,
                 stock=22,
@@ -159,6 +181,7 @@ def init_database():
             Book(
                 title="American Gods",
                 author="Neil Gaiman",
+                genre="Science Fiction & Fantasy",
                 description="A strange and unsettling story of the battle between the old gods and the new ones. Shadow Moon gets caught in the middle.",
                 price=499.00,
                 stock=10,
@@ -169,6 +192,7 @@ def init_database():
             Book(
                 title="Atomic Habits",
                 author="James Clear",
+                genre="Self-Help & Business",
                 description="An Easy & Proven Way to Build Good Habits & Break Bad Ones. Transform your life with tiny changes that deliver remarkable results.",
                 price=550.00,
                 stock=25,
@@ -177,6 +201,7 @@ def init_database():
             Book(
                 title="The Psychology of Money",
                 author="Morgan Housel",
+                genre="Self-Help & Business",
                 description="Timeless lessons on wealth, greed, and happiness. Doing well with money has little to do with how smart you are and a lot to do with how you behave.",
                 price=350.00,
                 stock=22,
@@ -185,6 +210,7 @@ def init_database():
             Book(
                 title="Thinking, Fast and Slow",
                 author="Daniel Kahneman",
+                genre="Self-Help & Business",
                 description="The definitive book on behavioral economics and cognitive biases. A landmark work that explores the two systems that drive the way we think.",
                 price=750.00,
                 stock=11,
@@ -193,6 +219,7 @@ def init_database():
             Book(
                 title="Deep Work",
                 author="Cal Newport",
+                genre="Self-Help & Business",
                 description="Rules for Focused Success in a Distracted World. Learn how to master the art of deep work and dramatically improve your productivity.",
                 price=450.00,
                 stock=17,
@@ -201,6 +228,7 @@ def init_database():
             Book(
                 title="The Lean Startup",
                 author="Eric Ries",
+                genre="Self-Help & Business",
                 description="How Today's Entrepreneurs Use Continuous Innovation to Create Radically Successful Businesses. A must-read for entrepreneurs.",
                 price=599.00,
                 stock=13,
@@ -209,6 +237,7 @@ def init_database():
             Book(
                 title="Start With Why",
                 author="Simon Sinek",
+                genre="Self-Help & Business",
                 description="How Great Leaders Inspire Everyone to Take Action. Discover the power of WHY in business and life.",
                 price=499.00,
                 stock=19,
@@ -217,6 +246,7 @@ def init_database():
             Book(
                 title="Shoe Dog",
                 author="Phil Knight",
+                genre="Self-Help & Business",
                 description="A Memoir by the Creator of Nike. An honest and riveting look at the building of a global brand.",
                 price=550.00,
                 stock=15,
@@ -225,6 +255,7 @@ def init_database():
             Book(
                 title="Quiet",
                 author="Susan Cain",
+                genre="Self-Help & Business",
                 description="The Power of Introverts in a World That Can't Stop Talking. A book that changed the conversation about introverts.",
                 price=399.00,
                 stock=20,
@@ -235,6 +266,7 @@ def init_database():
             Book(
                 title="Sapiens",
                 author="Yuval Noah Harari",
+                genre="History & Science",
                 description="A Brief History of Humankind. How did our species succeed in the battle for dominance? Why did our foraging ancestors come together to create cities?",
                 price=599.00,
                 stock=14,
@@ -243,6 +275,7 @@ def init_database():
             Book(
                 title="Educated",
                 author="Tara Westover",
+                genre="History & Science",
                 description="A Memoir. An unforgettable story of a young woman who leaves her survivalist family and goes on to earn a PhD from Cambridge.",
                 price=450.00,
                 stock=16,
@@ -251,6 +284,7 @@ def init_database():
             Book(
                 title="Homo Deus",
                 author="Yuval Noah Harari",
+                genre="History & Science",
                 description="A Brief History of Tomorrow. What will happen to us when artificial intelligence outperforms humans? The sequel to Sapiens.",
                 price=625.00,
                 stock=10,
@@ -259,6 +293,7 @@ def init_database():
             Book(
                 title="A Short History of Nearly Everything",
                 author="Bill Bryson",
+                genre="History & Science",
                 description="A humorous and accessible history of science, covering everything from the Big Bang to the rise of civilization.",
                 price=450.00,
                 stock=9,
@@ -267,6 +302,7 @@ def init_database():
             Book(
                 title="The Immortal Life of Henrietta Lacks",
                 author="Rebecca Skloot",
+                genre="History & Science",
                 description="The story of a poor Southern tobacco farmer whose cancer cells became one of the most important tools in medicine.",
                 price=399.00,
                 stock=12,
@@ -275,6 +311,7 @@ def init_database():
             Book(
                 title="Guns, Germs, and Steel",
                 author="Jared Diamond",
+                genre="History & Science",
                 description="The Fates of Human Societies. Why did some civilizations thrive while others languished? A Pulitzer Prize-winning classic.",
                 price=499.00,
                 stock=8,
@@ -283,6 +320,7 @@ def init_database():
             Book(
                 title="The Gene",
                 author="Siddhartha Mukherjee",
+                genre="History & Science",
                 description="An Intimate History. The story of the gene—the fundamental unit of heredity and the building block of life.",
                 price=850.00,
                 stock=11,
@@ -293,6 +331,7 @@ def init_database():
             Book(
                 title="Gone Girl",
                 author="Gillian Flynn",
+                genre="Mystery & Thriller",
                 description="On the morning of his fifth wedding anniversary, Nick's wife Amy suddenly disappears. The evidence suggests foul play.",
                 price=399.00,
                 stock=15,
@@ -301,6 +340,7 @@ def init_database():
             Book(
                 title="The Girl with the Dragon Tattoo",
                 author="Stieg Larsson",
+                genre="Mystery & Thriller",
                 description="Murder mystery, family saga, love story, and financial intrigue combine into one satisfyingly complex thriller.",
                 price=450.00,
                 stock=11,
@@ -309,6 +349,7 @@ def init_database():
             Book(
                 title="The Da Vinci Code",
                 author="Dan Brown",
+                genre="Mystery & Thriller",
                 description="A murder in the Louvre and clues in Da Vinci paintings lead to the discovery of a religious mystery protected by a secret society.",
                 price=350.00,
                 stock=18,
@@ -317,6 +358,7 @@ def init_database():
             Book(
                 title="Big Little Lies",
                 author="Liane Moriarty",
+                genre="Mystery & Thriller",
                 description="A murder, a tragic accident, or just good parents gone bad? A story of secrets and lies in a small coastal town.",
                 price=425.00,
                 stock=14,
@@ -325,6 +367,7 @@ def init_database():
             Book(
                 title="Sharp Objects",
                 author="Gillian Flynn",
+                genre="Mystery & Thriller",
                 description="Camille Preaker returns to her hometown to report on a string of murders. She must face her own past.",
                 price=380.00,
                 stock=10,
@@ -335,6 +378,7 @@ def init_database():
             Book(
                 title="1984",
                 author="George Orwell",
+                genre="Classics",
                 description="A dystopian social science fiction novel. Big Brother is watching. A must-read classic about totalitarianism and surveillance.",
                 price=299.00,
                 stock=20,
@@ -343,6 +387,7 @@ def init_database():
             Book(
                 title="To Kill a Mockingbird",
                 author="Harper Lee",
+                genre="Classics",
                 description="The unforgettable novel of a childhood in a sleepy Southern town and the crisis of conscience that rocked it.",
                 price=250.00,
                 stock=22,
@@ -351,6 +396,7 @@ def init_database():
             Book(
                 title="Pride and Prejudice",
                 author="Jane Austen",
+                genre="Classics",
                 description="A romantic novel of manners about the perils of misconstrued first impressions. A timeless classic.",
                 price=199.00,
                 stock=17,
@@ -359,6 +405,7 @@ def init_database():
             Book(
                 title="The Great Gatsby",
                 author="F. Scott Fitzgerald",
+                genre="Classics",
                 description="The story of the mysteriously wealthy Jay Gatsby and his love for the beautiful Daisy Buchanan. An American classic.",
                 price=225.00,
                 stock=19,
@@ -367,6 +414,7 @@ def init_database():
             Book(
                 title="Brave New World",
                 author="Aldous Huxley",
+                genre="Classics",
                 description="A chilling vision of a future world where happiness is mandatory and individuality is suppressed.",
                 price=280.00,
                 stock=13,
@@ -375,6 +423,7 @@ def init_database():
             Book(
                 title="The Catcher in the Rye",
                 author="J.D. Salinger",
+                genre="Classics",
                 description="The ultimate novel of teenage angst and rebellion. Holden Caulfield's journey through New York City.",
                 price=249.00,
                 stock=16,
@@ -385,6 +434,7 @@ def init_database():
             Book(
                 title="The Hunger Games",
                 author="Suzanne Collins",
+                genre="Young Adult",
                 description="In a dystopian future, teenagers are forced to fight to the death in a televised spectacle. A gripping dystopian trilogy starter.",
                 price=349.00,
                 stock=24,
@@ -393,6 +443,7 @@ def init_database():
             Book(
                 title="Harry Potter and the Sorcerer's Stone",
                 author="J.K. Rowling",
+                genre="Young Adult",
                 description="The magical beginning of Harry Potter's journey. A boy discovers he's a wizard on his 11th birthday.",
                 price=499.00,
                 stock=30,
@@ -401,6 +452,7 @@ def init_database():
             Book(
                 title="The Fault in Our Stars",
                 author="John Green",
+                genre="Young Adult",
                 description="A love story about two teens with cancer. Funny, raw, and honest. An emotional journey you won't forget.",
                 price=325.00,
                 stock=14,
@@ -409,6 +461,7 @@ def init_database():
             Book(
                 title="The Book Thief",
                 author="Markus Zusak",
+                genre="Young Adult",
                 description="Narrated by Death, this is the story of Liesel Meminger, a young girl living in Nazi Germany.",
                 price=450.00,
                 stock=12,
@@ -417,6 +470,7 @@ def init_database():
             Book(
                 title="Wonder",
                 author="R.J. Palacio",
+                genre="Young Adult",
                 description="The story of August Pullman, a boy born with facial differences who enters a mainstream school for the first time.",
                 price=299.00,
                 stock=18,
@@ -427,6 +481,7 @@ def init_database():
             Book(
                 title="Becoming",
                 author="Michelle Obama",
+                genre="Biography & Memoir",
                 description="An intimate, powerful, and inspiring memoir by the former First Lady of the United States.",
                 price=650.00,
                 stock=16,
@@ -435,6 +490,7 @@ def init_database():
             Book(
                 title="Steve Jobs",
                 author="Walter Isaacson",
+                genre="Biography & Memoir",
                 description="The exclusive biography of Steve Jobs. Based on more than forty interviews with Jobs over two years.",
                 price=799.00,
                 stock=10,
@@ -443,6 +499,7 @@ def init_database():
             Book(
                 title="Long Walk to Freedom",
                 author="Nelson Mandela",
+                genre="Biography & Memoir",
                 description="The autobiography of Nelson Mandela. The riveting memoirs of the man who rose from tribal chief to president of South Africa.",
                 price=550.00,
                 stock=8,
@@ -451,6 +508,7 @@ def init_database():
             Book(
                 title="Born a Crime",
                 author="Trevor Noah",
+                genre="Biography & Memoir",
                 description="Stories from a South African Childhood. A compelling memoir about growing up during and after apartheid.",
                 price=495.00,
                 stock=15,
@@ -459,6 +517,7 @@ def init_database():
             Book(
                 title="The Glass Castle",
                 author="Jeannette Walls",
+                genre="Biography & Memoir",
                 description="A remarkable memoir of resilience and redemption, and a revelatory look into a family at once deeply dysfunctional and uniquely vibrant.",
                 price=399.00,
                 stock=13,
@@ -466,54 +525,38 @@ def init_database():
             ),
         ]
         
-        for book in books:
-            db.session.add(book)
-        
+        book_rows = [{field: getattr(book, field) for field in BOOK_FIELDS} for book in books]
+        added, updated, unchanged = upsert_rows(
+            Book, book_rows, key_columns=('title', 'author'),
+            update_columns=('genre', 'description', 'price', 'image_url'), insert_only_columns=('stock',))
         db.session.commit()
-        print(f"✓ Added {len(books)} books to database")
-        
-        # Create demo buyer user
-        print("Creating demo buyer user...")
-        demo_user = User(
-            username="demo",
-            email="demo@bookbazaar.com",
-            role="buyer"
-        )
-        demo_user.set_password("demo123")
-        db.session.add(demo_user)
-        
-        # Create demo seller user
-        print("Creating demo seller user...")
-        seller_user = User(
-            username="seller",
-            email="seller@bookbazaar.com",
-            role="seller",
-            is_validated=True
-        )
-        seller_user.set_password("seller123")
-        db.session.add(seller_user)
-        
-        # Create admin user
-        print("Creating admin user...")
-        admin_user = User(
-            username="admin",
-            email="admin@bookbazaar.com",
-            role="admin",
-            is_validated=True
-        )
-        admin_user.set_password("admin123")
-        db.session.add(admin_user)
+        print(f"✓ Books: {len(added)} added, {len(updated)} updated, {unchanged} unchanged")
         
+        # Demo accounts: created once, never re-hashed or reset on later runs
+        print("Creating demo accounts...")
+        accounts = [
+            {'username': "demo", 'email': "demo@bookbazaar.com", 'role': "buyer", 'is_validated': False,
+             'password': "demo123"},
+            {'username': "seller", 'email': "seller@bookbazaar.com", 'role': "seller", 'is_validated': True,
+             'password': "seller123"},
+            {'username': "admin", 'email': "admin@bookbazaar.com", 'role': "admin", 'is_validated': True,
+             'password': "admin123"},
+        ]
+        known = set(db.session.execute(db.select(User.email)).scalars())
+        for account in accounts:
+            if account['email'] not in known:
+                account['password_hash'] = hasher.hash(account['password'])
+        added, updated, unchanged = upsert_rows(
+            User, accounts, key_columns=('email',), update_columns=('username', 'role', 'is_validated'),
+            insert_only_columns=('password_hash',))
         db.session.commit()
-        print("✓ Created demo buyer (email: demo@bookbazaar.com, password: demo123)")
-        print("✓ Created demo seller (email: seller@bookbazaar.com, password: seller123)")
-        print("✓ Created admin user (email: admin@bookbazaar.com, password: admin123)")
+        print(f"✓ Accounts: {len(added)} added, {len(updated)} updated, {unchanged} unchanged")
         
         print("\n" + "="*50)
         print("Database initialized successfully!")
         print("="*50)
         print(f"\n📚 Total Books: {len(books)}")
-        print("\nAccounts created:")
+        print("\nDemo accounts:")
         print("  Buyer:    demo@bookbazaar.com / demo123")
         print("  Seller:   seller@bookbazaar.com / seller123")
         print("  Admin:    admin@bookbazaar.com / admin123")
@@ -1,93 +1,135 @@
 import csv
 import os
+import sys
+import time
 from datetime import datetime
+from sqlalchemy import select
 from app import create_app
 from app.extensions import db
 from app.models.user import User
 from app.models.book import Book
 from app.models.order import Order
+from app.services import sales_rollups
+from app.services.password_hasher import hasher
+from app.services.schema import upgrade_schema
+from app.services.seeding import upsert_rows
+
+# Safe to re-run: rows are matched on natural keys (user email, book title +
+# author, order buyer + book + date), new rows are inserted and changed ones
+# updated in bulk, and nothing is ever dropped. Existing users keep their
+# passwords and existing books keep their live stock.
+
+def _read(csv_file):
+    with open(csv_file, mode='r', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
 
 def seed_users(csv_file):
     print(f"Seeding users from {csv_file}...")
-    with open(csv_file, mode='r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if User.query.filter_by(username=row['username']).first():
-                print(f"User {row['username']} already exists, skipping.")
-                continue
-            
-            user = User(
-                username=row['username'],
-                email=row['email'],
-                role=row['role'],
-                is_validated=row['is_validated'].lower() == 'true'
-            )
-            user.set_password(row['password'])
-            db.session.add(user)
+    rows = [{
+        'email': row['email'].strip(),
+        'username': row['username'].strip(),
+        'role': row['role'].strip(),
+        'is_validated': row['is_validated'].strip().lower() == 'true',
+        'password': row['password'].strip(),
+    } for row in _read(csv_file)]
+
+    known = set(db.session.execute(select(User.email)).scalars())
+    new_rows = [row for row in rows if row['email'] not in known]
+    # Only new accounts need a hash; hash them in parallel
+    for row, password_hash in zip(new_rows, hasher.hash_many(row['password'] for row in new_rows)):
+        row['password_hash'] = password_hash
+
+    inserted, updated, unchanged = upsert_rows(
+        User, rows, key_columns=('email',), update_columns=('username', 'role', 'is_validated'),
+        insert_only_columns=('password_hash',))
     db.session.commit()
-    print("✓ Users seeded.")
+    print(f"✓ Users: {len(inserted)} added, {len(updated)} updated, {unchanged} unchanged.")
 
 def seed_books(csv_file):
     print(f"Seeding books from {csv_file}...")
-    with open(csv_file, mode='r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if Book.query.filter_by(title=row['title']).first():
-                print(f"Book '{row['title']}' already exists, skipping.")
-                continue
-            
-            seller = User.query.filter_by(username=row['seller_username']).first()
-            if not seller:
-                print(f"Warning: Seller {row['seller_username']} not found for book {row['title']}. Skipping.")
-                continue
-                
-            book = Book(
-                title=row['title'],
-                author=row['author'],
-                description=row['description'],
-                price=float(row['price']),
-                stock=int(row['stock']),
-                image_url=row['image_url'] if row['image_url'] else None,
-                seller_id=seller.id
-            )
-            db.session.add(book)
+    sellers = dict(db.session.execute(select(User.username, User.id)).all())
+    rows, skipped = [], 0
+    for row in _read(csv_file):
+        seller_id = sellers.get(row['seller_username'])
+        if not seller_id:
+            skipped += 1
+            continue
+        rows.append({
+            'title': row['title'].strip(),
+            'author': row['author'].strip(),
+            'genre': row.get('genre') or None,
+            'description': row['description'],
+            'price': float(row['price']),
+            'stock': int(row['stock']),
+            'image_url': row['image_url'] or None,
+            'seller_id': seller_id,
+        })
+
+    inserted, updated, unchanged = upsert_rows(
+        Book, rows, key_columns=('title', 'author'),
+        update_columns=('genre', 'description', 'price', 'image_url', 'seller_id'),
+        insert_only_columns=('stock',))
     db.session.commit()
-    print("✓ Books seeded.")
+    if skipped:
+        print(f"Warning: {skipped} books skipped because their seller does not exist.")
+    print(f"✓ Books: {len(inserted)} added, {len(updated)} updated, {unchanged} unchanged.")
 
 def seed_orders(csv_file):
     print(f"Seeding orders from {csv_file}...")
-    with open(csv_file, mode='r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            buyer = User.query.filter_by(username=row['buyer_username']).first()
-            book = Book.query.filter_by(title=row['book_title']).first()
-            
-            if not buyer or not book:
-                print(f"Warning: Buyer or Book not found for order. Skipping.")
-                continue
-                
-            order = Order(
-                user_id=buyer.id,
-                book_id=book.id,
-                quantity=int(row['quantity']),
-                total_price=float(row['total_price']),
-                status=row['status'],
-                order_date=datetime.strptime(row['order_date'], '%Y-%m-%d %H:%M:%S')
-            )
-            db.session.add(order)
+    buyers = dict(db.session.execute(select(User.username, User.id)).all())
+    books = {}
+    for book_id, title, seller_id in db.session.execute(select(Book.id, Book.title, Book.seller_id)):
+        books.setdefault(title, (book_id, seller_id))
+    rows, skipped = [], 0
+    for row in _read(csv_file):
+        buyer_id, book = buyers.get(row['buyer_username']), books.get(row['book_title'])
+        if not buyer_id or not book:
+            skipped += 1
+            continue
+        rows.append({
+            'user_id': buyer_id,
+            'book_id': book[0],
+            'order_date': datetime.strptime(row['order_date'], '%Y-%m-%d %H:%M:%S'),
+            'quantity': int(row['quantity']),
+            'total_price': float(row['total_price']),
+            'status': row['status'],
+        })
+
+    inserted, updated, unchanged = upsert_rows(
+        Order, rows, key_columns=('user_id', 'book_id', 'order_date'),
+        update_columns=('quantity', 'total_price', 'status'))
+
+    # Bulk writes skip the ORM events, so adjust the sales rollups here in the same transaction
+    seller_of = {book_id: seller_id for book_id, seller_id in books.values()}
+    deltas = sales_rollups.new_deltas()
+    for row in inserted:
+        sales_rollups.add_contribution(deltas, row['order_date'], row['status'], row['total_price'],
+                                       row['quantity'], row['book_id'], seller_of.get(row['book_id']))
+    for row in updated:
+        old = row['_old']
+        new = {**old, **{column: value for column, value in row.items() if column in old}}
+        _, book_id, order_date = row['_key']
+        for values, sign in ((old, -1), (new, 1)):
+            sales_rollups.add_contribution(deltas, order_date, values['status'], values['total_price'],
+                                           values['quantity'], book_id, seller_of.get(book_id), sign)
+    sales_rollups.apply_deltas(db.session.connection(), deltas)
     db.session.commit()
-    print("✓ Orders seeded.")
+    if skipped:
+        print(f"Warning: {skipped} orders skipped because their buyer or book does not exist.")
+    print(f"✓ Orders: {len(inserted)} added, {len(updated)} updated, {unchanged} unchanged.")
 
-def run_seeder():
+def run_seeder(data_dir=None):
     app = create_app()
     with app.app_context():
-        base_path = r"d:\Projects Unknown\capstone_bookstore-Libraria-\data"
-        
+        upgrade_schema()  # creates missing tables and columns only
+        base_path = data_dir or os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+        started = time.perf_counter()
+
         seed_users(os.path.join(base_path, "users.csv"))
         seed_books(os.path.join(base_path, "books.csv"))
         seed_orders(os.path.join(base_path, "orders.csv"))
-        
-        print("\nAll data seeded successfully! 🚀")
+
+        print(f"\nAll data seeded successfully in {time.perf_counter() - started:.1f} s! 🚀")
 
 if __name__ == "__main__":
-    run_seeder()
+    run_seeder(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,96 @@
+import pytest
+from contextlib import contextmanager
+from moto import mock_aws
+
+@pytest.fixture
+def app(monkeypatch):
+    """Testing app on in-memory SQLite, with DynamoDB/SNS mocked (empty) by moto."""
+    monkeypatch.setenv("FLASK_ENV", "testing")
+    with mock_aws():
+        from app import create_app
+        app = create_app()
+        yield app
+
+def _logged_in(app, user_id, role, **session):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess.update(user_id=user_id, user_role=role, **session)
+    return client
+
+@pytest.fixture
+def client(app):
+    """Test client logged in as a buyer."""
+    from app.extensions import db
+    from app.models.user import User
+
+    with app.app_context():
+        user = User(username="reader", email="reader@example.com", role="buyer")
+        user.set_password("secret")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    return _logged_in(app, user_id, "buyer", username="reader", email="reader@example.com")
+
+@pytest.fixture
+def admin_id(app):
+    """Id of an admin user, root@example.com with password "secret"."""
+    from app.extensions import db
+    from app.models.user import User
+
+    with app.app_context():
+        admin = User(username="root", email="root@example.com", role="admin")
+        admin.set_password("secret")
+        db.session.add(admin)
+        db.session.commit()
+        return admin.id
+
+@pytest.fixture
+def admin_client(app, admin_id):
+    """Test client logged in as the admin."""
+    return _logged_in(app, admin_id, "admin", username="root")
+
+@pytest.fixture
+def add_books(app):
+    """Factory adding `count` books titled "Book 0".. (any other column as a keyword); returns their ids."""
+    from app.extensions import db
+    from app.models.book import Book
+
+    def add(count, stock=5, **fields):
+        with app.app_context():
+            books = [Book(**{'title': f"Book {i}", 'author': "Author", 'price': 10, 'stock': stock, **fields})
+                     for i in range(count)]
+            db.session.add_all(books)
+            db.session.commit()
+            return [book.id for book in books]
+
+    return add
+
+@pytest.fixture
+def query_budget(app):
+    """Context manager factory failing the test if more than `limit` SQL statements run.
+
+        with query_budget(5):
+            client.get('/admin/orders')
+    """
+    from sqlalchemy import event
+    from app.extensions import db
+
+    @contextmanager
+    def budget(limit):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+        assert len(statements) <= limit, (
+            f"{len(statements)} queries exceeded the budget of {limit}:\n" + "\n".join(statements))
+
+    return budget
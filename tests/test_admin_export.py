@@ -0,0 +1,68 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+from app.extensions import db
+from app.models.book import Book
+from app.models.order import Order
+
+def _add_orders(app):
+    with app.app_context():
+        book = Book(title="Exported", author="Author", price=12.5, stock=3)
+        db.session.add(book)
+        db.session.flush()
+        db.session.add_all([
+            Order(user_id=1, book_id=book.id, quantity=1, total_price=12.5, order_date=datetime(2024, 3, day))
+            for day in (1, 15, 31)
+        ])
+        db.session.commit()
+
+def test_orders_csv_with_date_range(app, admin_client):
+    client = admin_client
+    _add_orders(app)
+
+    response = client.get('/admin/export/orders?from=2024-03-10&to=2024-03-31')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert response.is_streamed
+
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [row['order_date'][:10] for row in rows] == ['2024-03-15', '2024-03-31']
+
+def test_users_ndjson_gzip_excludes_password_hash(app, admin_client):
+    client = admin_client
+
+    response = client.get('/admin/export/users?format=ndjson&gzip=1')
+    assert response.status_code == 200
+    assert response.headers['Content-Disposition'].endswith('bookbazaar-users.ndjson.gz"')
+
+    records = [json.loads(line) for line in gzip.decompress(response.data).decode().splitlines()]
+    assert records[0]['email'] == "root@example.com"
+    assert 'password_hash' not in records[0]
+
+def test_books_from_dynamodb_scan(app, admin_client, monkeypatch):
+    from app_aws import AWSApp, DynamoBookRepository
+    from tests.test_aws import _create_books_table
+    import app.services.export as export
+
+    aws = AWSApp()
+    _create_books_table(aws.dynamodb)
+    repo = DynamoBookRepository(aws_instance=aws)
+    for i in range(5):
+        repo.add({'id': str(i), 'title': f"Dynamo {i}", 'author': "A", 'price': 10.5, 'stock': 1})
+
+    scan_pages = export.scan_pages
+    monkeypatch.setattr(export, 'scan_pages', lambda table_name, page_size, filter_expression:
+                        scan_pages(table_name, 2, filter_expression, aws_instance=aws))
+    client = admin_client
+    response = client.get('/admin/export/books?source=dynamodb&format=ndjson')
+
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert sorted(record['title'] for record in records) == [f"Dynamo {i}" for i in range(5)]
+    assert records[0]['price'] == 10.5
+
+def test_rejects_unknown_kind_and_bad_dates(app, admin_client):
+    client = admin_client
+    assert client.get('/admin/export/passwords').status_code == 400
+    assert client.get('/admin/export/orders?from=03/01/2024').status_code == 400
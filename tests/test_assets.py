@@ -0,0 +1,49 @@
+import brotli
+import gzip
+import re
+
+def _asset_url(client):
+    page = client.get('/login').data.decode()
+    return re.search(r'href="(/static/css/style\.[0-9a-f]{12}\.css)"', page).group(1)
+
+def test_pages_link_fingerprinted_assets(app):
+    client = app.test_client()
+    url = _asset_url(client)
+    assert re.search(r'src="/static/js/main\.[0-9a-f]{12}\.js"', client.get('/login').data.decode())
+    with open(f"{app.static_folder}/css/style.css", 'rb') as handle:
+        original = handle.read()
+
+    response = client.get(url, headers={'Accept-Encoding': 'gzip, deflate, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert response.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert response.mimetype == 'text/css'
+    assert brotli.decompress(response.data) == original
+
+    response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip' and gzip.decompress(response.data) == original
+
+    response = client.get(url)
+    assert 'Content-Encoding' not in response.headers and response.data == original
+    assert client.get(url, headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+def test_unfingerprinted_names_still_served(app):
+    response = app.test_client().get('/static/css/style.css')
+    assert response.status_code == 200 and 'immutable' not in response.headers.get('Cache-Control', '')
+
+def test_concurrent_builds_do_not_collide(app, tmp_path):
+    import os
+    from concurrent.futures import ThreadPoolExecutor
+    from app.services.assets import AssetPipeline
+    pipelines = []
+    for _ in range(4):  # one per worker booting at the same time
+        pipeline = AssetPipeline()
+        pipeline.build_dir, pipeline.static_folder = str(tmp_path), app.static_folder
+        pipelines.append(pipeline)
+
+    with ThreadPoolExecutor(4) as pool:
+        manifests = list(pool.map(lambda pipeline: pipeline.build(), pipelines))
+
+    assert all(manifest == manifests[0] for manifest in manifests)
+    leftovers = [name for _, _, files in os.walk(tmp_path) for name in files if name.endswith('.tmp')]
+    assert leftovers == []
@@ -0,0 +1,44 @@
+from app.extensions import db
+from app.models.book import Book
+from app.models.order import Order
+
+def test_view_cart_loads_all_books(app, client, add_books):
+    book_ids = add_books(3)
+    with client.session_transaction() as sess:
+        sess['cart'] = {str(book_id): 2 for book_id in book_ids}
+
+    response = client.get('/cart')
+    assert response.status_code == 200
+    for i in range(3):
+        assert f"Book {i}".encode() in response.data
+
+def test_checkout_commits_orders_and_notifies_concurrently(app, client, add_books, mocker):
+    from app.routes import bookstore
+    send = mocker.patch.object(bookstore.notifier, 'send_async')
+    sync = mocker.patch.object(bookstore.order_repo, 'sync_to_dynamo_async')
+
+    book_ids = add_books(2, stock=3)
+    with client.session_transaction() as sess:
+        sess['cart'] = {str(book_ids[0]): 2, str(book_ids[1]): 1}
+
+    response = client.post('/checkout')
+    assert response.status_code == 302
+    assert '/dashboard' in response.headers['Location']
+
+    with app.app_context():
+        assert Order.query.count() == 2
+        assert db.session.get(Book, book_ids[0]).stock == 1
+        assert db.session.get(Book, book_ids[1]).stock == 2
+    sync.assert_awaited_once()
+    send.assert_awaited_once()
+    assert len(sync.await_args.args[0]) == 2
+
+def test_checkout_rejects_insufficient_stock_without_partial_orders(app, client, add_books):
+    book_ids = add_books(2, stock=1)
+    with client.session_transaction() as sess:
+        sess['cart'] = {str(book_ids[0]): 1, str(book_ids[1]): 5}
+
+    client.post('/checkout')
+    with app.app_context():
+        assert Order.query.count() == 0
+        assert db.session.get(Book, book_ids[0]).stock == 1
@@ -159,3 +159,53 @@ def test_sns_notifier_send(sns_mock, mocker):
     assert kwargs['TopicArn'] == topic_arn
     assert kwargs['Message'] == "Your order is ready"
     assert kwargs['MessageAttributes']['email']['StringValue'] == "test@example.com"
+
+
+def _create_books_table(dynamodb):
+    from app_aws import BOOK_INDEXES, BOOK_INDEX_ATTRIBUTES
+    dynamodb.create_table(
+        TableName='BookBazaarBooks',
+        KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}] + BOOK_INDEX_ATTRIBUTES,
+        GlobalSecondaryIndexes=BOOK_INDEXES,
+        ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+    )
+
+def test_sharded_listing_pagination(dynamodb_mock):
+    """Listing pages scatter-gather across shards and visit every book exactly once."""
+    from app_aws import AWSApp, listing_shard
+    _create_books_table(dynamodb_mock)
+    repo = DynamoBookRepository(aws_instance=AWSApp())
+    for i in range(1, 24):
+        repo.add({'id': f"{i:03d}", 'title': f"Book {i}", 'author': 'A', 'price': 100})
+
+    assert len({listing_shard(f"{i:03d}") for i in range(1, 24)}) > 1
+
+    seen, last_key = [], None
+    while True:
+        page = repo.get_paginated(limit=5, last_key=last_key)
+        assert len(page['Items']) <= 5
+        seen.extend(item['id'] for item in page['Items'])
+        last_key = page['LastEvaluatedKey']
+        if not last_key:
+            break
+
+    assert seen == [f"{i:03d}" for i in range(1, 24)]
+
+def test_browse_indexes(dynamodb_mock):
+    """Author, genre and price bucket filters are served by index queries."""
+    from app_aws import AWSApp
+    _create_books_table(dynamodb_mock)
+    repo = DynamoBookRepository(aws_instance=AWSApp())
+    repo.add({'id': '1', 'title': '1984', 'author': 'George Orwell', 'genre': 'Classics', 'price': 400})
+    repo.add({'id': '2', 'title': 'Animal Farm', 'author': 'George Orwell', 'genre': 'Classics', 'price': 199})
+    repo.add({'id': '3', 'title': 'Atomic Habits', 'author': 'James Clear', 'genre': 'Self-Help', 'price': 600})
+
+    by_author = repo.browse('author', 'george  ORWELL')['Items']
+    assert {item['id'] for item in by_author} == {'1', '2'}
+
+    by_genre = repo.browse('genre', 'self-help')['Items']
+    assert [item['title'] for item in by_genre] == ['Atomic Habits']
+
+    by_price = repo.browse('price', '250-500')['Items']
+    assert [item['id'] for item in by_price] == ['1']
@@ -0,0 +1,79 @@
+import io
+from app.extensions import db
+from app.models.book import Book
+
+def test_bulk_api_applies_set_and_add_in_batched_statements(app, admin_client, add_books, query_budget,
+                                                            mocker):
+    from app.services.render_cache import catalog_cache
+    client = admin_client
+    book_ids = add_books(1200)
+    invalidate = mocker.spy(catalog_cache, 'invalidate')
+
+    updates = [{'book_id': book_id, 'action': 'add', 'amount': 3} for book_id in book_ids]
+    updates += [{'book_id': book_ids[0], 'action': 'set', 'amount': 50},
+                {'book_id': book_ids[0], 'action': 'add', 'amount': -10},
+                {'book_id': book_ids[1], 'action': 'add', 'amount': -100},
+                {'book_id': 999999, 'amount': 1},
+                {'book_id': 'abc', 'amount': 1}]
+    with query_budget(12):
+        response = client.post('/admin/inventory/bulk', json={'updates': updates})
+
+    assert response.status_code == 200
+    data = response.get_json()
+    statuses = [row['status'] for row in data['results']]
+    # Both rows for book_ids[1] are rejected with it, plus the malformed row
+    assert statuses.count('not_found') == 1 and statuses.count('invalid') == 3
+    assert invalidate.call_count == 1
+    with app.app_context():
+        assert db.session.get(Book, book_ids[0]).stock == 40
+        assert db.session.get(Book, book_ids[1]).stock == 5   # would have gone negative
+        assert db.session.get(Book, book_ids[-1]).stock == 8
+
+def test_csv_upload_reports_each_row(app, admin_client, add_books):
+    client = admin_client
+    book_ids = add_books(2)
+    csv_body = f"book_id,action,amount\n{book_ids[0]},set,7\n{book_ids[1]},add,2\n{book_ids[1]},bogus,1\n"
+
+    response = client.post('/admin/inventory/upload',
+                           data={'file': (io.BytesIO(csv_body.encode()), 'restock.csv')},
+                           content_type='multipart/form-data')
+
+    assert response.status_code == 200
+    assert b"2 of 3 rows applied" in response.data
+    assert b"action must be" in response.data
+    with app.app_context():
+        assert [db.session.get(Book, book_id).stock for book_id in book_ids] == [7, 7]
+
+def test_dynamodb_fan_out_skips_sql_only_books():
+    from moto import mock_aws
+    from app_aws import AWSApp, DynamoBookRepository
+    from tests.test_aws import _create_books_table
+    with mock_aws():
+        aws = AWSApp()
+        _create_books_table(aws.dynamodb)
+        repo = DynamoBookRepository(aws_instance=aws)
+        repo.add({'id': '1', 'title': "In Dynamo", 'author': "A", 'price': 10, 'stock': 4})
+
+        outcome = repo.update_stock_many({1: ('add', 3), 2: ('set', 9)})
+
+        assert outcome == {1: 'synced', 2: 'skipped'}
+        assert repo.get_by_id('1')['stock'] == 7
+
+def test_removal_racing_a_checkout_is_reported_invalid(app, add_books, mocker):
+    from sqlalchemy import update
+    from app.repositories.book_repo import BookRepository
+    from app.services.stock_shards import sharded_stock
+    book_ids = add_books(3)
+
+    def checkout_after_read(batch):
+        # A checkout sells 4 copies of the first book right after the stock was read
+        db.session.execute(update(Book).where(Book.id == book_ids[0]).values(stock=1))
+        return {}
+
+    with app.app_context():
+        mocker.patch.object(sharded_stock, 'totals', side_effect=checkout_after_read)
+        results = BookRepository().bulk_update_stock([(book_id, 'add', -3) for book_id in book_ids])
+
+        assert [results[book_id]['status'] for book_id in book_ids] == ['invalid', 'updated', 'updated']
+        assert results[book_ids[0]]['stock'] == 1
+        assert [db.session.get(Book, book_id).stock for book_id in book_ids] == [1, 2, 2]
@@ -0,0 +1,63 @@
+from app.extensions import db
+from app.models.book import Book
+from app.services.render_cache import catalog_cache
+
+def _add_book(app, **fields):
+    with app.app_context():
+        book = Book(**{'author': 'Author', 'price': 100, 'stock': 5, **fields})
+        db.session.add(book)
+        db.session.commit()
+        return book.id
+
+def test_books_grid_is_cached_and_revalidated(app, client):
+    _add_book(app, title='Cached Title')
+    catalog_cache.invalidate()
+
+    first = client.get('/books')
+    assert first.status_code == 200
+    assert b'Cached Title' in first.data
+    etag = first.headers['ETag']
+
+    hits = catalog_cache.hits
+    second = client.get('/books', headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert catalog_cache.hits == hits + 1
+
+def test_book_write_invalidates_grid(app, client):
+    book_id = _add_book(app, title='Old Stock')
+    first = client.get('/books')
+    etag = first.headers['ETag']
+
+    with app.app_context():
+        db.session.get(Book, book_id).stock = 0
+        db.session.commit()
+
+    second = client.get('/books', headers={'If-None-Match': etag})
+    assert second.status_code == 200
+    assert b'Out of Stock' in second.data
+
+def test_grid_is_invalidated_on_commit_not_flush(app):
+    book_id = _add_book(app, title='Flushed')
+    with app.app_context():
+        generation = catalog_cache.generation
+        book = db.session.get(Book, book_id)
+        book.stock = 0
+        db.session.flush()
+        assert catalog_cache.generation == generation  # a render now would still see the old rows
+        db.session.rollback()
+        assert catalog_cache.generation == generation
+
+        book.stock = 1
+        db.session.commit()
+        assert catalog_cache.generation == generation + 1
+
+def test_etag_varies_per_user_cart(app, client):
+    _add_book(app, title='Cart Title')
+    etag = client.get('/books').headers['ETag']
+
+    with client.session_transaction() as sess:
+        sess['cart'] = {'1': 2}
+
+    response = client.get('/books', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
@@ -0,0 +1,48 @@
+import gzip
+import brotli
+from datetime import datetime
+from app.extensions import db
+from app.models.order import Order
+
+def _add_orders(app, user_id, count):
+    with app.app_context():
+        db.session.execute(Order.__table__.insert(), [
+            {'user_id': user_id, 'book_id': 1, 'quantity': 1, 'total_price': 10.0, 'status': 'Placed',
+             'order_date': datetime(2024, 1, 1)} for _ in range(count)])
+        db.session.commit()
+
+def test_pages_are_compressed_by_negotiation(client):
+    plain = client.get('/books')
+    assert 'Content-Encoding' not in plain.headers and 'Accept-Encoding' in plain.headers['Vary']
+
+    br = client.get('/books', headers={'Accept-Encoding': 'gzip, br'})
+    assert br.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(br.data) == plain.data
+    assert br.headers['ETag'].startswith('W/')
+    assert client.get('/books', headers={'Accept-Encoding': 'gzip, br',
+                                         'If-None-Match': br.headers['ETag']}).status_code == 304
+
+    gz = client.get('/books', headers={'Accept-Encoding': 'gzip'})
+    assert gz.headers['Content-Encoding'] == 'gzip' and gzip.decompress(gz.data) == plain.data
+
+def test_small_responses_are_not_compressed(admin_client):
+    client = admin_client
+    response = client.get('/admin/db-pool', headers={'Accept-Encoding': 'gzip'})
+    assert len(response.data) < 1024 and 'Content-Encoding' not in response.headers
+
+def test_admin_orders_stream_compressed(app, admin_client, admin_id):
+    client = admin_client
+    _add_orders(app, admin_id, 300)
+    with client.session_transaction() as sess:
+        sess['_flashes'] = [('success', "Queued message")]
+
+    response = client.get('/admin/orders', headers={'Accept-Encoding': 'gzip'}, buffered=False)
+    assert response.is_streamed and response.headers['Content-Encoding'] == 'gzip'
+    chunks = list(response.response)
+    assert len(chunks) > 2
+    html = gzip.decompress(b''.join(chunks)).decode()
+    response.close()
+    assert html.count('class="order-id"') == 300 and "Queued message" in html
+
+    # The flash was consumed even though the page rendered after the cookie was sent
+    assert "Queued message" not in client.get('/admin/orders').get_data(as_text=True)
@@ -0,0 +1,46 @@
+import pytest
+from moto import mock_aws
+from sqlalchemy import create_engine
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    """App on a file database with a queue pool and a separate 'replica' database."""
+    from config import TestingConfig
+    from app.extensions import db
+    from app.models.book import Book
+    from app.models.order import Order  # noqa: F401 (registers tables for create_all)
+    from app.models.user import User  # noqa: F401
+
+    replica_uri = f"sqlite:///{tmp_path / 'replica.db'}"
+    replica = create_engine(replica_uri)
+    db.metadata.create_all(replica)
+    with replica.begin() as conn:
+        conn.execute(Book.__table__.insert(), [{'title': "Replica Only", 'author': "R", 'price': 1.0, 'stock': 1}])
+    replica.dispose()
+
+    monkeypatch.setenv("FLASK_ENV", "testing")
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'primary.db'}")
+    pool_options = {'pool_size': 2, 'max_overflow': 1, 'pool_pre_ping': True}
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_ENGINE_OPTIONS', pool_options)
+    monkeypatch.setattr(TestingConfig, 'DB_REPLICA_ENGINE', {'url': replica_uri, **pool_options})
+    with mock_aws():
+        from app import create_app
+        yield create_app()
+
+def test_listing_fallback_reads_from_replica(app):
+    from app.repositories.book_repo import BookRepository
+    with app.test_request_context('/books'):
+        pagination = BookRepository()._browse_sql({}, 1, 10)
+        assert [book.title for book in pagination.items] == ["Replica Only"]
+
+def test_pool_stats_report_checkouts_and_waits(admin_client):
+    client = admin_client
+    assert client.get('/admin/dashboard').status_code == 200
+
+    stats = client.get('/admin/db-pool').get_json()
+    primary = stats['primary']
+    assert primary['pool'] == 'MeteredQueuePool'
+    assert primary['checkouts'] > 0
+    assert primary['checked_out'] <= primary['size'] + 1
+    assert 'wait_avg_ms' in primary and 'overflow' in primary
+    assert stats['replica']['checkouts'] > 0  # dashboard reports ran on the replica
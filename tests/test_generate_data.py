@@ -0,0 +1,71 @@
+import csv
+from collections import Counter
+from moto import mock_aws
+from app.extensions import db
+from app.models.book import Book
+from app.models.order import Order
+from app.models.user import User
+from app.services import sales_rollups
+import generate_data
+from generate_data import CatalogSpec
+
+def _spec(**overrides):
+    counts = dict(books=300, users=120, orders=4000, seed=7, chunk_size=500)
+    counts.update(overrides)
+    return CatalogSpec(**counts)
+
+def test_csv_output_is_identical_for_any_worker_count(tmp_path):
+    for workers in (1, 3):
+        generate_data.write_csv(_spec(), str(tmp_path / str(workers)), "hash", workers=workers, report=lambda m: None)
+    for name in ('users.csv', 'books.csv', 'orders.csv'):
+        assert (tmp_path / '1' / name).read_bytes() == (tmp_path / '3' / name).read_bytes()
+    with open(tmp_path / '1' / 'orders.csv', newline='') as handle:
+        rows = list(csv.DictReader(handle))
+    assert len(rows) == 4000 and [int(row['id']) for row in rows] == list(range(1, 4001))
+
+def test_columns_are_the_export_columns_plus_loadable_extras():
+    from app.services.export import EXPORTS
+    extras = {'users': ['password_hash'], 'books': ['description'], 'orders': []}
+    for kind, columns in generate_data.COLUMNS.items():
+        assert [column for column in columns if column not in extras[kind]] == EXPORTS[kind][1]
+
+def test_distributions_are_skewed_and_seasonal():
+    spec = _spec(books=1000, users=1000, orders=20000, chunk_size=5000)
+    orders = [row for start, stop in spec.chunks(spec.orders) for row in generate_data.order_rows(spec, start, stop)]
+    per_book = Counter(row[2] for row in orders)
+    top_share = sum(count for _, count in per_book.most_common(10)) / len(orders)
+    assert top_share > 0.25  # 1% of titles, a Zipf head
+    months = Counter(row[6].month for row in orders)
+    assert months[12] > 1.8 * months[7]
+    assert all(row[4] == round(spec.book_price(row[2]) * row[3], 2) for row in orders[:100])
+
+    books = [row for start, stop in spec.chunks(spec.books) for row in generate_data.book_rows(spec, start, stop)]
+    per_seller = Counter(row[7] for row in books).most_common()
+    assert per_seller[0][1] > 3 * per_seller[-1][1]
+
+def test_sql_target_loads_tables_and_rollups(app):
+    spec = _spec()
+    with app.app_context():
+        generate_data.write_sql(spec, "hash", workers=2, report=lambda m: None)
+        assert (User.query.count(), Book.query.count(), Order.query.count()) == (120, 300, 4000)
+        assert User.query.filter_by(role='seller').count() == spec.sellers
+        placed = db.session.query(db.func.sum(Order.total_price)).filter(Order.status != 'Cancelled').scalar()
+        assert abs(sales_rollups.totals()[0] - placed) < 0.01
+
+def test_dynamodb_target_writes_repository_shaped_items():
+    from app_aws import AWSApp, DYNAMODB_ORDERS_TABLE, DYNAMODB_USERS_TABLE
+    from tests.test_aws import _create_books_table
+    with mock_aws():
+        aws = AWSApp()
+        _create_books_table(aws.dynamodb)
+        for name in (DYNAMODB_USERS_TABLE, DYNAMODB_ORDERS_TABLE):
+            aws.dynamodb.create_table(TableName=name, KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+                                      AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
+                                      BillingMode='PAY_PER_REQUEST')
+        generate_data.write_dynamodb(_spec(books=40, users=20, orders=150), "hash", workers=1,
+                                     aws_instance=aws, report=lambda m: None)
+        books = aws.dynamodb.Table('BookBazaarBooks').scan()['Items']
+        orders = aws.dynamodb.Table(DYNAMODB_ORDERS_TABLE).scan()['Items']
+        assert len(books) == 40 and len(orders) == 150
+        assert books[0]['type'].startswith('book#shard') and isinstance(books[0]['id'], str)
+        assert all(isinstance(order['order_date'], str) for order in orders)
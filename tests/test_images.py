@@ -0,0 +1,107 @@
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from moto import mock_aws
+from PIL import Image
+from app.extensions import db
+from app.models.book import Book
+from app.services.images import ImageCache, source_version
+from config import TestingConfig
+
+def _jpeg(width=1200, height=1800):
+    output = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 40, 40)).save(output, format='JPEG')
+    return output.getvalue()
+
+@pytest.fixture
+def image_source():
+    """Local stand-in for a remote cover host; counts requests per path."""
+    hits = {}
+    body = _jpeg()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits[self.path] = hits.get(self.path, 0) + 1
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/jpeg')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", hits
+    server.shutdown()
+
+@pytest.fixture
+def proxy_app(monkeypatch, tmp_path):
+    """App whose image proxy may fetch from localhost, caching into tmp_path."""
+    monkeypatch.setenv("FLASK_ENV", "testing")
+    monkeypatch.setattr(TestingConfig, 'IMAGE_ALLOW_PRIVATE_SOURCES', True)
+    monkeypatch.setattr(TestingConfig, 'IMAGE_CACHE_DIR', str(tmp_path))
+    with mock_aws():
+        from app import create_app
+        yield create_app()
+
+def _book(app, image_url):
+    with app.app_context():
+        book = Book(title="Cover", author="A", price=5, stock=1, image_url=image_url)
+        db.session.add(book)
+        db.session.commit()
+        return book.id
+
+def test_thumbnails_are_resized_cached_and_immutable(proxy_app, image_source):
+    app, (base_url, hits) = proxy_app, image_source
+    image_url = f"{base_url}/cover.jpg"
+    book_id = _book(app, image_url)
+    client = app.test_client()
+    link = f"/img/{book_id}?w=300&v={source_version(image_url)}"
+
+    response = client.get(link, headers={'Accept': 'image/avif,image/webp,*/*'})
+    assert response.status_code == 200 and response.mimetype == 'image/webp'
+    assert response.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+    assert 'Accept' in response.headers['Vary']
+    assert Image.open(io.BytesIO(response.data)).size == (320, 480)
+
+    jpeg = client.get(link, headers={'Accept': 'image/*'})
+    assert jpeg.mimetype == 'image/jpeg'
+    assert client.get(link, headers={'Accept': 'image/*', 'If-None-Match': jpeg.headers['ETag']}).status_code == 304
+    assert hits == {'/cover.jpg': 2}  # one fetch per format, none for the cached repeats
+
+    # A stale ?v= still works but is not cached for long
+    assert client.get(f"/img/{book_id}?w=300&v=old").headers['Cache-Control'] == 'public, max-age=300'
+
+def test_grid_uses_srcset_and_private_sources_are_refused(app, client, image_source):
+    base_url, hits = image_source
+    book_id = _book(app, f"{base_url}/inside.jpg")
+    page = client.get('/books').data.decode()
+    assert f'/img/{book_id}?w=160' in page and 'srcset=' in page and ' 640w' in page
+    assert client.get(f"/img/{book_id}").status_code == 404
+    assert hits == {}
+
+def test_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    source = _jpeg(800, 800)
+    cache = ImageCache()
+    cache.directory, cache.max_bytes = str(tmp_path), 1
+    (tmp_path / 'url').mkdir()
+    monkeypatch.setattr(cache, '_load', lambda image_url: source if image_url == 'a' else _jpeg(700, 700))
+    first = cache.thumbnail('a', 160, 'jpeg')
+    second = cache.thumbnail('b', 160, 'jpeg')
+    assert not (tmp_path / first.split('/')[-1]).exists()
+    assert (tmp_path / second.split('/')[-1]).exists()
+    assert cache.stats()['files'] == 1
+
+def test_build_locks_do_not_grow_with_the_cache(tmp_path, monkeypatch):
+    from app.services.images import KEY_LOCK_STRIPES
+    cache = ImageCache()
+    cache.directory = str(tmp_path)
+    (tmp_path / 'url').mkdir()
+    source = _jpeg(200, 200)
+    monkeypatch.setattr(cache, '_load', lambda image_url: source)
+    for n in range(100):
+        cache.thumbnail(f"https://covers.example.com/{n}.jpg", 160, 'jpeg')
+    assert len(cache._key_locks) == KEY_LOCK_STRIPES
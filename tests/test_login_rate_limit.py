@@ -0,0 +1,118 @@
+import time
+from app.services.rate_limit import MemoryBucketStore, login_limiter
+
+def _register(app, email="member@example.com", password="secret"):
+    from app.extensions import db
+    from app.models.user import User
+    with app.app_context():
+        user = User(username="member", email=email)
+        user.set_password(password)
+        db.session.add(user)
+        db.session.commit()
+
+def _login(client, email, password, ip='10.0.0.1'):
+    return client.post('/login', data={'email': email, 'password': password},
+                       environ_base={'REMOTE_ADDR': ip})
+
+def test_token_bucket_refills():
+    store = MemoryBucketStore()
+    assert store.take('k', capacity=2, refill_per_sec=0)
+    assert store.take('k', capacity=2, refill_per_sec=0)
+    assert not store.take('k', capacity=2, refill_per_sec=0)
+    assert store.take('fast', capacity=1, refill_per_sec=50)
+    assert not store.take('fast', capacity=1, refill_per_sec=50)
+    time.sleep(0.05)
+    assert store.take('fast', capacity=1, refill_per_sec=50)
+
+def test_ip_is_throttled_before_repository(app, mocker):
+    from app.services import auth_service
+    lookup = mocker.spy(auth_service.repo, 'get_by_email')
+    client = app.test_client()
+
+    statuses = [_login(client, f"nobody{i}@example.com", 'x').status_code
+                for i in range(login_limiter.ip_burst + 5)]
+
+    assert statuses.count(429) == 5
+    assert lookup.call_count == login_limiter.ip_burst
+
+def test_unknown_email_is_cached_until_registered(app, mocker):
+    from app.services import auth_service
+    lookup = mocker.spy(auth_service.repo, 'get_by_email')
+    client = app.test_client()
+
+    for email in ("ghost@example.com", " Ghost@Example.com", "ghost@example.com"):
+        assert _login(client, email, 'secret').status_code == 200
+    assert lookup.call_count == 1
+
+    client.post('/register', data={'username': "ghost", 'email': "ghost@example.com", 'password': 'secret'})
+    assert _login(client, "ghost@example.com", 'secret').status_code == 302
+
+def _rate_limit_table(aws):
+    from app_aws import DYNAMODB_RATE_LIMITS_TABLE
+    aws.dynamodb.create_table(
+        TableName=DYNAMODB_RATE_LIMITS_TABLE,
+        KeySchema=[{'AttributeName': 'key', 'KeyType': 'HASH'}],
+        AttributeDefinitions=[{'AttributeName': 'key', 'AttributeType': 'S'}],
+        BillingMode='PAY_PER_REQUEST')
+
+def test_dynamodb_markers_are_shared_and_expire():
+    from moto import mock_aws
+    from app_aws import AWSApp, DynamoRateLimitRepository
+    with mock_aws():
+        aws = AWSApp()
+        _rate_limit_table(aws)
+        worker_a, worker_b = DynamoRateLimitRepository(aws), DynamoRateLimitRepository(aws)
+        worker_a.add_marker('unknown:ghost@example.com', ttl=60)
+        worker_a.add_marker('unknown:old@example.com', ttl=-1)
+        assert worker_b.has_marker('unknown:ghost@example.com')
+        assert not worker_b.has_marker('unknown:old@example.com')
+        worker_b.remove_marker('unknown:ghost@example.com')
+        assert not worker_a.has_marker('unknown:ghost@example.com')
+
+def test_dynamodb_buckets_refuse_when_contended_and_follow_fail_open(mocker):
+    from botocore.exceptions import ClientError, EndpointConnectionError
+    from app_aws import DynamoRateLimitRepository
+    table = mocker.Mock()
+    table.get_item.return_value = {}
+    table.put_item.side_effect = ClientError({'Error': {'Code': 'ConditionalCheckFailedException',
+                                                        'Message': 'conflict'}}, 'PutItem')
+    store = DynamoRateLimitRepository(aws_instance=mocker.Mock(), fail_open=True)
+    store.table = table
+    assert not store.take('ip:203.0.113.9', 20, 1)
+
+    table.get_item.side_effect = EndpointConnectionError(endpoint_url='https://dynamodb')
+    assert store.take('ip:203.0.113.9', 20, 1)
+    store.fail_open = False
+    assert not store.take('ip:203.0.113.9', 20, 1)
+
+def test_ip_buckets_use_forwarded_client_ip(monkeypatch):
+    import config
+    from moto import mock_aws
+    monkeypatch.setenv("FLASK_ENV", "testing")
+    monkeypatch.setattr(config.TestingConfig, 'TRUSTED_PROXY_HOPS', 1, raising=False)
+    seen = []
+    monkeypatch.setattr(login_limiter, 'allow_attempt', lambda ip, email: seen.append(ip) or True)
+    with mock_aws():
+        from app import create_app
+        client = create_app().test_client()
+        client.post('/login', data={'email': 'a@example.com', 'password': 'x'},
+                    environ_base={'REMOTE_ADDR': '10.0.0.2'}, headers={'X-Forwarded-For': '198.51.100.7'})
+    assert seen == ['198.51.100.7']
+
+def test_email_lockout_only_counts_failures(app):
+    _register(app)
+    client = app.test_client()
+
+    for i in range(login_limiter.email_burst):
+        assert _login(client, "member@example.com", 'wrong', ip=f"10.0.1.{i}").status_code == 200
+    # Budget spent by failures from many IPs: the account is throttled for a while
+    assert _login(client, "member@example.com", 'secret', ip='10.0.2.1').status_code == 429
+
+def test_legitimate_login_unaffected_by_other_ips(app):
+    _register(app)
+    client = app.test_client()
+    for i in range(login_limiter.ip_burst + 5):
+        _login(client, f"bot{i}@example.com", 'x', ip='203.0.113.9')
+
+    response = _login(client, "member@example.com", 'secret', ip='10.0.3.1')
+    assert response.status_code == 302
@@ -0,0 +1,121 @@
+from app.services.notification import NotificationService
+from app.services.notification_transports import Transport
+
+class RecordingNotifier(Transport):
+    def __init__(self):
+        self.batches = []
+
+    def send_batch(self, messages):
+        self.batches.append(list(messages))
+        return len(messages)
+
+def _service(coalesce_seconds):
+    service = NotificationService(coalesce_seconds=coalesce_seconds)
+    service.notifier = RecordingNotifier()
+    return service
+
+def test_messages_within_the_window_become_one_digest():
+    service = _service(coalesce_seconds=60)
+    service.send("a@example.com", "Order placed for: Dune")
+    service.send("a@example.com", "Order #7 has been cancelled.")
+    service.send("b@example.com", "Order placed for: Emma")
+    assert service.notifier.batches == []  # still inside the window
+    assert service.flush(everything=False) == 0
+
+    assert service.flush() == 2
+    digests = dict(service.notifier.batches[0])
+    assert digests["a@example.com"].startswith("2 updates")
+    assert "Order #7 has been cancelled." in digests["a@example.com"]
+    assert digests["b@example.com"] == "Order placed for: Emma"
+    stats = service.stats()
+    assert (stats['enqueued'], stats['published'], stats['publish_calls'], stats['saved']) == (3, 2, 1, 1)
+
+def test_bulk_messages_are_published_ten_per_call():
+    service = _service(coalesce_seconds=0)
+    service.send_many([(f"c{n % 25}@example.com", f"Order #{n} has been shipped.") for n in range(100)])
+    assert [len(batch) for batch in service.notifier.batches] == [10, 10, 5]
+    assert service.stats()['published'] == 25
+
+def test_refused_digests_count_every_merged_message_as_failed():
+    class Refusing(Transport):
+        def send_batch(self, messages):
+            return 1  # only the first digest of each batch gets through
+
+    service = NotificationService(coalesce_seconds=60)
+    service.notifier = Refusing()
+    service.send_many([("a@example.com", "One"), ("b@example.com", "Two"), ("b@example.com", "Three"),
+                       ("b@example.com", "Four")])
+    service.flush()
+    stats = service.stats()
+    assert (stats['published'], stats['failed'], stats['saved']) == (1, 3, 0)
+
+def test_sns_publish_batch(monkeypatch):
+    import boto3
+    from moto import mock_aws
+    from app_aws import SNSNotifier
+    with mock_aws():
+        sns = boto3.client('sns', region_name='us-east-1')
+        topic_arn = sns.create_topic(Name='orders')['TopicArn']
+        notifier = SNSNotifier(aws_instance=type('AWS', (), {'sns': sns})())
+        notifier.topic_arn = topic_arn
+        assert notifier.send_batch([(f"c{n}@example.com", "Shipped") for n in range(10)]) == 10
+
+def test_file_transport_rotates_ndjson(tmp_path):
+    import json
+    from app.services.notification_transports import make_transport
+    path = tmp_path / "notifications.ndjson"
+    transport = make_transport('file', {'NOTIFY_FILE_PATH': str(path), 'NOTIFY_FILE_MAX_MB': 0.001,
+                                        'NOTIFY_FILE_BACKUPS': 2})
+    service = NotificationService(batch_size=100)
+    service.notifier = transport
+    for chunk in range(10):
+        service.send_many([(f"c{n}@example.com", f"Order #{chunk * 20 + n} has been shipped.") for n in range(20)])
+    service.close()
+    assert transport.stats()['rotations'] >= 3
+    files = sorted(tmp_path.iterdir())
+    assert [file.name for file in files] == ["notifications.ndjson", "notifications.ndjson.1", "notifications.ndjson.2"]
+    assert json.loads(files[1].read_text().splitlines()[0])['email'].endswith("@example.com")
+
+def test_file_transport_opens_one_file_per_process_on_first_send(tmp_path):
+    import os
+    import pytest
+    from app.services.notification_transports import make_transport
+    transport = make_transport('file', {'NOTIFY_FILE_PATH': str(tmp_path / "notifications.{pid}.ndjson")})
+    assert list(tmp_path.iterdir()) == []  # nothing opened while the app is built (e.g. in a preloading master)
+
+    pid = os.fork()
+    if pid == 0:  # a forked worker writes its own file
+        transport.send("child@example.com", "Hello")
+        transport.close()
+        os._exit(0)
+    os.waitpid(pid, 0)
+    transport.send("parent@example.com", "Hello")
+    transport.close()
+
+    files = {file.name: file.read_text() for file in tmp_path.iterdir()}
+    assert set(files) == {f"notifications.{pid}.ndjson", f"notifications.{os.getpid()}.ndjson"}
+    assert "child@example.com" in files[f"notifications.{pid}.ndjson"]
+    assert "parent@example.com" in files[f"notifications.{os.getpid()}.ndjson"]
+    with pytest.raises(TypeError):
+        Transport()  # send_batch is abstract
+
+def test_queue_transport_bounds_memory_and_drops_when_full():
+    import threading
+    from app.services.notification_transports import QueueTransport
+    release = threading.Event()
+    delivered = []
+
+    def slow_consumer(batch):
+        release.wait()
+        delivered.extend(batch)
+        return len(batch)
+
+    transport = QueueTransport(consumer=slow_consumer, max_batches=2, block_seconds=0.2)
+    service = NotificationService(batch_size=5)
+    service.notifier = transport
+    service.send_many([(f"c{n}@example.com", "Shipped") for n in range(25)])  # five batches, room for 2 (+1 in hand)
+    release.set()
+    transport.drain()
+    stats = service.stats()
+    assert stats['published'] == len(delivered) == 15
+    assert stats['failed'] == stats['transport']['dropped'] == 10
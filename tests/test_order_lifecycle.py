@@ -0,0 +1,139 @@
+import pytest
+from datetime import datetime
+from moto import mock_aws
+from app.extensions import db
+from app.models.book import Book
+from app.models.order import Order
+from app.models.order_history import OrderStatusChange
+from app.models.rollup import SalesRollup
+from app.models.user import User
+from app.services import sales_rollups
+from app.services.order_lifecycle import InvalidTransition, order_jobs, transition
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    """Testing app on a SQLite file, so the job thread and the test see the same committed data."""
+    from config import TestingConfig
+    monkeypatch.setenv("FLASK_ENV", "testing")
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'orders.db'}")
+    with mock_aws():
+        from app import create_app
+        yield create_app()
+
+def _orders(app, count, buyers=3):
+    with app.app_context():
+        seller = User(username="shop", email="shop@example.com", role="seller", password_hash="x", is_validated=True)
+        customers = [User(username=f"c{n}", email=f"c{n}@example.com", role="buyer", password_hash="x")
+                     for n in range(buyers)]
+        db.session.add_all([seller, *customers])
+        db.session.flush()
+        book = Book(title="Shipped", author="A", price=10, stock=100, seller_id=seller.id)
+        db.session.add(book)
+        db.session.flush()
+        db.session.add_all([Order(user_id=customers[n % buyers].id, book_id=book.id, quantity=1, total_price=10,
+                                  order_date=datetime(2024, 5, 1 + n % 20, 10)) for n in range(count)])
+        db.session.commit()
+        return book.id
+
+def _orders_table():
+    from app_aws import AWSApp, DYNAMODB_ORDERS_TABLE
+    dynamodb = AWSApp().dynamodb
+    dynamodb.create_table(
+        TableName=DYNAMODB_ORDERS_TABLE,
+        KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    return dynamodb.Table(DYNAMODB_ORDERS_TABLE)
+
+def _snapshot():
+    return sorted((row.granularity, row.bucket_start, row.dimension, row.dimension_key, row.revenue, row.units, row.orders)
+                  for row in SalesRollup.query.all() if row.orders)
+
+def test_transitions_are_validated_and_recorded(app, admin_id):
+    book_id = _orders(app, 1)
+    with app.app_context():
+        transition(1, 'Shipped', actor_id=admin_id)
+        with pytest.raises(InvalidTransition):
+            transition(1, 'Cancelled')
+        transition(1, 'Delivered')
+        assert db.session.get(Order, 1).status == 'Delivered'
+        steps = [(change.from_status, change.to_status, change.changed_by)
+                 for change in OrderStatusChange.query.order_by(OrderStatusChange.id)]
+        assert steps == [('Placed', 'Shipped', admin_id), ('Shipped', 'Delivered', None)]
+
+def test_cancel_returns_stock(app):
+    book_id = _orders(app, 2)
+    with app.app_context():
+        transition(2, 'Cancelled')
+        db.session.expire_all()
+        assert db.session.get(Book, book_id).stock == 101
+        assert {row.status: row.count for row in sales_rollups.status_counts()} == {'Placed': 1, 'Cancelled': 1}
+
+def test_bulk_ship_runs_in_chunks_and_notifies_each_customer_once_per_chunk(app, admin_client, monkeypatch):
+    import app_aws
+    table = _orders_table()
+    monkeypatch.setattr(app_aws, 'aws_app', app_aws.AWSApp())
+    client = admin_client
+    _orders(app, 25, buyers=3)
+    for order_id in (3, 4):  # only some orders were ever synced to DynamoDB
+        table.put_item(Item={'id': str(order_id), 'status': 'Placed'})
+    monkeypatch.setattr(order_jobs, 'chunk_size', 10)
+    sent = []
+    monkeypatch.setattr('app.services.notification.NotificationService.send_many',
+                        lambda self, messages, max_workers=8: sent.extend(messages))
+    with app.app_context():
+        transition(1, 'Cancelled')
+
+    response = client.post('/admin/orders/bulk_status', json={'to_status': 'Shipped'})
+    assert response.status_code == 202
+    job_id = response.get_json()['id']
+    order_jobs.wait(job_id, timeout=30)
+
+    status = client.get(f'/admin/jobs/{job_id}').get_json()
+    assert (status['state'], status['processed'], status['total'], status['failed']) == ('done', 24, 24, 0)
+    assert {item['status'] for item in table.scan()['Items']} == {'Shipped'}
+    assert len(sent) == 3 * 3  # 3 chunks, one message per customer in each
+    with app.app_context():
+        assert Order.query.filter_by(status='Shipped').count() == 24
+        assert OrderStatusChange.query.filter_by(to_status='Shipped').count() == 24
+        incremental = _snapshot()
+        sales_rollups.backfill(report=lambda message: None)
+        assert _snapshot() == incremental
+
+    assert client.get('/admin/orders/2/history').get_json()[0]['to_status'] == 'Shipped'
+    response = client.post('/admin/orders/bulk_status', json={'to_status': 'Shipped', 'from_status': 'Cancelled'})
+    assert response.status_code == 400
+
+def test_processing_orders_can_be_shipped_or_cancelled(app, admin_client, admin_id):
+    client = admin_client
+    book_id = _orders(app, 3)
+    with app.app_context():
+        db.session.execute(db.update(Order).values(status='Processing'))  # as in data/orders.csv
+        db.session.commit()
+        transition(1, 'Cancelled', actor_id=admin_id)
+        with pytest.raises(InvalidTransition):
+            transition(2, 'Cancelled', from_status='Placed')  # the buyer's cancel button
+        db.session.expire_all()
+        assert db.session.get(Book, book_id).stock == 101
+
+    response = client.post('/admin/orders/bulk_status', json={'to_status': 'Shipped'})
+    order_jobs.wait(response.get_json()['id'], timeout=30)
+    with app.app_context():
+        assert [order.status for order in Order.query.order_by(Order.id)] == ['Cancelled', 'Shipped', 'Shipped']
+        assert OrderStatusChange.query.filter_by(from_status='Processing').count() == 3
+
+def test_a_different_selection_is_not_folded_into_a_running_job(app, admin_client, admin_id):
+    from app.models.job import BulkJob
+    _orders(app, 2)
+    with app.app_context():
+        running = BulkJob(kind='orders_to_shipped', state='running', requested_by=admin_id, total=1)
+        db.session.add(running)
+        db.session.commit()
+        running_id = running.id
+
+    response = admin_client.post('/admin/orders/bulk_status', json={'to_status': 'Shipped', 'order_ids': [2]})
+    assert response.status_code == 409 and f"#{running_id}" in response.get_json()['error']
+    with app.app_context():
+        assert BulkJob.query.count() == 1
+        assert db.session.get(Order, 2).status == 'Placed'
@@ -0,0 +1,56 @@
+import pytest
+from app.extensions import db
+from app.models.book import Book
+from app.models.order import Order
+from app.models.user import User
+
+def _seller(app):
+    with app.app_context():
+        user = User(username="seller-1", email="seller@example.com", role="seller", is_validated=True)
+        user.set_password("secret")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+        sess['username'] = "seller-1"
+        sess['user_role'] = "seller"
+    return client, user_id
+
+def _add_orders(app, seller_id, count):
+    """`count` orders spread over 50 buyers and 100 of the seller's books."""
+    with app.app_context():
+        buyers = [User(username=f"buyer{i}", email=f"buyer{i}@example.com", password_hash="x") for i in range(50)]
+        books = [Book(title=f"Book {i}", author="Author", price=10, stock=5, seller_id=seller_id) for i in range(100)]
+        db.session.add_all(buyers + books)
+        db.session.flush()
+        db.session.add_all([
+            Order(user_id=buyers[i % 50].id, book_id=books[i % 100].id, quantity=1, total_price=10, status='Placed')
+            for i in range(count)
+        ])
+        db.session.commit()
+
+@pytest.mark.parametrize("path, budget", [
+    ("/admin/orders", 3),      # admin check + one joined SELECT
+    ("/admin/dashboard", 12),  # admin check + one query per statistic
+])
+def test_admin_order_pages_stay_within_query_budget(app, admin_client, query_budget, path, budget):
+    client = admin_client
+    _, seller_id = _seller(app)
+    _add_orders(app, seller_id, 1000)
+
+    with query_budget(budget):
+        response = client.get(path)
+    assert response.status_code == 200
+    assert b"buyer49" in response.data
+
+def test_seller_sales_stays_within_query_budget(app, query_budget):
+    client, seller_id = _seller(app)
+    _add_orders(app, seller_id, 1000)
+
+    # seller check + one page of orders + page count + summary, monthly and top-title aggregates
+    with query_budget(6):
+        response = client.get('/seller/sales')
+    assert response.status_code == 200
+    assert b"buyer49" in response.data
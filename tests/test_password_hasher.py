@@ -0,0 +1,45 @@
+import pytest
+from werkzeug.security import check_password_hash
+from app.services.password_hasher import PasswordHasher, HasherBusy
+
+FAST = 'pbkdf2:sha256:1000'
+
+def test_needs_rehash_when_cost_changes():
+    old = PasswordHasher(method='pbkdf2:sha256:500')
+    new = PasswordHasher(method=FAST)
+    assert new.needs_rehash(old.hash('secret'))
+    assert not new.needs_rehash(new.hash('secret'))
+
+def test_pool_verification():
+    hasher = PasswordHasher(method=FAST, workers=1)
+    stored = hasher.hash('secret')
+    assert hasher.verify(stored, 'secret')
+    assert not hasher.verify(stored, 'wrong')
+
+def test_verification_is_bounded():
+    hasher = PasswordHasher(method=FAST, workers=1, max_pending=1, timeout=0.01)
+    stored = hasher.hash('secret')
+    hasher._slots.acquire()  # one verification already in flight
+    with pytest.raises(HasherBusy):
+        hasher.verify(stored, 'secret')
+
+def test_hash_many_preserves_order():
+    hasher = PasswordHasher(method=FAST)
+    passwords = [f"pw{i}" for i in range(10)]
+    hashes = hasher.hash_many(passwords, processes=2)
+    assert all(check_password_hash(h, pw) for h, pw in zip(hashes, passwords))
+
+def test_login_upgrades_outdated_hash(app):
+    from app.extensions import db
+    from app.models.user import User
+    from app.services.auth_service import AuthService
+
+    with app.app_context():
+        user = User(username="old", email="old@example.com",
+                    password_hash=PasswordHasher(method='pbkdf2:sha256:500').hash('secret'))
+        db.session.add(user)
+        db.session.commit()
+
+        assert AuthService().login("old@example.com", "secret") is not None
+        stored = User.query.filter_by(email="old@example.com").first().password_hash
+        assert stored.startswith(FAST + '$')
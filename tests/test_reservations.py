@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models.book import Book
+from app.models.hold import StockHold
+from app.models.order import Order
+from app.models.user import User
+from app.services.reservations import reservations
+
+def _book(app, stock):
+    with app.app_context():
+        book = Book(title="Flash Sale", author="Author", price=10, stock=stock)
+        db.session.add(book)
+        db.session.commit()
+        return book.id
+
+def _buyer_client(app, name):
+    with app.app_context():
+        user = User(username=name, email=f"{name}@example.com", role="buyer", password_hash="x")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess.update(user_id=user_id, username=name, email=f"{name}@example.com", user_role="buyer")
+    return client
+
+def _stock(book_id):
+    db.session.expire_all()
+    return db.session.get(Book, book_id).stock
+
+def test_cart_holds_reserve_stock_until_checkout(app, client, mocker):
+    from app.routes import bookstore
+    mocker.patch.object(bookstore.notifier, 'send_async')
+    mocker.patch.object(bookstore.order_repo, 'sync_to_dynamo_async')
+    book_id = _book(app, stock=2)
+    rival = _buyer_client(app, "rival")
+
+    client.post(f'/cart/add/{book_id}')
+    client.post(f'/cart/add/{book_id}')
+    with app.app_context():
+        assert _stock(book_id) == 0
+        assert StockHold.query.one().quantity == 2
+
+    # The sold-out title is reported when adding to the cart, not at checkout
+    response = rival.post(f'/cart/add/{book_id}', follow_redirects=True)
+    assert b'out of stock' in response.data
+
+    assert b'reserved for you until' in client.get('/checkout').data
+    client.post('/checkout')
+    with app.app_context():
+        assert Order.query.one().quantity == 2
+        assert StockHold.query.count() == 0
+        assert _stock(book_id) == 0
+
+def test_sweeper_returns_expired_holds_once(app, client):
+    book_id = _book(app, stock=5)
+    rival = _buyer_client(app, "rival")
+    client.post(f'/cart/add/{book_id}')
+    rival.post(f'/cart/update/{book_id}', data={'quantity': 3})  # not in the rival's cart yet: still holds
+    with app.app_context():
+        assert _stock(book_id) == 1
+        StockHold.query.filter_by(quantity=3).update({'expires_at': datetime.utcnow() - timedelta(minutes=1)})
+        db.session.commit()
+
+        assert reservations.sweep() == 1
+        assert reservations.sweep() == 0
+        assert _stock(book_id) == 4
+        assert StockHold.query.one().quantity == 1
+
+def test_cart_changes_move_the_hold(app, client):
+    book_id = _book(app, stock=4)
+    client.post(f'/cart/add/{book_id}')
+    response = client.post(f'/cart/update/{book_id}', data={'quantity': 9}, follow_redirects=True)
+    assert b'Only 4 units available' in response.data
+    with app.app_context():
+        assert StockHold.query.one().quantity == 4 and _stock(book_id) == 0
+
+    client.post(f'/cart/remove/{book_id}')
+    with app.app_context():
+        assert StockHold.query.count() == 0 and _stock(book_id) == 4
+
+def test_checkout_after_expiry_takes_from_stock(app, client, mocker):
+    from app.routes import bookstore
+    mocker.patch.object(bookstore.notifier, 'send_async')
+    mocker.patch.object(bookstore.order_repo, 'sync_to_dynamo_async')
+    book_id = _book(app, stock=1)
+    client.post(f'/cart/add/{book_id}')
+    with app.app_context():
+        StockHold.query.update({'expires_at': datetime.utcnow() - timedelta(minutes=1)})
+        db.session.commit()
+        reservations.sweep()
+        assert _stock(book_id) == 1
+
+    client.post('/checkout')
+    with app.app_context():
+        assert Order.query.count() == 1 and _stock(book_id) == 0
+
+def test_setting_stock_counts_copies_on_hand(app, client):
+    book_id = _book(app, stock=5)
+    client.post(f'/cart/update/{book_id}', data={'quantity': 2})
+    admin = _buyer_client(app, "boss")
+    with app.app_context():
+        User.query.filter_by(username="boss").update({'role': 'admin'})
+        db.session.commit()
+        assert _stock(book_id) == 3
+
+    admin.post(f'/admin/books/update_stock/{book_id}', data={'stock': 5, 'action': 'set'})
+    with app.app_context():
+        assert _stock(book_id) == 3  # 5 on hand, 2 of them in a cart
+        StockHold.query.update({'expires_at': datetime.utcnow() - timedelta(minutes=1)})
+        db.session.commit()
+        reservations.sweep()
+        assert _stock(book_id) == 5
+
+    admin.post(f'/admin/books/update_stock/{book_id}', data={'stock': 4, 'action': 'add'})
+    client.post(f'/cart/update/{book_id}', data={'quantity': 6})
+    # Fewer copies on hand than held: the holds are dropped, not paid back later
+    admin.post(f'/admin/books/update_stock/{book_id}', data={'stock': 2, 'action': 'set'})
+    with app.app_context():
+        assert StockHold.query.count() == 0 and _stock(book_id) == 2
@@ -0,0 +1,92 @@
+import pytest
+from moto import mock_aws
+from app.extensions import db
+from app.models.job import BulkJob
+from app.models.user import User
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    """Testing app on a SQLite file: the in-memory database shares one connection
+    across threads, so a request's teardown rollback could undo the job's writes."""
+    from config import TestingConfig
+    monkeypatch.setenv("FLASK_ENV", "testing")
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'jobs.db'}")
+    with mock_aws():
+        from app import create_app
+        yield create_app()
+
+def _add_buyers(app, count):
+    with app.app_context():
+        db.session.add_all([User(username=f"b{i}", email=f"b{i}@example.com", role="buyer", password_hash="x")
+                            for i in range(count)])
+        db.session.commit()
+
+def _users_table():
+    from app_aws import AWSApp, DYNAMODB_USERS_TABLE
+    dynamodb = AWSApp().dynamodb
+    dynamodb.create_table(
+        TableName=DYNAMODB_USERS_TABLE,
+        KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    return dynamodb.Table(DYNAMODB_USERS_TABLE)
+
+def test_promote_job_updates_sql_and_dynamodb_in_batches(app, admin_client, monkeypatch):
+    from app.services.role_jobs import role_jobs
+    import app_aws
+    table = _users_table()
+    monkeypatch.setattr(app_aws, 'aws_app', app_aws.AWSApp())
+    monkeypatch.setattr(role_jobs, 'batch_size', 3)
+    client = admin_client
+    _add_buyers(app, 7)
+    with app.app_context():
+        # Only some users were ever synced to DynamoDB
+        for user in User.query.filter_by(role='buyer').limit(4):
+            table.put_item(Item={'id': str(user.id), 'email': user.email, 'role': 'buyer'})
+
+    response = client.post('/admin/users/bulk_promote_sellers')
+    assert response.status_code == 302
+    with app.app_context():
+        job = BulkJob.query.one()
+    role_jobs.wait(job.id, timeout=10)
+
+    status = client.get(f'/admin/jobs/{job.id}').get_json()
+    assert status['state'] == 'done' and status['processed'] == status['total'] == 7
+    with app.app_context():
+        assert User.query.filter_by(role='seller', is_validated=True).count() == 7
+    items = table.scan()['Items']
+    assert len(items) == 4 and all(item['role'] == 'seller' and item['is_validated'] for item in items)
+
+def test_failed_dynamodb_writes_are_retried_by_rerunning(app, admin_client, monkeypatch):
+    from app.services.role_jobs import role_jobs
+    from app_aws import DynamoUserRepository
+    client = admin_client
+    _add_buyers(app, 4)
+
+    calls = []
+    def flaky(self, user_ids, role, is_validated, max_workers=8):
+        calls.append(list(user_ids))
+        # First run: the first user fails; later runs succeed
+        return {user_id: ('error' if len(calls) == 1 and i == 0 else 'skipped') for i, user_id in enumerate(user_ids)}
+    monkeypatch.setattr(DynamoUserRepository, '__init__', lambda self, aws_instance=None: None)
+    monkeypatch.setattr(DynamoUserRepository, 'update_roles_many', flaky)
+
+    client.post('/admin/users/bulk_promote_sellers')
+    with app.app_context():
+        first = BulkJob.query.one()
+    role_jobs.wait(first.id, timeout=10)
+    with app.app_context():
+        first = db.session.get(BulkJob, first.id)
+        assert (first.state, first.processed, first.failed) == ('failed', 3, 1)
+        assert User.query.filter_by(role='buyer').count() == 1
+
+    client.post('/admin/users/bulk_promote_sellers')
+    with app.app_context():
+        second = BulkJob.query.order_by(BulkJob.id.desc()).first()
+    role_jobs.wait(second.id, timeout=10)
+    with app.app_context():
+        second = db.session.get(BulkJob, second.id)
+        assert (second.state, second.total, second.processed) == ('done', 1, 1)
+        assert User.query.filter_by(role='buyer').count() == 0
+    assert len(calls[1]) == 1  # only the unfinished user was touched again
@@ -0,0 +1,69 @@
+from datetime import datetime
+from app.extensions import db
+from app.models.book import Book
+from app.models.order import Order
+from app.models.rollup import SalesRollup
+from app.models.user import User
+from app.services import sales_rollups
+
+def _orders(app):
+    with app.app_context():
+        seller = User(username="shop", email="shop@example.com", role="seller", password_hash="x", is_validated=True)
+        buyer = User(username="buyer", email="buyer@example.com", role="buyer", password_hash="x")
+        db.session.add_all([seller, buyer])
+        db.session.flush()
+        book = Book(title="Rolled", author="A", price=10, stock=50, seller_id=seller.id)
+        db.session.add(book)
+        db.session.flush()
+        orders = [
+            Order(user_id=buyer.id, book_id=book.id, quantity=2, total_price=20, order_date=datetime(2024, 3, 1, 9, 15)),
+            Order(user_id=buyer.id, book_id=book.id, quantity=1, total_price=10, order_date=datetime(2024, 3, 1, 9, 45)),
+            Order(user_id=buyer.id, book_id=book.id, quantity=3, total_price=30, order_date=datetime(2024, 3, 2, 14, 0)),
+        ]
+        db.session.add_all(orders)
+        db.session.commit()
+        return seller.id, book.id, [order.id for order in orders]
+
+def _snapshot():
+    return sorted((row.granularity, row.bucket_start, row.dimension, row.dimension_key, row.revenue, row.units, row.orders)
+                  for row in SalesRollup.query.all() if row.orders)
+
+def test_orders_update_rollups_incrementally(app):
+    seller_id, book_id, order_ids = _orders(app)
+    with app.app_context():
+        assert sales_rollups.totals() == (60, 6, 3)
+        assert sales_rollups.totals('seller', str(seller_id)) == (60, 6, 3)
+        hour = sales_rollups.series('hour', datetime(2024, 3, 1, 9), datetime(2024, 3, 1, 11))
+        assert [point[1:] for point in hour] == [(30, 3, 2), (0, 0, 0)]
+
+        db.session.get(Order, order_ids[2]).status = 'Cancelled'
+        db.session.commit()
+        assert sales_rollups.totals() == (30, 3, 2)
+        assert {row.status: row.count for row in sales_rollups.status_counts()} == {'Placed': 2, 'Cancelled': 1}
+
+def test_backfill_matches_incremental_rollups(app):
+    _orders(app)
+    with app.app_context():
+        db.session.get(Order, 1).status = 'Shipped'
+        db.session.commit()
+        incremental = _snapshot()
+        assert sales_rollups.backfill(chunk_size=2, report=lambda message: None) == 3
+        assert _snapshot() == incremental
+
+def test_analytics_page_reads_only_rollups(app, admin_client, admin_id, query_budget):
+    seller_id, book_id, _ = _orders(app)
+    client = admin_client
+    with app.app_context():
+        db.session.add(Order(user_id=admin_id, book_id=book_id, quantity=1, total_price=10))
+        db.session.commit()
+
+    with query_budget(10) as statements:
+        response = client.get('/admin/analytics?granularity=month')
+    assert response.status_code == 200 and b"shop" in response.data
+    assert not any('"order"' in sql for sql in statements)
+
+    # The dashboard only touches orders for its ten most recent rows
+    with query_budget(15) as statements:
+        response = client.get('/admin/dashboard')
+    assert response.status_code == 200 and b"Rolled" in response.data
+    assert [sql for sql in statements if 'FROM "order"' in sql and 'LIMIT' not in sql] == []
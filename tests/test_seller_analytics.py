@@ -0,0 +1,75 @@
+from datetime import datetime
+from app.extensions import db
+from app.models.book import Book
+from app.models.order import Order
+from app.models.user import User
+from app.services import seller_analytics
+
+def _seller_with_sales(app):
+    with app.app_context():
+        seller = User(username="shop", email="shop@example.com", role="seller", password_hash="x", is_validated=True)
+        other = User(username="other", email="other@example.com", role="seller", password_hash="x")
+        db.session.add_all([seller, other])
+        db.session.flush()
+        books = [Book(title=f"Title {i}", author="A", price=10, stock=stock, seller_id=seller.id)
+                 for i, stock in enumerate([0, 4, 30])]
+        books += [Book(title="Not mine", author="B", price=10, stock=100, seller_id=other.id)]
+        db.session.add_all(books)
+        db.session.flush()
+        db.session.add_all([
+            Order(user_id=other.id, book_id=books[0].id, quantity=2, total_price=20, order_date=datetime(2024, 1, 5)),
+            Order(user_id=other.id, book_id=books[2].id, quantity=1, total_price=10, order_date=datetime(2024, 1, 20)),
+            Order(user_id=other.id, book_id=books[2].id, quantity=5, total_price=50, order_date=datetime(2024, 2, 1)),
+            Order(user_id=seller.id, book_id=books[3].id, quantity=9, total_price=90, order_date=datetime(2024, 2, 1)),
+        ])
+        db.session.commit()
+        return seller.id
+
+def test_aggregates_cover_only_the_sellers_books(app):
+    seller_id = _seller_with_sales(app)
+    with app.app_context():
+        assert seller_analytics.inventory_summary(seller_id) == {
+            'listings': 3, 'total_stock': 34, 'out_of_stock': 1, 'low_stock': 1}
+        summary = seller_analytics.sales_summary(seller_id)
+        assert (summary['orders'], summary['units_sold'], summary['revenue']) == (3, 8, 80)
+        assert seller_analytics.revenue_by_month(seller_id) == [('2024-01', 30, 3), ('2024-02', 50, 5)]
+        assert [tuple(row) for row in seller_analytics.top_titles(seller_id)] == [('Title 2', 6, 60), ('Title 0', 2, 20)]
+
+def test_dashboard_query_count_does_not_grow_with_catalog(app, query_budget):
+    seller_id = _seller_with_sales(app)
+    with app.app_context():
+        db.session.add_all([Book(title=f"Bulk {i}", author="A", price=1, stock=1, seller_id=seller_id)
+                            for i in range(500)])
+        db.session.commit()
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = seller_id
+        sess['user_role'] = "seller"
+        sess['username'] = "shop"
+
+    with query_budget(6):
+        response = client.get('/seller/dashboard')
+    assert response.status_code == 200
+    assert b"503" in response.data  # listing count from the aggregate
+    assert response.data.count(b'class="p-row"') == 20
+
+    with query_budget(6):
+        response = client.get('/seller/sales')
+    assert b"2024-02" in response.data and b"Title 2" in response.data
+
+def test_top_titles_is_a_key_range_read(app):
+    from sqlalchemy import event
+    seller_id = _seller_with_sales(app)
+    with app.app_context():
+        executed = []
+        record = lambda conn, cursor, statement, parameters, context, many: executed.append((statement, parameters))
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            seller_analytics.top_titles(seller_id)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        statement, parameters = executed[0]
+        plan = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    details = ' '.join(row[-1] for row in plan)
+    assert 'USING INDEX ix_sales_rollup_key (granularity=? AND dimension=? AND dimension_key>? AND dimension_key<?)' \
+        in details
@@ -0,0 +1,71 @@
+import os
+import pytest
+from moto import mock_aws
+
+@pytest.fixture
+def fresh_app(monkeypatch, tmp_path):
+    from config import TestingConfig
+    monkeypatch.setenv("FLASK_ENV", "testing")
+    monkeypatch.setattr(TestingConfig, 'TEMPLATE_CACHE_DIR', str(tmp_path / 'jinja'))
+    with mock_aws():
+        from app import create_app
+        yield create_app(), tmp_path / 'jinja'
+
+def test_warmup_compiles_all_templates(fresh_app):
+    app, cache_dir = fresh_app
+    report = app.extensions['startup_report']
+    templates = app.jinja_env.list_templates(extensions=['html'])
+
+    assert report['templates'] == len(templates)
+    assert 'total_ms' in report
+    # Every template was loaded into the environment cache and written as bytecode
+    assert len(app.jinja_env.cache) >= len(templates)
+    assert len(os.listdir(cache_dir)) >= len(templates)
+
+def _import_profile(env_overrides):
+    """Run create_app in a fresh interpreter under -X importtime; return {module: cumulative_us}."""
+    import subprocess
+    import sys
+    env = dict(os.environ, FLASK_ENV='testing', **env_overrides)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'from app import create_app; create_app()'],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env, capture_output=True, text=True, check=True
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, module = line.split('|')
+            if cumulative.strip().isdigit():
+                profile[module.strip()] = int(cumulative)
+    return profile
+
+def test_lazy_init_does_not_import_boto3():
+    profile = _import_profile({'LAZY_INIT': 'true'})
+    assert 'app.routes.bookstore' in profile
+    assert 'boto3' not in profile
+
+def test_create_db_upgrades_a_baseline_database(app):
+    from sqlalchemy import inspect, text
+    from app.extensions import db
+    from app.models.book import Book
+    with app.app_context():
+        # The book table as it was before the genre column and the browse indexes
+        db.session.execute(text("DROP TABLE book"))
+        db.session.execute(text(
+            "CREATE TABLE book (id INTEGER PRIMARY KEY, title VARCHAR(150) NOT NULL, author VARCHAR(200) NOT NULL, "
+            "description TEXT, price FLOAT NOT NULL, stock INTEGER, seller_id INTEGER, image_url VARCHAR(500), "
+            "created_at DATETIME)"))
+        db.session.execute(text("INSERT INTO book (title, author, price, stock) VALUES ('Old', 'A', 10, 3)"))
+        db.session.execute(text("DROP INDEX ix_order_order_date"))
+        db.session.commit()
+
+        result = app.test_cli_runner().invoke(args=['create-db'])
+        assert result.exit_code == 0, result.output
+        assert "added column book.genre" in result.output
+        inspector = inspect(db.engine)
+        assert {'ix_book_genre', 'ix_book_author'} <= {index['name'] for index in inspector.get_indexes('book')}
+        assert 'ix_order_order_date' in {index['name'] for index in inspector.get_indexes('order')}
+        assert Book.query.filter_by(genre=None).one().title == 'Old'
+        # Re-running has nothing left to add
+        assert "added column" not in app.test_cli_runner().invoke(args=['create-db']).output
@@ -0,0 +1,91 @@
+import threading
+import pytest
+from moto import mock_aws
+from app.extensions import db
+from app.models.book import Book
+from app.models.order import Order
+from app.models.stock_shard import StockShard
+from app.models.user import User
+from app.repositories.book_repo import BookRepository
+from app.services.stock_shards import sharded_stock
+
+@pytest.fixture
+def file_app(monkeypatch, tmp_path):
+    """Testing app on a SQLite file, so checkout threads get their own connections."""
+    from config import TestingConfig
+    monkeypatch.setenv("FLASK_ENV", "testing")
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'shop.db'}")
+    monkeypatch.setattr(TestingConfig, 'STOCK_SHARD_MIRROR_SECONDS', 0)
+    with mock_aws():
+        from app import create_app
+        yield create_app()
+
+def _hot_book(app, stock, shards=4):
+    with app.app_context():
+        user = User(username="buyer", email="buyer@example.com", role="buyer", password_hash="x")
+        book = Book(title="Launch Day", author="Author", price=10, stock=stock)
+        db.session.add_all([user, book])
+        db.session.commit()
+        sharded_stock.enable(book.id, shards)
+        db.session.commit()
+        return user.id, book.id
+
+def _checkout(app, user_id, book_id, quantity):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess.update(user_id=user_id, username="buyer", email="buyer@example.com",
+                    user_role="buyer", cart={str(book_id): quantity})
+    return client.post('/checkout', follow_redirects=True)
+
+def _shards(book_id):
+    return [shard.stock for shard in StockShard.query.filter_by(book_id=book_id).order_by(StockShard.shard)]
+
+def test_checkout_takes_from_shards_and_mirrors_total(file_app, mocker):
+    from app.routes import bookstore
+    mocker.patch.object(bookstore.notifier, 'send_async')
+    mocker.patch.object(bookstore.order_repo, 'sync_to_dynamo_async')
+    user_id, book_id = _hot_book(file_app, stock=10)
+    with file_app.app_context():
+        assert _shards(book_id) == [3, 3, 2, 2]
+
+    _checkout(file_app, user_id, book_id, 2)
+    _checkout(file_app, user_id, book_id, 5)  # larger than any shard: gathered from several
+    response = _checkout(file_app, user_id, book_id, 4)
+    assert b'insufficient stock' in response.data
+
+    with file_app.app_context():
+        assert sum(_shards(book_id)) == 3 and min(_shards(book_id)) >= 0
+        assert db.session.get(Book, book_id).stock == 3
+        assert Order.query.count() == 2
+
+def test_concurrent_checkouts_on_a_hot_title_never_oversell(file_app, mocker):
+    from app.routes import bookstore
+    mocker.patch.object(bookstore.notifier, 'send_async')
+    mocker.patch.object(bookstore.order_repo, 'sync_to_dynamo_async')
+    user_id, book_id = _hot_book(file_app, stock=5)
+
+    threads = [threading.Thread(target=_checkout, args=(file_app, user_id, book_id, 1)) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with file_app.app_context():
+        assert Order.query.count() == 5
+        assert _shards(book_id) == [0, 0, 0, 0]
+        assert db.session.get(Book, book_id).stock == 0
+
+def test_stock_changes_and_unsharding_keep_the_total(file_app):
+    _, book_id = _hot_book(file_app, stock=10)
+    with file_app.app_context():
+        results = BookRepository().bulk_update_stock([(book_id, 'add', 6)])
+        assert results[book_id]['stock'] == 16
+        results = BookRepository().bulk_update_stock([(book_id, 'add', -20)])
+        assert results[book_id]['status'] == 'invalid'
+        results = BookRepository().bulk_update_stock([(book_id, 'set', 9)])
+        assert results[book_id]['stock'] == 9 and _shards(book_id) == [3, 2, 2, 2]
+
+        sharded_stock.disable(book_id)
+        db.session.commit()
+        assert StockShard.query.count() == 0
+        assert db.session.get(Book, book_id).stock == 9